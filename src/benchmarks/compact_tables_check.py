@@ -0,0 +1,228 @@
+"""
+Validation: projected, compact loader tables vs full tables.
+
+Loads the same data twice, once with every CSV column at parse-time
+dtypes (FPL_FULL_TABLES behaviour) and once projected to the builders'
+columns in compact dtypes, and checks that:
+
+1. training features (build_season_training_dataset) are equal
+2. prediction features (build_predictions) are equal
+3. ranked predictions (predict_ranks) are equal, row for row
+
+Values must match exactly; only dtypes may differ (int16 counts,
+categorical positions). Also reports loaded-table memory for both.
+
+Feature engines are then checked against their pandas references on the
+compact frames, values and dtypes alike:
+
+- add_relative_features: engine="grouped" vs engine="transform"
+- build_rolling_form_features: engine="numpy" vs engine="pandas", on
+  the compact stats table (int16 minutes and counts)
+
+Exits 1 on any mismatch.
+
+Usage:
+    python -m src.benchmarks.compact_tables_check [--data-dir DIR]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+N_PLAYERS = 700
+N_GWS = 38
+COMPLETED_GWS = 24
+
+
+def _plain(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Categoricals back to plain values, so frames compare by value only.
+    """
+
+    df = df.reset_index(drop=True).copy()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(df[col].cat.categories.dtype)
+    return df
+
+
+def _same(full: pd.DataFrame, compact: pd.DataFrame) -> str | None:
+    try:
+        pd.testing.assert_frame_equal(
+            _plain(full), _plain(compact), check_dtype=False, check_exact=True
+        )
+    except AssertionError as e:
+        return str(e).splitlines()[0]
+    return None
+
+
+def _identical(reference: pd.DataFrame, fast: pd.DataFrame) -> str | None:
+    try:
+        pd.testing.assert_frame_equal(reference, fast, check_exact=True)
+    except AssertionError as e:
+        return str(e).splitlines()[0]
+    return None
+
+
+def _engine_parity(
+    stats: pd.DataFrame,
+    training_df: pd.DataFrame,
+) -> dict[str, str | None]:
+    """
+    Mismatch (or None) per engine pair, on loader-produced frames.
+    """
+
+    from src.features.relative_features import (
+        RELATIVE_COLS,
+        add_relative_features,
+    )
+    from src.features.rolling_form import build_rolling_form_features
+
+    pre_relative = training_df.drop(
+        columns=[
+            f"{col}{suffix}"
+            for col in RELATIVE_COLS
+            for suffix in ("_rel", "_z")
+            if f"{col}{suffix}" in training_df.columns
+        ]
+    )
+
+    # bottleneck, when installed, sums differently from pandas' nanops
+    with pd.option_context("compute.use_bottleneck", False):
+        relative = _identical(
+            add_relative_features(pre_relative, engine="transform"),
+            add_relative_features(pre_relative, engine="grouped"),
+        )
+
+    rolling = _identical(
+        build_rolling_form_features(stats, engine="pandas"),
+        build_rolling_form_features(stats, engine="numpy"),
+    )
+
+    return {"relative features": relative, "rolling form": rolling}
+
+
+def run_checks(workdir: Path) -> bool:
+    """
+    Runs every check against the tree FPL_DATA_ROOT points at and prints
+    a report. Returns True when all pass.
+    """
+
+    import src.data.loaders as loaders
+    from src.inference.model_registry import ModelRegistry
+    from src.inference.predict_ranks import predict_ranks
+    from src.models.rolling_cv import END_GW, START_GW
+    from src.models.train_pipeline import run_training_pipeline
+    from src.pipeline.build_predictions import (
+        PREDICTION_PLAYER_COLUMNS,
+        build_predictions,
+    )
+    from src.pipeline.build_training_dataset import (
+        STATS_COLUMNS,
+        build_season_training_dataset,
+    )
+
+    gws = loaders.get_completed_gws()
+    current_gw = loaders.get_last_completed_gw()
+
+    models_dir = workdir / "models"
+    loaders.COMPACT_TABLES = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_training_pipeline(models_dir=models_dir, run_cv=False)
+    registry = ModelRegistry(models_dir=models_dir)
+
+    outputs = {}
+    for compact in (False, True):
+        loaders.COMPACT_TABLES = compact
+        outputs[compact] = {
+            "stats": loaders.load_player_gameweeks(
+                gws, columns=STATS_COLUMNS
+            ),
+            "players": loaders.load_players(
+                current_gw, columns=PREDICTION_PLAYER_COLUMNS
+            ),
+            "training features": build_season_training_dataset(
+                START_GW, END_GW
+            ),
+            "prediction features": build_predictions(current_gw=current_gw),
+            "predictions": predict_ranks(
+                current_gw=current_gw, registry=registry, use_cache=False
+            ),
+        }
+
+    print("=== LOADED TABLE MEMORY ===\n")
+    for name in ("stats", "players"):
+        full_mb = outputs[False][name].memory_usage(deep=True).sum() / 2**20
+        compact_mb = outputs[True][name].memory_usage(deep=True).sum() / 2**20
+        full_cols = outputs[False][name].shape[1]
+        compact_cols = outputs[True][name].shape[1]
+        print(
+            f"{name:<8} {full_cols:>3} cols {full_mb:8.2f}MB"
+            f" -> {compact_cols:>3} cols {compact_mb:8.2f}MB"
+            f"  ({full_mb / compact_mb:.1f}x)"
+        )
+
+    print("\n=== EQUALITY ===\n")
+    ok = True
+    for name in ("training features", "prediction features", "predictions"):
+        full = outputs[False][name]
+        compact = outputs[True][name]
+        mismatch = _same(full, compact)
+        ok &= mismatch is None
+        print(
+            f"{name:<20} {len(full):>6} rows  "
+            + ("equal" if mismatch is None else f"MISMATCH: {mismatch}")
+        )
+
+    print("\n=== ENGINE PARITY ===\n")
+    for name, mismatch in _engine_parity(
+        outputs[True]["stats"], outputs[True]["training features"]
+    ).items():
+        ok &= mismatch is None
+        print(
+            f"{name:<20} "
+            + ("identical" if mismatch is None else f"MISMATCH: {mismatch}")
+        )
+
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact table validation")
+    parser.add_argument(
+        "--data-dir", default=None,
+        help="existing FPL tree; default generates a synthetic one",
+    )
+    parser.add_argument("--players", type=int, default=N_PLAYERS)
+    parser.add_argument("--gws", type=int, default=N_GWS)
+    parser.add_argument("--completed", type=int, default=COMPLETED_GWS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="fpl-compact-") as tmp:
+        workdir = Path(tmp)
+
+        # must happen before any src.data import (module-level paths)
+        data_dir = Path(args.data_dir or workdir / "data")
+        os.environ["FPL_DATA_ROOT"] = str(data_dir)
+        os.environ["FPL_CACHE_DIR"] = str(workdir / "cache")
+
+        if args.data_dir is None:
+            from src.benchmarks.synthetic_season import generate_dataset
+
+            generate_dataset(
+                data_dir,
+                n_players=args.players,
+                n_gws=args.gws,
+                completed_gws=args.completed,
+            )
+
+        ok = run_checks(workdir)
+
+    print("\nall checks passed" if ok else "\nCHECKS FAILED")
+    sys.exit(0 if ok else 1)
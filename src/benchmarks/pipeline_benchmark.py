@@ -0,0 +1,465 @@
+"""
+Benchmark suite: end-to-end pipeline stages on a synthetic season.
+
+Generates a synthetic FPL tree (see synthetic_season) in a temp folder,
+points the loaders and the columnar cache at it, and times every stage
+from raw CSVs to ranked predictions:
+
+    load_player_gameweeks (cold cache / cold on THREADED_WORKERS
+                           threads / warm cache)
+    build_rolling_form_features
+    rolling state: apply one new GW / warm form lookup
+    build_fixture_difficulty
+    add_relative_features
+    build_training_dataset (per-target reference / single-pass)
+    build_multi_season_training_dataset (with --seasons > 1)
+    build_predictions
+    training / prediction features read back from the feature store
+    predict_ranks (result cache off; compiled models / pickles)
+    one-row Midfielder predict (compiled model / pickles)
+    run_scenarios (Elo shifts for every team + minutes for 20 players)
+    simulate_points (next-GW pool, SIMULATIONS draws per player)
+
+Builder stages bypass the feature store so they time the computation.
+
+Each stage reports best and median wall time over `--repeats` runs and
+the tracemalloc peak of one extra run (traced separately, so tracing
+overhead does not leak into the timings).
+
+Results are written as JSON; `--compare` checks them against a stored
+baseline and exits 1 when any stage got slower or hungrier than
+`--tolerance` allows.
+
+Usage:
+    python -m src.benchmarks.pipeline_benchmark --output bench.json
+    python -m src.benchmarks.pipeline_benchmark --compare bench.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+N_PLAYERS = 700
+N_GWS = 38
+COMPLETED_GWS = 24
+N_SEASONS = 1
+REPEATS = 5
+THREADED_WORKERS = 4
+SCENARIO_ELO_DELTAS = [-100, -50, 50, 100]
+SCENARIO_PLAYERS = 20
+SIMULATIONS = 10_000
+
+# relative slowdown / memory growth tolerated before flagging
+TOLERANCE = 0.2
+# timings this close to the baseline are noise, whatever the ratio
+MIN_DELTA_S = 0.005
+MIN_DELTA_MB = 1.0
+
+
+def _measure(fn, setup=None, repeats: int = REPEATS) -> dict:
+    """
+    Times fn() `repeats` times, then runs it once more under tracemalloc.
+    `setup` runs untimed before every call (e.g. to clear a cache).
+    """
+
+    timings = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "best_s": min(timings),
+        "median_s": statistics.median(timings),
+        "peak_mb": peak / 2**20,
+        "repeats": repeats,
+    }
+
+
+def _train_models(models_dir: Path) -> None:
+    from src.models.train_pipeline import run_training_pipeline
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_training_pipeline(models_dir=models_dir, run_cv=False)
+
+
+def run_suite(
+    workdir: Path,
+    repeats: int = REPEATS,
+    only: list[str] | None = None,
+) -> dict[str, dict]:
+    """
+    Runs every stage against the tree FPL_DATA_ROOT points at.
+
+    IMPORTANT:
+    - FPL_DATA_ROOT / FPL_CACHE_DIR must be set before this is called;
+      the loaders read them at import time
+    """
+
+    from src.config.feature_masks import RANK_FEATURE_MASKS
+    from src.data.cache import clear_cache
+    from src.decision.simulate import simulate_points
+    from src.data.loaders import (
+        DATA_ROOT,
+        DEFAULT_SEASON,
+        DEFAULT_TOURNAMENT,
+        get_completed_gws,
+        get_last_completed_gw,
+        load_fixtures,
+        load_player_gameweeks,
+    )
+    from src.features.fixture_difficulty import build_fixture_difficulty
+    from src.features.relative_features import (
+        RELATIVE_COLS,
+        add_relative_features,
+    )
+    from src.features.rolling_form import build_rolling_form_features
+    from src.features.rolling_state import RollingState, rolling_form_at
+    from src.inference.model_registry import ModelRegistry
+    from src.inference.predict_ranks import predict_ranks
+    from src.inference.scenarios import Scenario, run_scenarios
+    from src.models.rolling_cv import END_GW, START_GW
+    from src.pipeline.build_predictions import build_predictions
+    from src.pipeline.build_training_dataset import (
+        build_multi_season_training_dataset,
+        build_season_training_dataset,
+        build_training_dataset,
+    )
+
+    season = DEFAULT_SEASON
+    seasons = sorted(
+        p.name for p in DATA_ROOT.iterdir()
+        if (p / "By Tournament" / DEFAULT_TOURNAMENT).is_dir()
+        and p.name <= season
+    )
+    current_gw = get_last_completed_gw(season)
+    gws = get_completed_gws(season=season)
+    season_dir = DATA_ROOT / season / "By Tournament" / DEFAULT_TOURNAMENT
+    all_gws = sorted(int(p.name[2:]) for p in season_dir.glob("GW*"))
+
+    # inputs shared by the stage benchmarks, built once up front
+    player_gw_df = load_player_gameweeks(gws, season=season)
+    fixtures_df = pd.concat(
+        [load_fixtures(gw, season=season) for gw in all_gws],
+        ignore_index=True,
+    )
+    dataset = build_season_training_dataset(
+        START_GW, END_GW, season=season, use_store=False
+    )
+    pre_relative = dataset.drop(
+        columns=[
+            f"{col}{suffix}"
+            for col in RELATIVE_COLS
+            for suffix in ("_rel", "_z")
+            if f"{col}{suffix}" in dataset.columns
+        ]
+    )
+
+    # rolling state one GW behind, to time landing the latest GW
+    gw_frames = {
+        gw: player_gw_df[player_gw_df["gameweek"] == gw] for gw in gws
+    }
+    previous_state = RollingState()
+    for gw in gws[:-1]:
+        previous_state.apply_gameweek(gw, gw_frames[gw])
+
+    models_dir = workdir / "models"
+    _train_models(models_dir)
+    registry = ModelRegistry(models_dir=models_dir)
+    pickled_registry = ModelRegistry(models_dir=models_dir, use_compiled=False)
+
+    predictions = build_predictions(current_gw=current_gw, season=season)
+    one_row = predictions.loc[
+        predictions["position"] == "Midfielder",
+        RANK_FEATURE_MASKS["Midfielder"],
+    ].head(1)
+
+    ranked = predict_ranks(
+        current_gw=current_gw, season=season, registry=registry
+    )
+
+    scenarios = [Scenario("baseline")]
+    scenarios += [
+        Scenario(f"team {team} elo {delta:+d}", team_elo={int(team): delta})
+        for team in predictions["team_id"].unique()
+        for delta in SCENARIO_ELO_DELTAS
+    ]
+    scenarios += [
+        Scenario(f"player {player} 90 min", minutes={int(player): 90})
+        for player in predictions["player_id"].unique()[:SCENARIO_PLAYERS]
+    ]
+
+    stages = {
+        "load_player_gameweeks_cold": (
+            lambda: load_player_gameweeks(gws, season=season),
+            clear_cache,
+        ),
+        "load_player_gameweeks_cold_threaded": (
+            lambda: load_player_gameweeks(
+                gws, season=season, max_workers=THREADED_WORKERS
+            ),
+            clear_cache,
+        ),
+        "load_player_gameweeks_warm": (
+            lambda: load_player_gameweeks(gws, season=season),
+            None,
+        ),
+        "build_rolling_form_features": (
+            lambda: build_rolling_form_features(player_gw_df),
+            None,
+        ),
+        "rolling_state_apply_gameweek": (
+            lambda: previous_state.copy().apply_gameweek(
+                gws[-1], gw_frames[gws[-1]]
+            ),
+            None,
+        ),
+        "rolling_form_at_warm": (
+            lambda: rolling_form_at(
+                current_gw - 4, current_gw, season=season
+            ),
+            None,
+        ),
+        "build_fixture_difficulty": (
+            lambda: build_fixture_difficulty(fixtures_df),
+            None,
+        ),
+        "add_relative_features": (
+            lambda: add_relative_features(pre_relative),
+            None,
+        ),
+        "build_training_dataset": (
+            lambda: build_training_dataset(START_GW, END_GW, season=season),
+            None,
+        ),
+        "build_season_training_dataset": (
+            lambda: build_season_training_dataset(
+                START_GW, END_GW, season=season, use_store=False
+            ),
+            None,
+        ),
+        "build_multi_season_training_dataset": (
+            lambda: build_multi_season_training_dataset(seasons, START_GW),
+            None,
+        ),
+        "build_predictions": (
+            lambda: build_predictions(
+                current_gw=current_gw, season=season, use_store=False
+            ),
+            None,
+        ),
+        "training_features_stored": (
+            lambda: build_season_training_dataset(
+                START_GW, END_GW, season=season
+            ),
+            None,
+        ),
+        "prediction_features_stored": (
+            lambda: build_predictions(current_gw=current_gw, season=season),
+            None,
+        ),
+        "predict_ranks": (
+            lambda: predict_ranks(
+                current_gw=current_gw,
+                season=season,
+                registry=registry,
+                use_cache=False,
+            ),
+            None,
+        ),
+        "predict_ranks_pickled": (
+            lambda: predict_ranks(
+                current_gw=current_gw,
+                season=season,
+                registry=pickled_registry,
+                use_cache=False,
+            ),
+            None,
+        ),
+        "predict_one_row_compiled": (
+            lambda: registry.predict("Midfielder", one_row),
+            None,
+        ),
+        "predict_one_row_pickled": (
+            lambda: pickled_registry.predict("Midfielder", one_row),
+            None,
+        ),
+        "run_scenarios": (
+            lambda: run_scenarios(
+                scenarios,
+                current_gw=current_gw,
+                season=season,
+                registry=registry,
+            ),
+            None,
+        ),
+        "simulate_points": (
+            lambda: simulate_points(ranked, n_sims=SIMULATIONS, seed=0),
+            None,
+        ),
+    }
+
+    results = {}
+    for name, (fn, setup) in stages.items():
+        if only and name not in only:
+            continue
+        if name == "build_multi_season_training_dataset" and len(seasons) < 2:
+            continue
+
+        results[name] = _measure(fn, setup=setup, repeats=repeats)
+        print(
+            f"{name:<36} best {results[name]['best_s'] * 1000:9.1f}ms  "
+            f"median {results[name]['median_s'] * 1000:9.1f}ms  "
+            f"peak {results[name]['peak_mb']:7.1f}MB"
+        )
+
+    return results
+
+
+def compare(
+    results: dict[str, dict],
+    baseline: dict[str, dict],
+    tolerance: float = TOLERANCE,
+) -> pd.DataFrame:
+    """
+    One row per stage present in both runs; `regression` is True when
+    best time or peak memory grew by more than `tolerance` (and by more
+    than the noise floor).
+    """
+
+    rows = []
+
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+
+        time_ratio = current["best_s"] / max(base["best_s"], 1e-12)
+        mem_ratio = current["peak_mb"] / max(base["peak_mb"], 1e-12)
+
+        slower = (
+            time_ratio > 1 + tolerance
+            and current["best_s"] - base["best_s"] > MIN_DELTA_S
+        )
+        hungrier = (
+            mem_ratio > 1 + tolerance
+            and current["peak_mb"] - base["peak_mb"] > MIN_DELTA_MB
+        )
+
+        rows.append({
+            "stage": name,
+            "base_ms": base["best_s"] * 1000,
+            "now_ms": current["best_s"] * 1000,
+            "time_x": time_ratio,
+            "base_mb": base["peak_mb"],
+            "now_mb": current["peak_mb"],
+            "mem_x": mem_ratio,
+            "regression": slower or hungrier,
+        })
+
+    return pd.DataFrame(rows)
+
+
+def _metadata(args, data_dir: Path) -> dict:
+    import sklearn
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "data_dir": str(data_dir),
+        "synthetic": args.data_dir is None,
+        "players": args.players,
+        "gws": args.gws,
+        "completed_gws": args.completed,
+        "seasons": args.seasons,
+        "repeats": args.repeats,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pipeline benchmark suite")
+    parser.add_argument(
+        "--data-dir", default=None,
+        help="existing FPL tree; default generates a synthetic one",
+    )
+    parser.add_argument("--players", type=int, default=N_PLAYERS)
+    parser.add_argument("--gws", type=int, default=N_GWS)
+    parser.add_argument("--completed", type=int, default=COMPLETED_GWS)
+    parser.add_argument("--seasons", type=int, default=N_SEASONS)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--only", nargs="*", default=None)
+    parser.add_argument("--output", default=None, help="write results JSON")
+    parser.add_argument("--compare", default=None, help="baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="fpl-bench-") as tmp:
+        workdir = Path(tmp)
+
+        # must happen before any src.data import (module-level paths)
+        data_dir = Path(args.data_dir or workdir / "data")
+        os.environ["FPL_DATA_ROOT"] = str(data_dir)
+        os.environ["FPL_CACHE_DIR"] = str(workdir / "cache")
+
+        if args.data_dir is None:
+            from src.benchmarks.synthetic_season import generate_dataset
+
+            generate_dataset(
+                data_dir,
+                n_seasons=args.seasons,
+                n_players=args.players,
+                n_gws=args.gws,
+                completed_gws=args.completed,
+            )
+
+        print(f"\n=== PIPELINE BENCHMARK (best of {args.repeats}) ===\n")
+        results = run_suite(workdir, repeats=args.repeats, only=args.only)
+
+    report = {"meta": _metadata(args, data_dir), "results": results}
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\nSaved {args.output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        table = compare(results, baseline["results"], args.tolerance)
+
+        print(f"\n=== VS BASELINE {args.compare} ===\n")
+        print(table.round(3).to_string(index=False))
+
+        if table["regression"].any():
+            flagged = table.loc[table["regression"], "stage"].tolist()
+            print(f"\nREGRESSIONS: {', '.join(flagged)}")
+            sys.exit(1)
+
+        print("\nno regressions")
@@ -0,0 +1,121 @@
+"""
+Benchmark: rolling form engines on a full synthetic season.
+
+Compares the reference pandas engine (filter/sort/tail/agg + merge per
+window) with the vectorized NumPy engine, for the production windows
+and a longer window list. Both engines must return identical frames,
+dtypes included, on the float frame and on its compact (loader dtype)
+copy.
+
+Usage:
+    python -m src.benchmarks.rolling_form_benchmark
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data.schema import compact_dtypes
+from src.features.rolling_form import build_rolling_form_features
+
+N_PLAYERS = 700
+N_GWS = 38
+REPEATS = 5
+
+WINDOW_SETS = [
+    [1, 3, 5],
+    [1, 3, 5, 8, 10, 38],
+]
+
+
+def make_season_frame(
+    n_players: int = N_PLAYERS,
+    n_gws: int = N_GWS,
+    seed: int = 42,
+) -> pd.DataFrame:
+    """
+    One normalized player_gameweek_stats row per player per GW.
+    """
+
+    rng = np.random.default_rng(seed)
+    n = n_players * n_gws
+
+    plays = rng.random(n) < 0.55
+
+    return pd.DataFrame({
+        "player_id": np.tile(np.arange(1, n_players + 1), n_gws),
+        "gameweek": np.repeat(np.arange(1, n_gws + 1), n_players),
+        "minutes": np.where(plays, rng.integers(1, 91, n), 0).astype(float),
+        "event_points": np.where(plays, rng.integers(0, 15, n), 0),
+        "goals_scored": rng.poisson(0.1, n),
+        "assists": rng.poisson(0.1, n),
+        "expected_goals": np.round(rng.gamma(0.5, 0.2, n), 2),
+        "expected_assists": np.round(rng.gamma(0.5, 0.15, n), 2),
+        "defensive_contribution": rng.integers(0, 15, n),
+        "saves": rng.integers(0, 5, n),
+        "goals_conceded": rng.integers(0, 4, n),
+    })
+
+
+def _best_time(fn, repeats: int = REPEATS) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_benchmark(df: pd.DataFrame) -> pd.DataFrame:
+    rows = []
+
+    for windows in WINDOW_SETS:
+        results = {}
+
+        for engine in ["pandas", "numpy"]:
+            results[engine] = build_rolling_form_features(
+                df, windows=windows, engine=engine
+            )
+            rows.append({
+                "windows": str(windows),
+                "engine": engine,
+                "seconds": _best_time(
+                    lambda: build_rolling_form_features(
+                        df, windows=windows, engine=engine
+                    )
+                ),
+            })
+
+        pd.testing.assert_frame_equal(
+            results["numpy"], results["pandas"], check_exact=True
+        )
+
+        compact = compact_dtypes(df)
+        pd.testing.assert_frame_equal(
+            build_rolling_form_features(
+                compact, windows=windows, engine="numpy"
+            ),
+            build_rolling_form_features(
+                compact, windows=windows, engine="pandas"
+            ),
+            check_exact=True,
+        )
+
+    out = pd.DataFrame(rows)
+    pandas_time = (
+        out[out["engine"] == "pandas"].set_index("windows")["seconds"]
+    )
+    out["speedup"] = out["windows"].map(pandas_time) / out["seconds"]
+
+    return out
+
+
+if __name__ == "__main__":
+    season_df = make_season_frame()
+
+    print(
+        f"\n=== ROLLING FORM BENCHMARK "
+        f"({N_PLAYERS} players x {N_GWS} GWs, best of {REPEATS}) ===\n"
+    )
+    print(run_benchmark(season_df).round(4).to_string(index=False))
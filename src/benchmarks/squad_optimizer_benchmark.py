@@ -0,0 +1,135 @@
+"""
+Benchmark: full-squad optimizer scaling with pool size and horizon.
+
+Times the MILP against the greedy fallback on synthetic pools, from a
+single season's pool up to merged multi-season sizes, and reports how
+far greedy lands from the MILP squad. `optimal` is False where the MILP
+time limit stopped the search first.
+
+On multi-GW horizons the default MILP scores one horizon-summed XI, so
+`horizon_gap_pct` compares it with the per-GW-lineup model (solved once,
+without the 1s limit) to show what the best-effort squad gives up.
+
+Usage:
+    python -m src.benchmarks.squad_optimizer_benchmark
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.config.constants import SQUAD_QUOTAS
+from src.decision.squad_optimizer import SquadPool, optimize_squad
+
+POOL_SIZES = [300, 700, 1400, 2800]
+HORIZONS = [1, 6]
+N_CLUBS = 20
+REPEATS = 3
+
+# share of each position in a real FPL pool
+POSITION_SHARES = {
+    "Goalkeeper": 0.12,
+    "Defender": 0.33,
+    "Midfielder": 0.40,
+    "Forward": 0.15,
+}
+
+
+def make_pool(
+    n_players: int,
+    n_gws: int,
+    seed: int = 42,
+) -> SquadPool:
+    """
+    Prices 4.0-13.0 with player quality rising with price, scaled per GW
+    by a club fixture factor, like predictions from one form window.
+    """
+
+    rng = np.random.default_rng(seed)
+
+    positions = rng.choice(
+        list(POSITION_SHARES),
+        size=n_players,
+        p=list(POSITION_SHARES.values()),
+    )
+    team_codes = rng.integers(1, N_CLUBS + 1, n_players)
+    prices = rng.integers(40, 131, n_players)
+
+    quality = np.clip(
+        1.0 + (prices - 40) / 18.0 + rng.normal(0.0, 1.0, n_players),
+        0.0,
+        None,
+    )
+    fixture_factor = rng.uniform(0.7, 1.3, (N_CLUBS + 1, n_gws))
+    points = quality[:, None] * fixture_factor[team_codes]
+
+    return SquadPool(
+        player_ids=np.arange(1, n_players + 1),
+        web_names=np.array([f"P{i}" for i in range(1, n_players + 1)]),
+        positions=positions,
+        team_codes=team_codes,
+        prices=prices,
+        points=points,
+        gameweeks=np.arange(1, n_gws + 1),
+    )
+
+
+EXACT_TIME_LIMIT_S = 60.0
+
+
+def _best_run(pool: SquadPool, method: str, repeats: int = REPEATS):
+    best = None
+    for _ in range(repeats):
+        solution = optimize_squad(pool, method=method)
+        if best is None or solution.solve_seconds < best.solve_seconds:
+            best = solution
+    return best
+
+
+def run_benchmark() -> pd.DataFrame:
+    rows = []
+
+    for n_gws in HORIZONS:
+        for n_players in POOL_SIZES:
+            pool = make_pool(n_players, n_gws)
+            assert all((pool.positions == p).sum() >= q
+                       for p, q in SQUAD_QUOTAS.items())
+
+            milp = _best_run(pool, "milp")
+            greedy = _best_run(pool, "greedy")
+            horizon_gap = 0.0
+            if n_gws > 1:
+                exact = optimize_squad(
+                    pool,
+                    time_limit=EXACT_TIME_LIMIT_S,
+                    per_gw_lineups=True,
+                )
+                horizon_gap = 100.0 * (
+                    exact.expected_points - milp.expected_points
+                ) / exact.expected_points
+
+            rows.append({
+                "players": n_players,
+                "gws": n_gws,
+                "milp_s": milp.solve_seconds,
+                "greedy_s": greedy.solve_seconds,
+                "milp_points": milp.expected_points,
+                "greedy_points": greedy.expected_points,
+                "greedy_gap_pct": 100.0
+                * (milp.expected_points - greedy.expected_points)
+                / milp.expected_points,
+                "horizon_gap_pct": horizon_gap,
+                "solver": milp.method,
+                "optimal": milp.optimal,
+            })
+
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+
+    print(f"\n=== SQUAD OPTIMIZER BENCHMARK (best of {REPEATS}) ===\n")
+    print(run_benchmark().round(3).to_string(index=False))
+    print(f"\ntotal {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,329 @@
+"""
+Synthetic FPL data tree for benchmarks and offline runs.
+
+Writes the same layout the loaders read:
+
+    {root}/{season}/By Tournament/Premier League/GW{n}/
+        player_gameweek_stats.csv
+        players.csv
+        fixtures.csv
+
+Clubs carry an Elo rating, players a position, price and quality;
+minutes, attacking output and points follow from quality, minutes
+security and fixture difficulty, so features and models see realistic
+structure rather than pure noise. Players keep a stable `code` across
+seasons while their per-season `id` is reshuffled, as in FPL. Fixtures
+include occasional blank and double gameweeks. GWs after
+`completed_gws` get header-only stats files, like the real tree's
+future placeholder folders.
+
+Usage:
+    python -m src.benchmarks.synthetic_season --out /tmp/fpl --players 700
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.data.loaders import DEFAULT_SEASON, DEFAULT_TOURNAMENT
+
+N_CLUBS = 20
+N_PLAYERS = 700
+N_GWS = 38
+
+# element_type -> share of the player pool
+POSITION_SHARES = {1: 0.12, 2: 0.33, 3: 0.40, 4: 0.15}
+
+# every BLANK_EVERY-th GW one fixture is postponed into the next DOUBLE GW
+BLANK_EVERY = 9
+
+STATS_COLUMNS = [
+    "id", "minutes", "event_points",
+    "goals_scored", "assists",
+    "expected_goals", "expected_assists",
+    "defensive_contribution", "saves", "goals_conceded",
+]
+
+# columns the real export carries but the pipeline never reads; they make
+# raw files as wide as the real ones
+EXTRA_STATS_COLUMNS = [
+    "starts", "clean_sheets", "bonus", "bps",
+    "influence", "creativity", "threat", "ict_index",
+    "expected_goal_involvements", "expected_goals_conceded",
+    "yellow_cards", "red_cards", "own_goals",
+    "penalties_saved", "penalties_missed",
+    "value", "selected", "transfers_in", "transfers_out",
+]
+
+
+def season_names(n_seasons: int, last_season: str = DEFAULT_SEASON) -> list:
+    """
+    The `n_seasons` seasons ending at `last_season`, oldest first.
+    """
+
+    last_start = int(last_season[:4])
+    return [
+        f"{start}-{start + 1}"
+        for start in range(last_start - n_seasons + 1, last_start + 1)
+    ]
+
+
+def _schedule(rng: np.random.Generator, n_gws: int) -> list:
+    """
+    (home, away) index pairs per GW: random pairings, with a postponed
+    fixture creating a blank GW and a double GW shortly after.
+    """
+
+    gws = []
+    postponed = []
+
+    for gw in range(1, n_gws + 1):
+        perm = rng.permutation(N_CLUBS)
+        pairs = [(perm[2 * i], perm[2 * i + 1]) for i in range(N_CLUBS // 2)]
+
+        if gw % BLANK_EVERY == 0:
+            postponed.append(pairs.pop())
+        elif postponed and gw % BLANK_EVERY == 2:
+            pairs.append(postponed.pop())
+
+        gws.append(pairs)
+
+    return gws
+
+
+def generate_season(
+    root: Path,
+    season: str = DEFAULT_SEASON,
+    n_players: int = N_PLAYERS,
+    n_gws: int = N_GWS,
+    completed_gws: int | None = None,
+    seed: int = 0,
+    roster_seed: int | None = None,
+) -> Path:
+    """
+    Writes one season and returns its tournament folder.
+
+    NOTE:
+    - `roster_seed` fixes clubs and players (codes, positions, quality)
+      so several seasons share one roster; `seed` drives everything else
+    """
+
+    if completed_gws is None:
+        completed_gws = n_gws
+
+    if roster_seed is None:
+        roster_seed = seed
+
+    roster = np.random.default_rng(roster_seed)
+    rng = np.random.default_rng(seed)
+    base = Path(root) / season / "By Tournament" / DEFAULT_TOURNAMENT
+
+    club_codes = np.sort(
+        roster.choice(np.arange(1, 100), N_CLUBS, replace=False)
+    )
+    club_elo = 1500.0 + roster.normal(0.0, 120.0, N_CLUBS)
+
+    codes = 100000 + np.arange(n_players)
+    element_type = roster.choice(
+        list(POSITION_SHARES), n_players, p=list(POSITION_SHARES.values())
+    )
+    club = roster.integers(0, N_CLUBS, n_players)
+
+    quality = np.clip(roster.gamma(2.0, 0.5, n_players), 0.05, 2.5)
+    nailed = roster.beta(2.0, 2.0, n_players)
+
+    # season-specific ids, like FPL's element ids
+    ids = rng.permutation(n_players) + 1
+    club_elo = club_elo + rng.normal(0.0, 30.0, N_CLUBS)
+
+    attack = np.select(
+        [element_type == 4, element_type == 3, element_type == 2],
+        [0.3, 0.18, 0.04],
+        0.0,
+    ) * quality
+
+    price = np.clip(
+        np.round(
+            40 + 25 * quality + 10 * nailed + rng.normal(0, 4, n_players)
+        ),
+        39,
+        150,
+    ).astype(int)
+
+    web_names = [f"Player{code - 100000}" for code in codes]
+    schedule = _schedule(rng, n_gws)
+    match_id = 0
+
+    for gw, pairs in enumerate(schedule, start=1):
+        gw_dir = base / f"GW{gw}"
+        gw_dir.mkdir(parents=True, exist_ok=True)
+
+        fixtures = []
+        opponent_elo = np.full(N_CLUBS, np.nan)
+        for home, away in pairs:
+            match_id += 1
+            fixtures.append({
+                "gameweek": gw,
+                "home_team": club_codes[home],
+                "away_team": club_codes[away],
+                "home_team_elo": round(club_elo[home], 2),
+                "away_team_elo": round(club_elo[away], 2),
+                "match_id": match_id,
+                "finished": gw <= completed_gws,
+            })
+            opponent_elo[home] = club_elo[away]
+            opponent_elo[away] = club_elo[home]
+
+        pd.DataFrame(fixtures).to_csv(gw_dir / "fixtures.csv", index=False)
+
+        # prices drift slowly with form, like the real snapshots
+        price = np.clip(price + rng.integers(-1, 2, n_players), 39, 150)
+        pd.DataFrame({
+            "id": ids,
+            "code": codes,
+            "first_name": "First",
+            "second_name": web_names,
+            "web_name": web_names,
+            "element_type": element_type,
+            "team_code": club_codes[club],
+            "now_cost": price,
+            "status": "a",
+            "selected_by_percent": np.round(rng.gamma(1.0, 5.0, n_players), 1),
+        }).to_csv(gw_dir / "players.csv", index=False)
+
+        if gw > completed_gws:
+            pd.DataFrame(columns=STATS_COLUMNS + EXTRA_STATS_COLUMNS).to_csv(
+                gw_dir / "player_gameweek_stats.csv", index=False
+            )
+            continue
+
+        plays = ~np.isnan(opponent_elo[club])
+        edge = np.nan_to_num((club_elo[club] - opponent_elo[club]) / 400.0)
+
+        starts = plays & (rng.random(n_players) < nailed)
+        cameo = plays & ~starts & (rng.random(n_players) < 0.3)
+        minutes = np.where(
+            starts,
+            rng.integers(60, 91, n_players),
+            np.where(cameo, rng.integers(1, 30, n_players), 0),
+        )
+        share = minutes / 90.0
+
+        threat = attack * np.exp(edge) / 4
+        xg = np.round(rng.gamma(4.0, threat) * share, 2)
+        xa = np.round(rng.gamma(4.0, 0.7 * threat) * share, 2)
+        goals = rng.poisson(xg)
+        assists = rng.poisson(xa)
+        conceded = np.where(
+            minutes > 0, rng.poisson(1.3 * np.exp(-edge) * share), 0
+        )
+        saves = np.where(
+            (element_type == 1) & (minutes > 0), rng.poisson(2.5, n_players), 0
+        )
+        defcon = np.where(
+            minutes > 0, rng.poisson(4 + 4 * (element_type == 2)) * share, 0
+        ).round().astype(int)
+
+        goal_points = np.select(
+            [element_type <= 2, element_type == 3], [6, 5], 4
+        )
+        clean_sheet = (conceded == 0) & (minutes >= 60)
+        points = (
+            np.where(minutes >= 60, 2, np.where(minutes > 0, 1, 0))
+            + goal_points * goals
+            + 3 * assists
+            + np.where(element_type <= 2, 4, np.where(element_type == 3, 1, 0))
+            * clean_sheet
+            + saves // 3
+        )
+
+        pd.DataFrame({
+            "id": ids,
+            "minutes": minutes,
+            "event_points": points,
+            "goals_scored": goals,
+            "assists": assists,
+            "expected_goals": xg,
+            "expected_assists": xa,
+            "defensive_contribution": defcon,
+            "saves": saves,
+            "goals_conceded": conceded,
+            "starts": starts.astype(int),
+            "clean_sheets": clean_sheet.astype(int),
+            "bonus": np.where(points >= 8, rng.integers(1, 4, n_players), 0),
+            "bps": points * 3 + rng.integers(0, 6, n_players),
+            "influence": np.round(points * 4.2 * rng.random(n_players), 1),
+            "creativity": np.round(xa * 40 * rng.random(n_players), 1),
+            "threat": np.round(xg * 60 * rng.random(n_players), 1),
+            "ict_index": np.round(points * 1.1 * rng.random(n_players), 1),
+            "expected_goal_involvements": np.round(xg + xa, 2),
+            "expected_goals_conceded": np.round(
+                1.3 * np.exp(-edge) * share, 2
+            ),
+            "yellow_cards": (rng.random(n_players) < 0.05 * share).astype(int),
+            "red_cards": 0,
+            "own_goals": 0,
+            "penalties_saved": 0,
+            "penalties_missed": 0,
+            "value": price,
+            "selected": rng.integers(1000, 5_000_000, n_players),
+            "transfers_in": rng.integers(0, 100_000, n_players),
+            "transfers_out": rng.integers(0, 100_000, n_players),
+        }).to_csv(gw_dir / "player_gameweek_stats.csv", index=False)
+
+    return base
+
+
+def generate_dataset(
+    root: Path,
+    n_seasons: int = 1,
+    n_players: int = N_PLAYERS,
+    n_gws: int = N_GWS,
+    completed_gws: int | None = None,
+    seed: int = 0,
+) -> list:
+    """
+    Writes `n_seasons` seasons ending at DEFAULT_SEASON. Only the latest
+    season is left partially completed; earlier ones are finished.
+    """
+
+    seasons = season_names(n_seasons)
+
+    for i, season in enumerate(seasons):
+        is_current = i == len(seasons) - 1
+        generate_season(
+            root,
+            season=season,
+            n_players=n_players,
+            n_gws=n_gws,
+            completed_gws=completed_gws if is_current else None,
+            seed=seed + i,
+            roster_seed=seed,
+        )
+
+    return seasons
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic FPL tree")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--players", type=int, default=N_PLAYERS)
+    parser.add_argument("--gws", type=int, default=N_GWS)
+    parser.add_argument("--completed", type=int, default=None)
+    parser.add_argument("--seasons", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    seasons = generate_dataset(
+        Path(args.out),
+        n_seasons=args.seasons,
+        n_players=args.players,
+        n_gws=args.gws,
+        completed_gws=args.completed,
+        seed=args.seed,
+    )
+
+    print(f"Wrote {', '.join(seasons)} to {args.out}")
+    print(f"Use it with: FPL_DATA_ROOT={args.out}")
@@ -52,3 +52,70 @@ POINT_CAPS = {
     "Midfielder": (2.0, 10.5),
     "Forward": (2.0, 9.5),
 }
+
+# FPL squad rules used by the transfer engine
+SQUAD_QUOTAS = {
+    "Goalkeeper": 2,
+    "Defender": 5,
+    "Midfielder": 5,
+    "Forward": 3,
+}
+
+MAX_PLAYERS_PER_CLUB = 3
+TRANSFER_HIT_POINTS = 4
+
+# starting XI: (min, max) starters per position, 11 in total
+STARTING_XI_SIZE = 11
+FORMATION_LIMITS = {
+    "Goalkeeper": (1, 1),
+    "Defender": (3, 5),
+    "Midfielder": (2, 5),
+    "Forward": (1, 3),
+}
+
+SQUAD_BUDGET = 1000  # tenths of £m
+BENCH_WEIGHT = 0.1
+
+# FPL scoring rules, used by the points simulator
+APPEARANCE_POINTS = 1           # any minutes
+LONG_APPEARANCE_POINTS = 2      # 60+ minutes (replaces the 1)
+LONG_APPEARANCE_MINUTES = 60
+
+GOAL_POINTS = {
+    "Goalkeeper": 10,
+    "Defender": 6,
+    "Midfielder": 5,
+    "Forward": 4,
+}
+ASSIST_POINTS = 3
+
+# clean sheets need 60+ minutes
+CLEAN_SHEET_POINTS = {
+    "Goalkeeper": 4,
+    "Defender": 4,
+    "Midfielder": 1,
+    "Forward": 0,
+}
+
+# -1 per GOALS_CONCEDED_STEP goals conceded while on the pitch
+GOALS_CONCEDED_POSITIONS = ("Goalkeeper", "Defender")
+GOALS_CONCEDED_STEP = 2
+
+SAVES_PER_POINT = 3             # goalkeepers
+
+# defensive contributions needed for DEFCON_POINTS (none for goalkeepers)
+DEFCON_THRESHOLDS = {
+    "Defender": 10,
+    "Midfielder": 12,
+    "Forward": 12,
+}
+DEFCON_POINTS = 2
+
+# points simulator assumptions
+FULL_MATCH_MINUTES = 90
+CAMEO_MINUTES = 25              # a sub appearance in the minutes outcome
+MAX_PLAY_PROBABILITY = 0.95     # injury / rotation risk for ever-presents
+LEAGUE_GOALS_PER_TEAM = 1.35    # per match, at effective_elo_diff 0
+GOALS_ELO_SCALE = 800           # 10x fewer goals conceded per +800 Elo
+ATTACK_SCALE_MAX = 4.0          # xG/xA scale-up once play prob. is capped
+HAUL_POINTS = 10
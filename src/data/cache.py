@@ -0,0 +1,288 @@
+"""
+Columnar on-disk cache for normalized per-gameweek tables.
+
+Each cached table is a directory holding column-major `.npy` blocks (one
+per dtype, one contiguous row per column) and a `meta.json` describing
+column order, dtypes and the raw CSV it was built from. Entries are
+keyed by season, GW, file name and the source file's mtime/size, so
+touching a raw CSV invalidates its entry automatically.
+
+IMPORTANT:
+- The cache stores NORMALIZED frames; loaders remain the only callers
+- Cached reads are memory-mapped and byte-identical to a fresh parse
+- Total size is bounded; least recently used entries are evicted first
+"""
+
+import functools
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+CACHE_ROOT = Path(
+    os.environ.get("FPL_CACHE_DIR") or PROJECT_ROOT / "data" / "cache"
+)
+TABLE_CACHE_DIR = CACHE_ROOT / "tables"
+
+CACHE_ENABLED = os.environ.get("FPL_DISABLE_CACHE", "") == ""
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Bump when the on-disk layout changes.
+CACHE_FORMAT_VERSION = 2
+
+_SCHEMA_PATH = Path(__file__).resolve().parent / "schema.py"
+
+
+@functools.lru_cache(maxsize=None)
+def _schema_fingerprint() -> str:
+    """
+    Normalizer changes must invalidate cached frames too.
+    """
+    return hashlib.sha1(_SCHEMA_PATH.read_bytes()).hexdigest()[:12]
+
+
+def _entry_dir(path: Path, season: str, gw: int, variant: str = "") -> Path:
+    path_hash = hashlib.sha1(
+        (os.path.abspath(path) + variant).encode()
+    ).hexdigest()[:10]
+    return TABLE_CACHE_DIR / f"{season}_GW{gw}_{path.stem}_{path_hash}"
+
+
+def _source_key(path: Path, season: str, gw: int, variant: str = "") -> dict:
+    stat = path.stat()
+    return {
+        "season": season,
+        "gw": int(gw),
+        "file": path.name,
+        "variant": variant,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "schema": _schema_fingerprint(),
+        "format": CACHE_FORMAT_VERSION,
+    }
+
+
+def _encode_frame(df: pd.DataFrame) -> tuple[dict, dict] | None:
+    """
+    Splits a frame into column-major blocks (one per dtype) plus metadata.
+
+    Object/string columns are stored as int32 codes into a category list.
+    Returns None when the frame cannot be stored losslessly
+    (non-string labels, custom index, mixed-type object columns).
+    """
+
+    if not isinstance(df.index, pd.RangeIndex) or df.index.start != 0:
+        return None
+
+    if not all(isinstance(c, str) for c in df.columns):
+        return None
+
+    if df.columns.duplicated().any():
+        return None
+
+    blocks: dict[str, list[np.ndarray]] = {}
+    columns = []
+
+    for col in df.columns:
+        series = df[col]
+        dtype = series.dtype
+        entry = {"name": col, "dtype": str(dtype)}
+
+        if isinstance(dtype, np.dtype) and dtype.kind in "biufcmM":
+            values = series.to_numpy()
+        elif isinstance(dtype, pd.CategoricalDtype):
+            categories = list(dtype.categories)
+            if not all(isinstance(v, str) for v in categories):
+                return None
+            values = series.cat.codes.to_numpy().astype(np.int32)
+            entry["dtype"] = "category"
+            entry["categories"] = categories
+        else:
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+            categories = list(uniques)
+            if not all(isinstance(v, str) for v in categories):
+                return None
+            values = codes.astype(np.int32)
+            entry["categories"] = categories
+
+        kind = "codes" if "categories" in entry else "values"
+        block = f"{kind}_{values.dtype.name}".replace("[", "_").rstrip("]")
+        entry["block"] = block
+        entry["slot"] = len(blocks.setdefault(block, []))
+        blocks[block].append(values)
+        columns.append(entry)
+
+    arrays = {name: np.stack(cols) for name, cols in blocks.items()}
+
+    return arrays, {"columns": columns, "n_rows": len(df)}
+
+
+def _decode_frame(entry_dir: Path, meta: dict) -> pd.DataFrame:
+    blocks = {}
+    data = {}
+
+    for col in meta["columns"]:
+        block = col["block"]
+        if block not in blocks:
+            blocks[block] = np.load(entry_dir / f"{block}.npy", mmap_mode="r")
+
+        values = blocks[block][col["slot"]]
+
+        if col["dtype"] == "category":
+            values = pd.Categorical.from_codes(
+                np.array(values), categories=col["categories"]
+            )
+        elif "categories" in col:
+            lookup = np.array(col["categories"] + [np.nan], dtype=object)
+            values = lookup[values]
+            if col["dtype"] != "object":
+                values = pd.array(values, dtype=col["dtype"])
+        else:
+            values = np.array(values)
+
+        data[col["name"]] = values
+
+    return pd.DataFrame(data, index=pd.RangeIndex(meta["n_rows"]))
+
+
+def _entry_size(entry_dir: Path) -> int:
+    return sum(p.stat().st_size for p in entry_dir.iterdir() if p.is_file())
+
+
+def _evict(
+    max_bytes: int = CACHE_MAX_BYTES,
+    root: Path = TABLE_CACHE_DIR,
+    entry_glob: str = "*",
+) -> None:
+    """
+    Drops least recently used entries under root until they fit in
+    max_bytes. Entries are the directories matching `entry_glob`.
+
+    Recency is the mtime of each entry's meta.json, refreshed on every hit.
+    """
+
+    if not root.exists():
+        return
+
+    entries = []
+    for meta_path in root.glob(f"{entry_glob}/meta.json"):
+        entry_dir = meta_path.parent
+        try:
+            mtime = meta_path.stat().st_mtime_ns
+            entries.append((mtime, _entry_size(entry_dir), entry_dir))
+        except FileNotFoundError:
+            continue  # evicted concurrently
+
+    total = sum(size for _, size, _ in entries)
+
+    for _, size, entry_dir in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        total -= size
+
+
+def _read_entry(entry_dir: Path, key: dict) -> pd.DataFrame | None:
+    """
+    The frame stored in entry_dir when its key matches, else None.
+    """
+
+    meta_path = entry_dir / "meta.json"
+
+    try:
+        meta = json.loads(meta_path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    if meta.get("key") != key:
+        return None
+
+    try:
+        df = _decode_frame(entry_dir, meta)
+        os.utime(meta_path)
+        return df
+    except (FileNotFoundError, ValueError):
+        return None  # partially evicted entry
+
+
+def _store_entry(entry_dir: Path, key: dict, df: pd.DataFrame) -> bool:
+    """
+    Atomically replaces entry_dir with df's encoding. False when df
+    cannot be stored or another writer won the race.
+    """
+
+    encoded = _encode_frame(df)
+    if encoded is None:
+        return False
+
+    arrays, meta = encoded
+    meta["key"] = key
+
+    entry_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = entry_dir.parent / f".tmp-{uuid.uuid4().hex}"
+    tmp_dir.mkdir()
+
+    try:
+        for name, values in arrays.items():
+            np.save(tmp_dir / f"{name}.npy", values, allow_pickle=False)
+
+        # meta.json is written last: its presence marks a complete entry
+        (tmp_dir / "meta.json").write_text(json.dumps(meta))
+
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, entry_dir)
+    except OSError:
+        # another process won the race; its entry is equally valid
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        return False
+
+    return True
+
+
+def _write_entry(entry_dir: Path, key: dict, df: pd.DataFrame) -> None:
+    if _store_entry(entry_dir, key, df):
+        _evict()
+
+
+def read_cached(
+    path: Path,
+    season: str,
+    gw: int,
+    build: Callable[[Path], pd.DataFrame],
+    variant: str = "",
+) -> pd.DataFrame:
+    """
+    Returns build(path), served from the columnar cache when fresh.
+
+    `build` must parse and normalize the raw CSV; it only runs on a miss.
+    The caller is responsible for checking that `path` exists.
+    `variant` tells apart different builds of the same file (e.g. column
+    projections); each gets its own entry.
+    """
+
+    if not CACHE_ENABLED:
+        return build(path)
+
+    key = _source_key(path, season, gw, variant)
+    entry_dir = _entry_dir(path, season, gw, variant)
+
+    df = _read_entry(entry_dir, key)
+    if df is not None:
+        return df
+
+    df = build(path)
+    _write_entry(entry_dir, key, df)
+
+    return df
+
+
+def clear_cache() -> None:
+    shutil.rmtree(TABLE_CACHE_DIR, ignore_errors=True)
@@ -0,0 +1,213 @@
+"""
+Persistent per-gameweek feature store.
+
+Feature rows for one target gameweek depend only on a handful of raw
+files (the form window's stats, one players snapshot, the target's
+fixtures) and on the feature code. The store keeps each target GW's
+fully assembled rows on disk, so training and inference only build the
+GWs they have not seen before: retraining after a new GW builds that
+GW's rows and reads the rest.
+
+Entries use the columnar cache layout (see cache.py): columns of one
+dtype are stored as one matrix (one row per column, memory-mapped on
+read) and `meta.json` is the column index. An entry is reused only when
+its key matches:
+
+- season, scope (training rows / predictions from a given GW) and GW
+- size and mtime of every raw file the rows were built from
+- a hash of the feature-builder code and src/config constants
+- whether loaders run with compact tables
+
+IMPORTANT:
+- Entries are lossless (dtypes included): fetch_features returns exactly
+  what build() returned, so results never depend on the store's state
+- Rows for a target GW must not depend on other target GWs (relative
+  features are grouped per target GW, so they qualify)
+- Total size is bounded; least recently used GWs are evicted first, so
+  prediction scopes of past gameweeks age out on their own
+"""
+
+import functools
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+import src.data.loaders as loaders
+from src.data.cache import CACHE_ROOT, _evict, _read_entry, _store_entry
+
+FEATURE_STORE_DIR = CACHE_ROOT / "features"
+FEATURE_STORE_MAX_BYTES = 1024 * 1024 * 1024
+
+FEATURE_STORE_ENABLED = (
+    os.environ.get("FPL_DISABLE_FEATURE_STORE", "") == ""
+)
+
+# Bump when the entry layout or key changes.
+FEATURE_STORE_VERSION = 2
+
+_SRC_ROOT = Path(__file__).resolve().parents[1]
+
+# code that decides feature values; any edit invalidates every entry
+FEATURE_CODE_GLOBS = [
+    "config/*.py",
+    "data/loaders.py",
+    "data/schema.py",
+    "features/*.py",
+    "pipeline/*.py",
+]
+
+
+@functools.lru_cache(maxsize=None)
+def feature_code_hash() -> str:
+    digest = hashlib.sha1()
+
+    for pattern in FEATURE_CODE_GLOBS:
+        for path in sorted(_SRC_ROOT.glob(pattern)):
+            digest.update(str(path.relative_to(_SRC_ROOT)).encode())
+            digest.update(path.read_bytes())
+
+    return digest.hexdigest()[:12]
+
+
+def _season_dir(season: str) -> Path:
+    season_path = loaders._season_path(season)
+    path_hash = hashlib.sha1(
+        os.path.abspath(season_path).encode()
+    ).hexdigest()[:10]
+    return FEATURE_STORE_DIR / f"{season}_{path_hash}"
+
+
+def _input_stamp(paths: list[Path]) -> list:
+    """
+    (file, size, mtime) per input; None for a file that does not exist.
+    """
+
+    stamp = []
+    for path in paths:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            stamp.append(None)
+            continue
+        stamp.append(
+            [f"{path.parent.name}/{path.name}", stat.st_size, stat.st_mtime_ns]
+        )
+    return stamp
+
+
+def _entry_key(scope: str, season: str, gw: int, inputs: list[Path]) -> dict:
+    return {
+        "season": season,
+        "scope": scope,
+        "gw": int(gw),
+        "inputs": _input_stamp(inputs),
+        "code": feature_code_hash(),
+        "compact": loaders.COMPACT_TABLES,
+        "format": FEATURE_STORE_VERSION,
+    }
+
+
+def gameweek_files(
+    season: str,
+    stats_gws: list[int],
+    players_gw: int,
+    fixtures_gw: int,
+) -> list[Path]:
+    """
+    Raw files behind one target GW's rows, for fetch_features' `inputs`.
+    """
+
+    base = loaders._season_path(season)
+    return (
+        [base / f"GW{gw}" / "player_gameweek_stats.csv" for gw in stats_gws]
+        + [base / f"GW{players_gw}" / "players.csv"]
+        + [base / f"GW{fixtures_gw}" / "fixtures.csv"]
+    )
+
+
+def _concat(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    pd.concat that keeps categoricals categorical when GWs saw different
+    categories (e.g. web_name from different players snapshots). Frames
+    without columns (GWs that built to nothing) are skipped.
+    """
+
+    frames = [frame for frame in frames if len(frame.columns)]
+    if not frames:
+        return pd.DataFrame()
+
+    df = pd.concat(frames, ignore_index=True)
+
+    for col in frames[0].columns:
+        if not isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+            continue
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            continue
+        df[col] = union_categoricals(
+            [frame[col] for frame in frames], sort_categories=True
+        )
+
+    return df
+
+
+def fetch_features(
+    scope: str,
+    season: str,
+    target_gws: list[int],
+    inputs: Callable[[int], list[Path]],
+    build: Callable[[list[int]], pd.DataFrame],
+) -> pd.DataFrame:
+    """
+    Rows for every GW in `target_gws`, in that order: stored GWs are read
+    from disk, the rest are built in one build(missing_gws) call and
+    stored.
+
+    NOTE:
+    - `inputs(gw)` lists the raw files gw's rows are built from
+    - build(gws) must return rows with a `target_gw` column; GWs it
+      returns no rows for are stored as empty entries
+    """
+
+    season_dir = _season_dir(season)
+    keys = {
+        gw: _entry_key(scope, season, gw, inputs(gw)) for gw in target_gws
+    }
+
+    frames: dict[int, pd.DataFrame] = {}
+    missing = []
+
+    for gw in target_gws:
+        df = _read_entry(season_dir / f"{scope}_GW{gw}", keys[gw])
+        if df is None:
+            missing.append(gw)
+        else:
+            frames[gw] = df
+
+    if missing:
+        built = build(missing)
+        target = (
+            built["target_gw"].to_numpy() if len(built.columns)
+            else np.empty(0)
+        )
+
+        stored = False
+        for gw in missing:
+            df = built[target == gw].reset_index(drop=True)
+            entry_dir = season_dir / f"{scope}_GW{gw}"
+            stored |= _store_entry(entry_dir, keys[gw], df)
+            frames[gw] = df
+
+        if stored:
+            _evict(FEATURE_STORE_MAX_BYTES, FEATURE_STORE_DIR, "*/*")
+
+    return _concat([frames[gw] for gw in target_gws])
+
+
+def clear_feature_store() -> None:
+    shutil.rmtree(FEATURE_STORE_DIR, ignore_errors=True)
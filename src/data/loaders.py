@@ -1,16 +1,34 @@
+import asyncio
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, Iterator, TypeVar
+
 import pandas as pd
 
+from src.data.cache import read_cached
+from src.data.manifest import (
+    completed_gameweeks,
+    data_version,
+    last_completed_gameweek,
+)
 from src.data.schema import (
+    compact_dtypes,
     normalize_player_gameweek_df,
     normalize_players_df,
     normalize_fixtures_df,
+    raw_columns,
 )
+from src.utils.tracing import traced
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 
-DATA_ROOT = (
-    PROJECT_ROOT
+# FPL_DATA_ROOT points the loaders at another tree with the same layout
+# (e.g. a synthetic season for benchmarks)
+DATA_ROOT = Path(
+    os.environ.get("FPL_DATA_ROOT")
+    or PROJECT_ROOT
     / "data"
     / "raw"
     / "fpl-elo-insights"
@@ -20,6 +38,28 @@ DATA_ROOT = (
 DEFAULT_SEASON = "2025-2026"
 DEFAULT_TOURNAMENT = "Premier League"
 
+# FPL_FULL_TABLES=1 loads every column at parse-time dtypes (the
+# reference the compact tables are validated against)
+COMPACT_TABLES = os.environ.get("FPL_FULL_TABLES", "") == ""
+
+# seasons loaded ahead on background threads by iter_season_gameweeks
+SEASON_PREFETCH = 1
+
+# threads reading per-GW files at once; 1 reads them in sequence.
+# Parsing holds the GIL for much of the work, so more threads mainly
+# help when the tree sits on a slow disk or network mount.
+LOAD_WORKERS = max(int(os.environ.get("FPL_LOAD_WORKERS", "1")), 1)
+
+# players.csv columns holding FPL's stable cross-season player code
+PLAYER_CODE_COLUMNS = ["code", "player_code"]
+
+# optional manual links (season, player_id, player_key) in DATA_ROOT,
+# e.g. for players whose code is missing in an older snapshot
+PLAYER_ID_MAP_FILE = "player_id_map.csv"
+
+# player_key for players without a code: unique per season, never linked
+UNLINKED_KEY_OFFSET = 10_000_000
+
 
 def _season_path(season: str) -> Path:
     return DATA_ROOT / season / "By Tournament" / DEFAULT_TOURNAMENT
@@ -35,39 +75,145 @@ def get_last_completed_gw(season: str = DEFAULT_SEASON) -> int:
     - it contains at least one row (not a placeholder)
 
     This avoids trusting future placeholder GW folders.
+    Answered from the season manifest; CSVs are only re-read when they change.
+    """
+
+    last_gw = last_completed_gameweek(_season_path(season), season)
+
+    if last_gw is None:
+        raise RuntimeError("No completed gameweeks found in data")
+
+    return last_gw
+
+
+def get_completed_gws(
+    start_gw: int | None = None,
+    end_gw: int | None = None,
+    season: str = DEFAULT_SEASON,
+) -> list[int]:
+    """
+    Completed gameweeks in [start_gw, end_gw], ascending.
+    """
+
+    return completed_gameweeks(
+        _season_path(season),
+        season,
+        start_gw=start_gw,
+        end_gw=end_gw,
+    )
+
+
+def get_data_version(season: str = DEFAULT_SEASON) -> str:
+    """
+    Changes whenever any raw file of the season changes on disk.
+    """
+
+    return data_version(_season_path(season), season)
+
+
+T = TypeVar("T")
+
+
+def load_concurrently(
+    load: Callable[[int], T],
+    gws: list[int],
+    max_workers: int = LOAD_WORKERS,
+) -> list[T]:
+    """
+    [load(gw) for gw in gws] on up to `max_workers` threads.
+
+    NOTE:
+    - Results keep `gws` order; if loads fail, the exception of the
+      earliest failing GW is raised, as a sequential loop would
+    - max_workers <= 1 runs in the calling thread
+    """
+
+    if max_workers <= 1 or len(gws) <= 1:
+        return [load(gw) for gw in gws]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(gws))) as pool:
+        return list(pool.map(load, gws))
+
+
+def _projection(columns: list[str] | None, required: list[str]):
+    """
+    (read_csv usecols, cache variant) for a column projection; loading
+    everything when projection is off or no columns are given.
+    """
+
+    if not COMPACT_TABLES:
+        return None, "full"
+
+    if columns is None:
+        return None, "compact"
+
+    wanted = raw_columns(list(columns) + required)
+    variant = "compact:" + ",".join(sorted(wanted))
+    return (lambda c: c in wanted), variant
+
+
+def _finish(df: pd.DataFrame) -> pd.DataFrame:
+    return compact_dtypes(df) if COMPACT_TABLES else df
+
+
+@traced("parse_player_gameweek_csv")
+def _read_player_gameweek_csv(
+    path: Path,
+    gw: int,
+    usecols=None,
+) -> pd.DataFrame:
+    df = pd.read_csv(path, usecols=usecols)
+    if df.empty:
+        return df  # placeholder GW, left for the caller to skip
+
+    df["gameweek"] = gw
+    return _finish(normalize_player_gameweek_df(df))
+
+
+def _gameweek_loader(
+    season: str,
+    columns: list[str] | None,
+) -> Callable[[int], pd.DataFrame | None]:
+    """
+    Loads one GW's normalized stats; None for a missing or placeholder
+    file.
     """
 
     base = _season_path(season)
-    completed_gws = []
+    usecols, variant = _projection(columns, ["player_id", "minutes"])
 
-    for p in base.iterdir():
-        if not p.is_dir() or not p.name.startswith("GW"):
-            continue
+    def load(gw: int) -> pd.DataFrame | None:
+        path = base / f"GW{gw}" / "player_gameweek_stats.csv"
+        if not path.exists():
+            return None
 
-        try:
-            gw = int(p.name.replace("GW", ""))
-        except ValueError:
-            continue
+        df = read_cached(
+            path,
+            season=season,
+            gw=gw,
+            build=lambda p: _read_player_gameweek_csv(p, gw, usecols),
+            variant=variant,
+        )
+        return None if df.empty else df
 
-        stats_path = p / "player_gameweek_stats.csv"
-        if not stats_path.exists():
-            continue
+    return load
 
-        df = pd.read_csv(stats_path)
-        if len(df) == 0:
-            continue  # placeholder GW
 
-        completed_gws.append(gw)
+def _concat_gameweeks(frames: list[pd.DataFrame | None]) -> pd.DataFrame:
+    dfs = [df for df in frames if df is not None]
 
-    if not completed_gws:
-        raise RuntimeError("No completed gameweeks found in data")
+    if not dfs:
+        raise RuntimeError("No player_gameweek_stats loaded")
 
-    return max(completed_gws)
+    return pd.concat(dfs, ignore_index=True)
 
 
+@traced()
 def load_player_gameweeks(
     gws: list[int],
     season: str = DEFAULT_SEASON,
+    columns: list[str] | None = None,
+    max_workers: int = LOAD_WORKERS,
 ) -> pd.DataFrame:
     """
     Load and normalize player_gameweek_stats for multiple GWs.
@@ -75,36 +221,72 @@ def load_player_gameweeks(
     NOTE:
     - This function is the SINGLE source of truth for `gameweek`.
     - Schema normalizers must NOT create or rename gameweek.
+    - Normalized frames are served from the columnar cache when fresh.
+    - `columns` projects the CSV read to those (normalized) columns plus
+      player_id/gameweek/minutes; values are stored in compact dtypes
+      (see schema.compact_dtypes) unless FPL_FULL_TABLES is set
+    - GW files are read on up to `max_workers` threads (see
+      load_concurrently); rows stay in `gws` order either way
     """
 
-    dfs = []
-    base = _season_path(season)
+    return _concat_gameweeks(
+        load_concurrently(
+            _gameweek_loader(season, columns), list(gws), max_workers
+        )
+    )
 
-    for gw in gws:
-        path = base / f"GW{gw}" / "player_gameweek_stats.csv"
-        if not path.exists():
-            continue
 
-        df = pd.read_csv(path)
-        if df.empty:
-            continue
+async def load_player_gameweeks_async(
+    gws: list[int],
+    season: str = DEFAULT_SEASON,
+    columns: list[str] | None = None,
+    max_workers: int = LOAD_WORKERS,
+) -> pd.DataFrame:
+    """
+    Awaitable load_player_gameweeks for callers already on an event loop.
+
+    GW files are read in the loop's default executor, at most
+    `max_workers` at a time; order and errors match the sync version.
+    """
 
-        df["gameweek"] = gw
-        df = normalize_player_gameweek_df(df)
-        dfs.append(df)
+    load = _gameweek_loader(season, columns)
+    slots = asyncio.Semaphore(max(max_workers, 1))
 
-    if not dfs:
-        raise RuntimeError("No player_gameweek_stats loaded")
+    async def load_one(gw: int) -> pd.DataFrame | None:
+        async with slots:
+            return await asyncio.to_thread(load, gw)
 
-    return pd.concat(dfs, ignore_index=True)
+    frames = await asyncio.gather(
+        *(load_one(gw) for gw in gws), return_exceptions=True
+    )
+
+    for frame in frames:
+        if isinstance(frame, BaseException):
+            raise frame
+
+    return _concat_gameweeks(frames)
 
 
+@traced("parse_players_csv")
+def _read_players_csv(path: Path, usecols=None) -> pd.DataFrame:
+    return _finish(normalize_players_df(pd.read_csv(path, usecols=usecols)))
+
+
+@traced("parse_fixtures_csv")
+def _read_fixtures_csv(path: Path) -> pd.DataFrame:
+    return normalize_fixtures_df(pd.read_csv(path))
+
+
+@traced()
 def load_players(
     gw: int,
     season: str = DEFAULT_SEASON,
+    columns: list[str] | None = None,
 ) -> pd.DataFrame:
     """
     Load and normalize players.csv for a specific GW snapshot.
+
+    `columns` projects the read like in load_player_gameweeks.
     """
 
     path = _season_path(season) / f"GW{gw}" / "players.csv"
@@ -112,10 +294,20 @@ def load_players(
     if not path.exists():
         raise FileNotFoundError(path)
 
-    df = pd.read_csv(path)
-    return normalize_players_df(df)
+    usecols, variant = _projection(
+        columns, ["player_id", "team_code", "position"]
+    )
+
+    return read_cached(
+        path,
+        season=season,
+        gw=gw,
+        build=lambda p: _read_players_csv(p, usecols),
+        variant=variant,
+    )
 
 
+@traced()
 def load_fixtures(
     gw: int,
     season: str = DEFAULT_SEASON,
@@ -129,5 +321,109 @@ def load_fixtures(
     if not path.exists():
         raise FileNotFoundError(path)
 
-    df = pd.read_csv(path)
-    return normalize_fixtures_df(df)
\ No newline at end of file
+    return read_cached(
+        path,
+        season=season,
+        gw=gw,
+        build=_read_fixtures_csv,
+    )
+
+
+def iter_season_gameweeks(
+    seasons: list[str],
+    prefetch: int = SEASON_PREFETCH,
+    columns: list[str] | None = None,
+) -> Iterator[tuple[str, pd.DataFrame]]:
+    """
+    Yields (season, all completed player_gameweek_stats) in `seasons`
+    order. The next `prefetch` seasons load on background threads while
+    the caller works on the current one.
+
+    NOTE:
+    - At most prefetch + 1 seasons are held at once, so callers that
+      stream season by season keep memory bounded
+    """
+
+    def load(season: str) -> pd.DataFrame:
+        return load_player_gameweeks(
+            get_completed_gws(season=season), season, columns=columns
+        )
+
+    remaining = iter(seasons)
+    pending: deque = deque()
+
+    with ThreadPoolExecutor(max_workers=max(prefetch, 1)) as pool:
+
+        def submit_next():
+            season = next(remaining, None)
+            if season is not None:
+                pending.append((season, pool.submit(load, season)))
+
+        for _ in range(prefetch + 1):
+            submit_next()
+
+        while pending:
+            season, future = pending.popleft()
+            season_df = future.result()
+            submit_next()
+            yield season, season_df
+
+
+@traced()
+def load_player_id_map(seasons: list[str]) -> pd.DataFrame:
+    """
+    (season, player_id, player_key) for every player seen in a completed
+    GW snapshot of `seasons`.
+
+    `player_key` is the same for one player in every season: FPL's stable
+    `code` where players.csv has it, overridden by PLAYER_ID_MAP_FILE
+    links. Players without either get a season-unique key, so their form
+    never crosses a season boundary.
+    """
+
+    frames = []
+
+    for i, season in enumerate(seasons):
+        gws = get_completed_gws(season=season)
+        snapshots = pd.concat(
+            [
+                load_players(gw, season=season, columns=PLAYER_CODE_COLUMNS)
+                for gw in gws
+            ],
+            ignore_index=True,
+        ).drop_duplicates("player_id", keep="last")
+
+        code_col = next(
+            (c for c in PLAYER_CODE_COLUMNS if c in snapshots.columns), None
+        )
+        unlinked = UNLINKED_KEY_OFFSET * (i + 1) + snapshots["player_id"]
+        key = (
+            snapshots[code_col].fillna(unlinked)
+            if code_col is not None
+            else unlinked
+        )
+
+        frames.append(pd.DataFrame({
+            "season": season,
+            "player_id": snapshots["player_id"].to_numpy(),
+            "player_key": key.astype("int64").to_numpy(),
+        }))
+
+    id_map = pd.concat(frames, ignore_index=True)
+
+    links_path = DATA_ROOT / PLAYER_ID_MAP_FILE
+    if links_path.exists():
+        links = pd.read_csv(links_path, dtype={"season": str})
+        id_map = id_map.merge(
+            links[["season", "player_id", "player_key"]],
+            on=["season", "player_id"],
+            how="left",
+            suffixes=("", "_link"),
+        )
+        id_map["player_key"] = (
+            id_map.pop("player_key_link")
+            .fillna(id_map["player_key"])
+            .astype("int64")
+        )
+
+    return id_map
@@ -0,0 +1,190 @@
+"""
+Persistent per-season manifest of gameweek folders.
+
+For every GW folder the manifest records which raw files exist together
+with their size, mtime and row count. It is refreshed incrementally:
+only files whose stat changed are re-counted, so answering
+"what is the last completed GW" no longer parses any CSV.
+
+A gameweek is COMPLETED only if:
+- player_gameweek_stats.csv exists
+- it contains at least one row (not a placeholder)
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+from src.data.cache import CACHE_ROOT
+
+MANIFEST_DIR = CACHE_ROOT / "manifests"
+MANIFEST_VERSION = 1
+
+STATS_FILE = "player_gameweek_stats.csv"
+TRACKED_FILES = [STATS_FILE, "players.csv", "fixtures.csv"]
+
+# manifest path -> manifest dict, so repeated lookups skip the JSON read
+_loaded: dict[Path, dict] = {}
+
+
+def _manifest_path(season_dir: Path, season: str) -> Path:
+    dir_hash = hashlib.sha1(os.path.abspath(season_dir).encode()).hexdigest()
+    return MANIFEST_DIR / f"{season}_{dir_hash[:10]}.json"
+
+
+def _count_rows(path: Path) -> int:
+    if path.stat().st_size == 0:
+        return 0
+    return len(pd.read_csv(path, usecols=[0]))
+
+
+def _load(manifest_path: Path) -> dict:
+    if manifest_path in _loaded:
+        return _loaded[manifest_path]
+
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = None
+
+    if manifest is None or manifest.get("version") != MANIFEST_VERSION:
+        manifest = {"version": MANIFEST_VERSION, "gameweeks": {}}
+
+    return manifest
+
+
+def _save(manifest_path: Path, manifest: dict) -> None:
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    # unique per writer: threads of one process share the pid
+    tmp_path = manifest_path.with_suffix(f".tmp-{uuid.uuid4().hex}")
+    tmp_path.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    os.replace(tmp_path, manifest_path)
+
+
+def _scan_gw_dir(gw_dir: Path, previous: dict | None) -> dict:
+    """
+    Stats the tracked files, re-counting rows only where size/mtime moved.
+
+    Files are stat'ed even when the folder mtime is unchanged: in-place
+    rewrites (e.g. a placeholder CSV filled with results) do not move it.
+    """
+
+    old_files = (previous or {}).get("files", {})
+    files = {}
+
+    for name in TRACKED_FILES:
+        path = gw_dir / name
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+
+        old = old_files.get(name)
+        if (
+            old is not None
+            and old["size"] == stat.st_size
+            and old["mtime_ns"] == stat.st_mtime_ns
+        ):
+            files[name] = old
+            continue
+
+        files[name] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "rows": _count_rows(path),
+        }
+
+    return {"dir_mtime_ns": gw_dir.stat().st_mtime_ns, "files": files}
+
+
+def refresh_manifest(season_dir: Path, season: str) -> dict:
+    """
+    Brings the season manifest in line with the folders on disk.
+
+    Cost is one directory listing plus a few stat calls per GW folder;
+    CSVs are only opened when they are new or have changed.
+    """
+
+    manifest_path = _manifest_path(season_dir, season)
+    manifest = _load(manifest_path)
+    old_gws = manifest["gameweeks"]
+
+    gameweeks = {}
+    changed = False
+
+    for p in season_dir.iterdir():
+        if not p.is_dir() or not p.name.startswith("GW"):
+            continue
+
+        try:
+            gw = int(p.name.replace("GW", ""))
+        except ValueError:
+            continue
+
+        entry = _scan_gw_dir(p, old_gws.get(str(gw)))
+        changed |= entry != old_gws.get(str(gw))
+        gameweeks[str(gw)] = entry
+
+    changed |= gameweeks.keys() != old_gws.keys()
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "season": season,
+        "season_dir": os.path.abspath(season_dir),
+        "gameweeks": gameweeks,
+        "completed": sorted(
+            int(gw)
+            for gw, entry in gameweeks.items()
+            if entry["files"].get(STATS_FILE, {}).get("rows", 0) > 0
+        ),
+    }
+
+    if changed or not manifest_path.exists():
+        _save(manifest_path, manifest)
+
+    _loaded[manifest_path] = manifest
+    return manifest
+
+
+def completed_gameweeks(
+    season_dir: Path,
+    season: str,
+    start_gw: int | None = None,
+    end_gw: int | None = None,
+) -> list[int]:
+    """
+    Completed GWs in [start_gw, end_gw] (inclusive, either bound optional).
+    """
+
+    completed = refresh_manifest(season_dir, season)["completed"]
+
+    return [
+        gw
+        for gw in completed
+        if (start_gw is None or gw >= start_gw)
+        and (end_gw is None or gw <= end_gw)
+    ]
+
+
+def data_version(season_dir: Path, season: str) -> str:
+    """
+    Fingerprint of every tracked file's size/mtime in the season.
+
+    Changes whenever any raw GW file is added, removed or rewritten.
+    """
+
+    gameweeks = refresh_manifest(season_dir, season)["gameweeks"]
+    payload = json.dumps(
+        {gw: entry["files"] for gw, entry in gameweeks.items()},
+        sort_keys=True,
+    )
+    return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+
+def last_completed_gameweek(season_dir: Path, season: str) -> int | None:
+    completed = refresh_manifest(season_dir, season)["completed"]
+    return completed[-1] if completed else None
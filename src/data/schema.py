@@ -9,10 +9,28 @@ This module is the ONLY place where we:
 IMPORTANT:
 - Loaders define `gameweek`
 - Normalizers NEVER invent or override `gameweek`
+- Normalizers work on the frame the loader just read; they do not copy it
 """
 
+import numpy as np
 import pandas as pd
 
+# raw CSV names that normalize to each column, for column projection
+COLUMN_ALIASES = {
+    "player_id": ["id"],
+    "position": ["element_type"],
+    "gameweek": ["event", "gw"],
+}
+
+# joined on and offset (e.g. multi-season GW timelines): never downcast
+KEY_COLUMNS = {"player_id", "gameweek", "code", "player_code"}
+
+# lexical order, so sorting a categorical matches sorting the strings
+POSITION_CATEGORIES = ["Defender", "Forward", "Goalkeeper", "Midfielder"]
+CATEGORICAL_COLUMNS = ["position", "web_name"]
+
+COMPACT_INT_DTYPES = [np.int16, np.int32]
+
 def _require_columns(df: pd.DataFrame, required: list, context: str):
     missing = [c for c in required if c not in df.columns]
     if missing:
@@ -25,6 +43,80 @@ def _rename_if_present(df: pd.DataFrame, mapping: dict) -> pd.DataFrame:
     rename_map = {k: v for k, v in mapping.items() if k in df.columns}
     return df.rename(columns=rename_map)
 
+def raw_columns(columns: list[str]) -> set[str]:
+    """
+    Raw CSV names to read so that `columns` exist after normalization.
+    """
+
+    wanted = set(columns)
+    for column in columns:
+        wanted.update(COLUMN_ALIASES.get(column, []))
+    return wanted
+
+
+def _compact_ints(values: np.ndarray) -> np.ndarray:
+    if not len(values):
+        return values.astype(COMPACT_INT_DTYPES[0])
+
+    low, high = values.min(), values.max()
+    for dtype in COMPACT_INT_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return values.astype(dtype)
+    return values
+
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Downcasts a normalized frame in place, losslessly.
+
+    - integers (and NaN-free whole-number floats) -> int16, else int32
+    - other floats -> float32 only where every value round-trips exactly,
+      so features built from them are unchanged
+    - position / web_name -> categoricals
+    - KEY_COLUMNS and bools are left alone
+    """
+
+    for col in df.columns:
+        if col in KEY_COLUMNS:
+            continue
+
+        dtype = df[col].dtype
+
+        if col in CATEGORICAL_COLUMNS and not isinstance(
+            dtype, pd.CategoricalDtype
+        ):
+            categories = None
+            if col == "position":
+                categories = sorted(
+                    set(POSITION_CATEGORIES)
+                    | set(df[col].dropna().unique())
+                )
+            df[col] = pd.Categorical(df[col], categories=categories)
+            continue
+
+        if not isinstance(dtype, np.dtype) or dtype.kind not in "iuf":
+            continue
+
+        values = df[col].to_numpy()
+
+        if dtype.kind in "iu":
+            df[col] = _compact_ints(values)
+            continue
+
+        finite = np.isfinite(values).all()
+        if finite and (values == np.round(values)).all():
+            df[col] = _compact_ints(values.astype(np.int64))
+            continue
+
+        as_float32 = values.astype(np.float32)
+        same = (as_float32.astype(values.dtype) == values) | np.isnan(values)
+        if same.all():
+            df[col] = as_float32
+
+    return df
+
+
 def normalize_player_gameweek_df(df: pd.DataFrame) -> pd.DataFrame:
     """
     Normalizes player_gameweek_stats.csv across seasons.
@@ -35,8 +127,6 @@ def normalize_player_gameweek_df(df: pd.DataFrame) -> pd.DataFrame:
     - minutes
     """
 
-    df = df.copy()
-
     df = _rename_if_present(
         df,
         {
@@ -66,8 +156,6 @@ def normalize_players_df(df: pd.DataFrame) -> pd.DataFrame:
     - position
     """
 
-    df = df.copy()
-
     df = _rename_if_present(
         df,
         {
@@ -112,8 +200,6 @@ def normalize_fixtures_df(df: pd.DataFrame) -> pd.DataFrame:
     - gameweek
     """
 
-    df = df.copy()
-
     df = _rename_if_present(
         df,
         {
@@ -0,0 +1,544 @@
+"""
+Monte Carlo points distributions: ceiling and risk on top of EV.
+
+The position models predict expected points only. simulate_points turns
+each prediction row (predict_ranks output: calibrated predicted_points
+plus the rolling-form and fixture features) into a distribution by
+sampling a whole match per simulation:
+
+1. minutes     none / cameo / 60+, from appearances_last_5 and
+               minutes_avg_last_5
+2. events      goals and assists ~ Poisson(xG / xA per 90, scaled by
+               minutes played and fixture_difficulty); goals conceded
+               while on the pitch ~ Poisson(league rate shifted by
+               effective_elo_diff); saves and defensive contributions
+               ~ Poisson(per-90 form)
+3. scoring     FPL rules by position (see src/config/constants.py):
+               appearance, goals, assists, clean sheet, goals conceded,
+               saves, defensive contribution
+
+Every draw is vectorized over a (rows x simulations) array, CHUNK_ELEMENTS
+at a time, so memory stays bounded for any pool size or simulation count.
+
+The distributions are anchored to the EV model so the analytic mean of
+the simulated points equals predicted_points:
+
+1. the play probability is rescaled (the form's cameo / full split and
+   per-appearance scoring are kept), up to MAX_PLAY_PROBABILITY
+2. above that, more appearances become full matches, then xG/xA rates
+   scale up to ATTACK_SCALE_MAX
+3. what none of these can absorb is a residual shift, spread over the
+   simulations where the player appears; shifted samples are clipped to
+   the lowest simulated score, and rows with |ev_shift| above
+   ANCHOR_TOLERANCE are not fully anchored (see unanchored_rows)
+
+NOTE:
+- Bonus points are not simulated (the EV anchor absorbs their mean)
+- Double GWs sum their fixtures' draws; players are independent, so
+  results are per-player marginals (no teammate correlation)
+
+Usage:
+    python -m src.decision.simulate --gws 1 --sims 20000 --top 10
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from src.config.constants import (
+    APPEARANCE_POINTS,
+    ASSIST_POINTS,
+    ATTACK_SCALE_MAX,
+    CAMEO_MINUTES,
+    CLEAN_SHEET_POINTS,
+    DEFCON_POINTS,
+    DEFCON_THRESHOLDS,
+    FULL_MATCH_MINUTES,
+    GOAL_POINTS,
+    GOALS_CONCEDED_POSITIONS,
+    GOALS_CONCEDED_STEP,
+    GOALS_ELO_SCALE,
+    HAUL_POINTS,
+    LEAGUE_GOALS_PER_TEAM,
+    LONG_APPEARANCE_MINUTES,
+    LONG_APPEARANCE_POINTS,
+    MAX_PLAY_PROBABILITY,
+    ROLLING_WINDOWS,
+    SAVES_PER_POINT,
+)
+
+SIMULATIONS = 20_000
+
+# (rows x simulations) elements drawn at once; ~8MB per float64 array
+CHUNK_ELEMENTS = 2 ** 20
+
+PERCENTILES = [10, 25, 50, 75, 90]
+
+# |ev_shift| (points) above which a row's distribution is reported as
+# not anchored to its EV by play probability and xG/xA alone
+ANCHOR_TOLERANCE = 0.05
+
+# Poisson support used for the analytic expectations
+POISSON_SUPPORT = 64
+
+FORM_WINDOW = max(ROLLING_WINDOWS)
+
+# columns simulate_points reads from the prediction rows
+REQUIRED_COLUMNS = [
+    "player_id", "position", "target_gw", "predicted_points",
+    "appearances_last_5", "minutes_avg_last_5",
+    "xg_avg_last_5", "xa_avg_last_5",
+    "saves_avg_last_5", "defcon_avg_last_5",
+    "fixture_difficulty", "effective_elo_diff",
+]
+
+# descriptive columns carried into the results when present
+INFO_COLUMNS = ["web_name", "position", "team_code"]
+
+
+def _per_90(values: np.ndarray, minutes: np.ndarray) -> np.ndarray:
+    """
+    Per-appearance averages as per-90 rates (0 without minutes).
+    """
+
+    safe = np.where(minutes > 0, minutes, 1.0)
+    return np.where(minutes > 0, values * FULL_MATCH_MINUTES / safe, 0.0)
+
+
+def _poisson_pmf(lam: np.ndarray) -> np.ndarray:
+    """
+    (rows, POISSON_SUPPORT) probabilities of 0, 1, ... events.
+    """
+
+    k = np.arange(POISSON_SUPPORT)
+    log_factorial = np.concatenate([[0.0], np.cumsum(np.log(k[1:]))])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_lam = np.where(k == 0, 0.0, k * np.log(lam[:, None]))
+    log_pmf = log_lam - lam[:, None] - log_factorial
+    return np.exp(log_pmf)
+
+
+def _at_least(lam: np.ndarray, threshold: np.ndarray) -> np.ndarray:
+    """
+    P(Poisson(lam) >= threshold) per row; 0 where threshold is 0 (no
+    reward to reach).
+    """
+
+    k = np.arange(POISSON_SUPPORT)
+    reached = (_poisson_pmf(lam) * (k >= threshold[:, None])).sum(axis=1)
+    return np.where(threshold > 0, reached, 0.0)
+
+
+def fixture_rates(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    """
+    Per-row minutes probabilities, per-90 event rates and scoring values.
+    """
+
+    position = df["position"].astype(str).to_numpy()
+    minutes = df["minutes_avg_last_5"].to_numpy(dtype=np.float64)
+
+    p_play = np.minimum(
+        df["appearances_last_5"].to_numpy(dtype=np.float64) / FORM_WINDOW,
+        MAX_PLAY_PROBABILITY,
+    )
+    # cameo / full split that reproduces the average minutes
+    p_full = np.clip(
+        (minutes - CAMEO_MINUTES) / (FULL_MATCH_MINUTES - CAMEO_MINUTES),
+        0.0,
+        1.0,
+    )
+
+    elo_diff = np.nan_to_num(
+        df["effective_elo_diff"].to_numpy(dtype=np.float64)
+    )
+    fixture = np.nan_to_num(
+        df["fixture_difficulty"].to_numpy(dtype=np.float64), nan=1.0
+    )
+
+    def per_position(values: dict, default=0) -> np.ndarray:
+        return np.array([values.get(p, default) for p in position])
+
+    defcon_90 = _per_90(
+        df["defcon_avg_last_5"].to_numpy(dtype=np.float64), minutes
+    )
+    defcon_threshold = per_position(DEFCON_THRESHOLDS)
+
+    return {
+        "p_play": p_play,
+        "full_split": p_full,
+        "p_full": p_play * p_full,
+        "p_cameo": p_play * (1.0 - p_full),
+        "goals_90": fixture * _per_90(
+            df["xg_avg_last_5"].to_numpy(dtype=np.float64), minutes
+        ),
+        "assists_90": fixture * _per_90(
+            df["xa_avg_last_5"].to_numpy(dtype=np.float64), minutes
+        ),
+        "saves_90": _per_90(
+            df["saves_avg_last_5"].to_numpy(dtype=np.float64), minutes
+        ),
+        "conceded_90": (
+            LEAGUE_GOALS_PER_TEAM * 10.0 ** (-elo_diff / GOALS_ELO_SCALE)
+        ),
+        # only reaching the threshold scores, so keep P(reached) per outcome
+        "defcon_full": _at_least(defcon_90, defcon_threshold),
+        "defcon_cameo": _at_least(
+            defcon_90 * CAMEO_MINUTES / FULL_MATCH_MINUTES, defcon_threshold
+        ),
+        "goal_points": per_position(GOAL_POINTS),
+        "clean_sheet_points": per_position(CLEAN_SHEET_POINTS),
+        "concedes": np.isin(position, GOALS_CONCEDED_POSITIONS),
+        "saves": position == "Goalkeeper",
+    }
+
+
+def _appearance_points(minutes: float) -> int:
+    if minutes >= LONG_APPEARANCE_MINUTES:
+        return LONG_APPEARANCE_POINTS
+    return APPEARANCE_POINTS if minutes > 0 else 0
+
+
+def expected_points(
+    rates: dict[str, np.ndarray],
+    attack_scale: np.ndarray | float = 1.0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Analytic mean of the simulated points, split into (everything but
+    goals and assists, goals and assists at `attack_scale`).
+    """
+
+    k = np.arange(POISSON_SUPPORT)
+    base = np.zeros(len(rates["p_full"]))
+    attack = np.zeros(len(rates["p_full"]))
+
+    for minutes, p, defcon in [
+        (FULL_MATCH_MINUTES, rates["p_full"], rates["defcon_full"]),
+        (CAMEO_MINUTES, rates["p_cameo"], rates["defcon_cameo"]),
+    ]:
+        share = minutes / FULL_MATCH_MINUTES
+
+        conceded = _poisson_pmf(rates["conceded_90"] * share)
+        saves = _poisson_pmf(rates["saves_90"] * share)
+
+        points = np.full(len(base), float(_appearance_points(minutes)))
+        if minutes >= LONG_APPEARANCE_MINUTES:
+            points += rates["clean_sheet_points"] * conceded[:, 0]
+        points -= rates["concedes"] * (
+            conceded @ (k // GOALS_CONCEDED_STEP)
+        )
+        points += rates["saves"] * (saves @ (k // SAVES_PER_POINT))
+        points += DEFCON_POINTS * defcon
+
+        base += p * points
+        attack += p * share * (
+            rates["goal_points"] * rates["goals_90"]
+            + ASSIST_POINTS * rates["assists_90"]
+        )
+
+    return base, attack * attack_scale
+
+
+def anchor_to_ev(
+    rates: dict[str, np.ndarray],
+    predicted_points: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (play_prob, full_split, attack_scale, shift) per row so the simulated
+    mean equals predicted_points.
+
+    The mean is linear in each lever, applied in turn while a gap is left:
+
+    1. play probability, in [0, MAX_PLAY_PROBABILITY]: matches any EV up
+       to that many appearances of the form's per-appearance points
+    2. full-match share of appearances, up to 1
+    3. xG/xA scale, up to ATTACK_SCALE_MAX
+
+    Only the rest (or a negative EV) is left to the shift.
+    """
+
+    n = len(predicted_points)
+    full_base, full_attack = expected_points(
+        {**rates, "p_full": np.ones(n), "p_cameo": np.zeros(n)}
+    )
+    cameo_base, cameo_attack = expected_points(
+        {**rates, "p_full": np.zeros(n), "p_cameo": np.ones(n)}
+    )
+    full = full_base + full_attack
+    cameo = cameo_base + cameo_attack
+
+    split = rates["full_split"]
+    per_appearance = split * full + (1.0 - split) * cameo
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        play = np.where(
+            per_appearance > 0,
+            predicted_points / per_appearance,
+            rates["p_play"],
+        )
+        play = np.clip(play, 0.0, MAX_PLAY_PROBABILITY)
+
+        gap = predicted_points - play * per_appearance
+        gain = play * (full - cameo)
+        split = np.where(
+            (gap > 0) & (gain > 0),
+            np.clip(split + gap / gain, split, 1.0),
+            split,
+        )
+
+        base = play * (split * full_base + (1.0 - split) * cameo_base)
+        attack = play * (split * full_attack + (1.0 - split) * cameo_attack)
+
+        gap = predicted_points - (base + attack)
+        scale = np.where(
+            (gap > 0) & (attack > 0), 1.0 + gap / attack, 1.0
+        )
+    scale = np.clip(scale, 1.0, ATTACK_SCALE_MAX)
+
+    return play, split, scale, predicted_points - (base + attack * scale)
+
+
+def _draw_poisson(
+    rng: np.random.Generator,
+    lam: np.ndarray,
+    rows: np.ndarray,
+) -> np.ndarray:
+    """
+    Poisson(lam) draws for the rows in the `rows` mask, 0 elsewhere.
+    """
+
+    out = np.zeros(lam.shape, dtype=np.int64)
+    if rows.any():
+        out[rows] = rng.poisson(lam[rows])
+    return out
+
+
+def _simulate_rows(
+    rates: dict[str, np.ndarray],
+    rows: slice,
+    n_sims: int,
+    rng: np.random.Generator,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (points, played), both (rows, n_sims), for one chunk of prediction
+    rows: sampled points before the EV shift (so still whole FPL points)
+    and whether the player appeared.
+
+    Events are only drawn where scoring needs their count: goals
+    conceded for positions losing points to them (the rest only need a
+    clean sheet coin), saves for goalkeepers; defensive contributions
+    are a coin with the threshold probability.
+    """
+
+    r = {name: values[rows, None] for name, values in rates.items()}
+    shape = (len(r["p_full"]), n_sims)
+
+    # minutes outcome: 0 did not play, 1 cameo, 2 full match
+    u = rng.random(shape)
+    outcome = (u < r["p_full"] + r["p_cameo"]).astype(np.int8)
+    outcome += u < r["p_full"]
+
+    minutes = np.array([0, CAMEO_MINUTES, FULL_MATCH_MINUTES])
+    share = (minutes / FULL_MATCH_MINUTES).take(outcome)
+    points = np.array(
+        [_appearance_points(m) for m in minutes], dtype=np.int32
+    ).take(outcome)
+    long_appearance = (minutes >= LONG_APPEARANCE_MINUTES).take(outcome)
+
+    attack = r["attack_scale"] * share
+    points += r["goal_points"] * rng.poisson(r["goals_90"] * attack)
+    points += ASSIST_POINTS * rng.poisson(r["assists_90"] * attack)
+
+    concedes = rates["concedes"][rows]
+    conceded = _draw_poisson(rng, r["conceded_90"] * share, concedes)
+    points -= conceded // GOALS_CONCEDED_STEP
+
+    clean_sheet = conceded == 0
+    others = ~concedes & (rates["clean_sheet_points"][rows] > 0)
+    if others.any():
+        clean_sheet[others] = (
+            rng.random((others.sum(), n_sims))
+            < np.exp(-r["conceded_90"][others] * share[others])
+        )
+    points += r["clean_sheet_points"] * (long_appearance & clean_sheet)
+
+    saves = _draw_poisson(
+        rng, r["saves_90"] * share, rates["saves"][rows]
+    )
+    points += saves // SAVES_PER_POINT
+
+    defcon = (
+        r["defcon_full"] * (outcome == 2) + r["defcon_cameo"] * (outcome == 1)
+    )
+    points += DEFCON_POINTS * (rng.random(shape) < defcon)
+
+    return points, outcome > 0
+
+
+def simulate_points(
+    predictions: pd.DataFrame,
+    n_sims: int = SIMULATIONS,
+    seed: int | None = None,
+    percentiles: list[int] = PERCENTILES,
+) -> pd.DataFrame:
+    """
+    One row per (player, target GW): predicted_points, the simulated
+    mean and std, `p{q}` percentiles, haul_prob (P(points >=
+    HAUL_POINTS)), expected_appearances (play probability summed over
+    the GW's fixtures) and ev_shift (the part of the EV left to the
+    residual shift; ~0 when anchored).
+
+    `predictions` is predict_ranks output (one row per player and
+    fixture); double GWs sum their fixtures.
+    """
+
+    missing = [c for c in REQUIRED_COLUMNS if c not in predictions.columns]
+    if missing:
+        raise ValueError(f"predictions lack columns: {missing}")
+
+    df = predictions.sort_values(
+        ["player_id", "target_gw"], kind="stable"
+    ).reset_index(drop=True)
+
+    rates = fixture_rates(df)
+    play, split, rates["attack_scale"], rates["shift"] = anchor_to_ev(
+        rates, df["predicted_points"].to_numpy(dtype=np.float64)
+    )
+    rates["p_full"] = play * split
+    rates["p_cameo"] = play * (1.0 - split)
+
+    # rows of a (player, GW) are contiguous; chunks never split one
+    group_start = np.flatnonzero(np.r_[
+        True,
+        (np.diff(df["player_id"].to_numpy()) != 0)
+        | (np.diff(df["target_gw"].to_numpy()) != 0),
+    ])
+    group_bounds = np.r_[group_start, len(df)]
+    group_shift = np.add.reduceat(rates["shift"], group_start)
+    rows_per_chunk = max(1, CHUNK_ELEMENTS // n_sims)
+
+    rng = np.random.default_rng(seed)
+    stats = {"sim_mean": [], "sim_std": [], "haul_prob": []}
+    quantiles = []
+
+    first = 0
+    while first < len(group_start):
+        last = np.searchsorted(
+            group_bounds, group_bounds[first] + rows_per_chunk, side="right"
+        ) - 1
+        last = max(last, first + 1)
+
+        rows = slice(group_bounds[first], group_bounds[last])
+        points, played = _simulate_rows(rates, rows, n_sims, rng)
+
+        # fixtures -> (player, GW) totals
+        starts = group_bounds[first:last] - group_bounds[first]
+        if len(starts) != len(points):
+            points = np.add.reduceat(points, starts, axis=0)
+            played = np.logical_or.reduceat(played, starts, axis=0)
+
+        # the shift lands on appearances only (a player who did not play
+        # scores 0), never below the lowest score the rules produced
+        shift = group_shift[first:last, None]
+        appearances = played.sum(axis=1, keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            per_appearance = np.where(
+                appearances > 0, shift * n_sims / appearances, 0.0
+            )
+        totals = np.maximum(
+            points + per_appearance * played,
+            points.min(axis=1, keepdims=True),
+        )
+
+        stats["sim_mean"].append(totals.mean(axis=1))
+        stats["sim_std"].append(totals.std(axis=1))
+        stats["haul_prob"].append((totals >= HAUL_POINTS).mean(axis=1))
+        quantiles.append(np.percentile(totals, percentiles, axis=1).T)
+
+        first = last
+
+    first_rows = df.iloc[group_start]
+    out = pd.DataFrame({
+        "player_id": first_rows["player_id"].to_numpy(),
+        **{
+            c: first_rows[c].to_numpy()
+            for c in INFO_COLUMNS if c in df.columns
+        },
+        "target_gw": first_rows["target_gw"].to_numpy(),
+        "n_fixtures": np.diff(group_bounds),
+        "predicted_points": np.add.reduceat(
+            df["predicted_points"].to_numpy(dtype=np.float64), group_start
+        ),
+        "expected_appearances": np.add.reduceat(play, group_start),
+        "ev_shift": group_shift,
+        **{name: np.concatenate(values) for name, values in stats.items()},
+    })
+
+    quantiles = np.concatenate(quantiles)
+    for j, q in enumerate(percentiles):
+        out[f"p{q}"] = quantiles[:, j]
+
+    return out
+
+
+def unanchored_rows(
+    sims: pd.DataFrame,
+    tolerance: float = ANCHOR_TOLERANCE,
+) -> pd.DataFrame:
+    """
+    simulate_points rows whose EV needed a residual shift beyond
+    `tolerance` points, largest first.
+    """
+
+    return (
+        sims[sims["ev_shift"].abs() > tolerance]
+        .sort_values("ev_shift", key=np.abs, ascending=False)
+    )
+
+
+if __name__ == "__main__":
+    from src.data.loaders import get_last_completed_gw
+    from src.inference.predict_ranks import predict_ranks
+
+    parser = argparse.ArgumentParser(description="Simulate points")
+    parser.add_argument("--gws", type=int, default=1, help="horizon length")
+    parser.add_argument("--sims", type=int, default=SIMULATIONS)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    current_gw = get_last_completed_gw()
+    predictions = predict_ranks(
+        current_gw=current_gw,
+        target_gws=list(range(current_gw + 1, current_gw + args.gws + 1)),
+    )
+
+    sims = simulate_points(predictions, n_sims=args.sims, seed=args.seed)
+
+    unanchored = unanchored_rows(sims)
+    if not unanchored.empty:
+        print(
+            f"\n{len(unanchored)} of {len(sims)} rows not anchored by play "
+            f"probability and xG/xA (|ev_shift| > {ANCHOR_TOLERANCE}):"
+        )
+        print(
+            unanchored.head(args.top)[[
+                "web_name", "target_gw", "predicted_points",
+                "expected_appearances", "ev_shift",
+            ]]
+            .round(2)
+            .to_string(index=False)
+        )
+
+    for position in sims["position"].unique():
+        print(f"\n--- TOP {args.top} {str(position).upper()} BY CEILING ---")
+        print(
+            sims[sims["position"] == position]
+            .sort_values("p90", ascending=False)
+            .head(args.top)[[
+                "web_name", "target_gw", "predicted_points", "p10",
+                "p50", "p90", "haul_prob",
+            ]]
+            .round(2)
+            .to_string(index=False)
+        )
@@ -0,0 +1,525 @@
+"""
+Full-squad optimizer (wildcard / free hit).
+
+Picks the 15-man squad, plus a starting XI and captain for every GW of
+the horizon, that maximises expected points:
+
+    starters + captain (counted twice) + bench_weight * bench
+
+subject to the budget, 2/5/5/3 squad quotas, valid formations and at
+most MAX_PLAYERS_PER_CLUB per club.
+
+IMPORTANT:
+- method="milp" solves it with scipy.optimize.milp (HiGHS). By default
+  the squad is chosen with ONE XI and captain scored on horizon-summed
+  points (3 variables per player, whatever the horizon), then each GW's
+  XI and captain are re-derived exactly for that squad. This is exact
+  for a 1-GW horizon; for longer horizons it is a best-effort squad
+  (typically within a fraction of a percent of the per-GW model, which
+  per_gw_lineups=True solves, at many times the cost)
+- The greedy squad is scored first and passed to the solver as an
+  objective cutoff, so the search starts from a known incumbent value
+- method="greedy" (and the fallback when SciPy or the solver is not
+  available, or the time limit hits before any solution) fills the squad
+  by horizon points, then picks each GW's XI optimally for that squad
+- MILP_TIME_LIMIT_S keeps a full pool under a second; `optimal` is
+  False when the limit stopped the search
+- Prices and budget are in FPL units (tenths of a million, as `now_cost`)
+"""
+
+import argparse
+import dataclasses
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.config.constants import (
+    BENCH_WEIGHT,
+    FORMATION_LIMITS,
+    MAX_PLAYERS_PER_CLUB,
+    SQUAD_BUDGET,
+    SQUAD_QUOTAS,
+    STARTING_XI_SIZE,
+)
+
+try:
+    from scipy.optimize import Bounds, LinearConstraint, milp
+    from scipy.sparse import coo_array
+except ImportError:  # greedy only
+    milp = None
+
+MILP_TIME_LIMIT_S = 1.0
+
+
+@dataclass(frozen=True)
+class SquadPool:
+    """
+    Candidate players with their expected points per horizon GW.
+    """
+
+    player_ids: np.ndarray   # (players,)
+    web_names: np.ndarray    # (players,)
+    positions: np.ndarray    # (players,)
+    team_codes: np.ndarray   # (players,)
+    prices: np.ndarray       # (players,) tenths of £m
+    points: np.ndarray       # (players, gws)
+    gameweeks: np.ndarray    # (gws,)
+
+    def __len__(self) -> int:
+        return len(self.player_ids)
+
+
+@dataclass(frozen=True)
+class SquadSolution:
+    squad: tuple[int, ...]
+    starting_xi: dict[int, tuple[int, ...]]  # GW -> starters
+    captain: dict[int, int]                  # GW -> player id
+    cost: int
+    expected_points: float
+    method: str
+    optimal: bool
+    solve_seconds: float
+
+
+def build_squad_pool(
+    horizon_df: pd.DataFrame,
+    players: pd.DataFrame,
+) -> SquadPool:
+    """
+    `horizon_df` is predict_horizon output (one row per player and GW,
+    blanks already 0); `players` a normalized players.csv snapshot.
+    """
+
+    points = horizon_df.pivot_table(
+        index="player_id",
+        columns="target_gw",
+        values="predicted_points",
+        aggfunc="sum",
+        fill_value=0.0,
+    )
+
+    meta = (
+        players[["player_id", "web_name", "position", "team_code", "now_cost"]]
+        .drop_duplicates("player_id")
+        .set_index("player_id")
+    )
+    meta = meta[meta["position"].isin(list(SQUAD_QUOTAS))]
+
+    ids = meta.index.intersection(points.index).sort_values()
+    meta = meta.loc[ids]
+
+    return SquadPool(
+        player_ids=ids.to_numpy(),
+        web_names=meta["web_name"].to_numpy(),
+        positions=meta["position"].to_numpy(),
+        team_codes=meta["team_code"].to_numpy(),
+        prices=meta["now_cost"].to_numpy(dtype=np.int64),
+        points=points.loc[ids].to_numpy(dtype=np.float64),
+        gameweeks=points.columns.to_numpy(),
+    )
+
+
+def _pick_lineup(
+    points: np.ndarray,
+    positions: np.ndarray,
+    squad: np.ndarray,
+) -> tuple[np.ndarray, int]:
+    """
+    Best XI and captain for a fixed squad on one GW.
+
+    Formation minimums are filled with each position's best players, the
+    remaining spots go to the best players left within the maximums;
+    for bound-per-position constraints this greedy is optimal.
+    """
+
+    order = squad[np.argsort(-points[squad], kind="stable")]
+    starters = []
+    counts = dict.fromkeys(FORMATION_LIMITS, 0)
+
+    for position, (low, _) in FORMATION_LIMITS.items():
+        best = [i for i in order if positions[i] == position][:low]
+        starters += best
+        counts[position] += len(best)
+
+    chosen = set(starters)
+    for i in order:
+        if len(starters) == STARTING_XI_SIZE:
+            break
+        position = positions[i]
+        if i in chosen or counts[position] >= FORMATION_LIMITS[position][1]:
+            continue
+        starters.append(i)
+        counts[position] += 1
+
+    starters = np.array(starters)
+    captain = starters[np.argmax(points[starters])]
+
+    return starters, captain
+
+
+def _lineup_points(
+    pool: SquadPool,
+    squad: np.ndarray,
+    bench_weight: float,
+) -> tuple[float, dict, dict]:
+    total = 0.0
+    xi = {}
+    captains = {}
+
+    for g, gw in enumerate(pool.gameweeks):
+        points = pool.points[:, g]
+        starters, captain = _pick_lineup(points, pool.positions, squad)
+
+        total += (
+            points[starters].sum()
+            + points[captain]
+            + bench_weight * (points[squad].sum() - points[starters].sum())
+        )
+        xi[int(gw)] = starters
+        captains[int(gw)] = captain
+
+    return total, xi, captains
+
+
+def _greedy_squad(pool: SquadPool, budget: int) -> np.ndarray:
+    """
+    Takes players by horizon points while the remaining slots can still be
+    filled with the cheapest players left at each position.
+    """
+
+    value = pool.points.sum(axis=1)
+    need = dict(SQUAD_QUOTAS)
+    clubs: dict[int, int] = {}
+    chosen: list[int] = []
+    spent = 0
+
+    cheapest = {
+        p: np.flatnonzero(pool.positions == p)[
+            np.argsort(pool.prices[pool.positions == p], kind="stable")
+        ]
+        for p in SQUAD_QUOTAS
+    }
+
+    def reserve(taken: set) -> int:
+        # cheapest fill of the open slots from clubs that still have room
+        total = 0
+        room = dict(clubs)
+        for position, k in need.items():
+            for j in cheapest[position]:
+                if k == 0:
+                    break
+                team = pool.team_codes[j]
+                if j in taken or room.get(team, 0) >= MAX_PLAYERS_PER_CLUB:
+                    continue
+                room[team] = room.get(team, 0) + 1
+                total += pool.prices[j]
+                k -= 1
+            if k > 0:
+                return budget + 1
+        return total
+
+    for i in np.argsort(-value, kind="stable"):
+        position, team = pool.positions[i], pool.team_codes[i]
+        if need[position] == 0 or clubs.get(team, 0) >= MAX_PLAYERS_PER_CLUB:
+            continue
+
+        need[position] -= 1
+        clubs[team] = clubs.get(team, 0) + 1
+
+        if spent + pool.prices[i] + reserve(set(chosen) | {i}) > budget:
+            need[position] += 1
+            clubs[team] -= 1
+            continue
+
+        chosen.append(i)
+        spent += pool.prices[i]
+
+        if len(chosen) == sum(SQUAD_QUOTAS.values()):
+            return np.array(chosen)
+
+    raise ValueError("Greedy could not fill a valid squad within budget")
+
+
+def _undominated_rows(pool: SquadPool) -> np.ndarray:
+    """
+    Rows that may appear in an optimal squad.
+
+    Player j dominates i (same position) when it is no dearer and scores
+    at least as much in every GW. i can be dropped when the optimum can
+    always swap it for a dominator not already in the squad: either
+    quota-many dominators share i's club, or the dominators span more
+    clubs than (quota - 1) squad-mates plus every club that can be full.
+    Swaps only ever move up the dominance order, so dropping all such
+    players at once is safe.
+    """
+
+    max_full_clubs = sum(SQUAD_QUOTAS.values()) // MAX_PLAYERS_PER_CLUB
+    clubs, club_idx = np.unique(pool.team_codes, return_inverse=True)
+    keep = np.zeros(len(pool), dtype=bool)
+
+    for position, quota in SQUAD_QUOTAS.items():
+        rows = np.flatnonzero(pool.positions == position)
+        price = pool.prices[rows]
+        points = pool.points[rows]
+
+        # dominates[j, i]: j dominates i (ties broken by row order)
+        no_dearer = price[:, None] <= price[None, :]
+        no_worse = np.all(points[:, None, :] >= points[None, :, :], axis=2)
+        strictly = (
+            (price[:, None] < price[None, :])
+            | np.any(points[:, None, :] > points[None, :, :], axis=2)
+            | (rows[:, None] < rows[None, :])
+        )
+        dominates = no_dearer & no_worse & strictly
+
+        club_of = club_idx[rows]
+        same_club = (club_of[:, None] == club_of[None, :]) & dominates
+
+        # (clubs x players): how many dominators of i each club has
+        per_club = np.eye(len(clubs))[club_of].T @ dominates
+
+        droppable = (same_club.sum(axis=0) >= quota) | (
+            (per_club > 0).sum(axis=0) >= quota + max_full_clubs
+        )
+        keep[rows[~droppable]] = True
+
+    return np.flatnonzero(keep)
+
+
+def _horizon_pool(pool: SquadPool) -> SquadPool:
+    """
+    The pool with its horizon collapsed into one summed-points GW.
+    """
+
+    return dataclasses.replace(
+        pool,
+        points=pool.points.sum(axis=1, keepdims=True),
+        gameweeks=pool.gameweeks[:1],
+    )
+
+
+def _milp_squad(
+    pool: SquadPool,
+    budget: int,
+    bench_weight: float,
+    time_limit: float,
+    incumbent: float = -np.inf,
+) -> tuple[np.ndarray, bool] | None:
+    """
+    Variables: squad x_i, then per GW starter s_ig and captain c_ig.
+
+    Objective per GW: (1 - bench_weight) * p * s + p * c, plus
+    bench_weight * p * x, so bench players count bench_weight and the
+    captain twice. Dominated players are dropped first. `incumbent` (the
+    value of a known feasible squad) is a lower bound on the objective.
+    Returns squad rows and whether optimality was proven (False when the
+    time limit stopped the solver), or None when no solution is found.
+    """
+
+    candidates = _undominated_rows(pool)
+    prices = pool.prices[candidates]
+    positions = pool.positions[candidates]
+    team_codes = pool.team_codes[candidates]
+    points = pool.points[candidates]
+
+    n, n_gws = points.shape
+    n_vars = n * (1 + 2 * n_gws)
+
+    def s_col(g):
+        return n + g * n + np.arange(n)
+
+    def c_col(g):
+        return n + (n_gws + g) * n + np.arange(n)
+
+    cost = np.empty(n_vars)
+    cost[:n] = bench_weight * points.sum(axis=1)
+    for g in range(n_gws):
+        cost[s_col(g)] = (1.0 - bench_weight) * points[:, g]
+        cost[c_col(g)] = points[:, g]
+
+    rows, cols, vals, lower, upper = [], [], [], [], []
+
+    def add(columns, coefs, lb, ub):
+        rows.append(np.full(len(columns), len(lower)))
+        cols.append(np.asarray(columns))
+        vals.append(np.asarray(coefs, dtype=np.float64))
+        lower.append(lb)
+        upper.append(ub)
+
+    def add_linked(child, parent):
+        # child_i <= parent_i, one row per player
+        first = len(lower)
+        rows.append(np.repeat(np.arange(first, first + n), 2))
+        cols.append(np.column_stack([child, parent]).ravel())
+        vals.append(np.tile([1.0, -1.0], n))
+        lower.extend([-np.inf] * n)
+        upper.extend([0.0] * n)
+
+    everyone = np.arange(n)
+    add(everyone, prices, -np.inf, budget)
+
+    for position, quota in SQUAD_QUOTAS.items():
+        members = everyone[positions == position]
+        add(members, np.ones(len(members)), quota, quota)
+
+    for team in np.unique(team_codes):
+        members = everyone[team_codes == team]
+        add(members, np.ones(len(members)), -np.inf, MAX_PLAYERS_PER_CLUB)
+
+    for g in range(n_gws):
+        s, c = s_col(g), c_col(g)
+
+        add(s, np.ones(n), STARTING_XI_SIZE, STARTING_XI_SIZE)
+        add(c, np.ones(n), 1, 1)
+
+        for position, (low, high) in FORMATION_LIMITS.items():
+            members = positions == position
+            add(s[members], np.ones(members.sum()), low, high)
+
+        add_linked(s, everyone)
+        add_linked(c, s)
+
+    if np.isfinite(incumbent):
+        # a little slack, so rounding never cuts off the incumbent itself
+        add(np.arange(n_vars), cost, incumbent - 1e-6, np.inf)
+
+    A = coo_array(
+        (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(len(lower), n_vars),
+    ).tocsr()
+
+    result = milp(
+        -cost,
+        constraints=LinearConstraint(A, lower, upper),
+        integrality=np.ones(n_vars),
+        bounds=Bounds(0, 1),
+        options={"time_limit": time_limit},
+    )
+
+    if result.x is None:
+        return None
+
+    return candidates[result.x[:n] > 0.5], result.status == 0
+
+
+def optimize_squad(
+    pool: SquadPool,
+    budget: int = SQUAD_BUDGET,
+    bench_weight: float = BENCH_WEIGHT,
+    method: str = "milp",
+    time_limit: float = MILP_TIME_LIMIT_S,
+    per_gw_lineups: bool = False,
+) -> SquadSolution:
+    """
+    Best 15-man squad, XIs and captains for the pool's horizon.
+
+    NOTE:
+    - Wildcard: pass squad value + bank as budget; free hit: a 1-GW pool
+    - per_gw_lineups=True makes the MILP choose every GW's XI and captain
+      with the squad (exact for any horizon, but its size grows with
+      the horizon, so expect the time limit to hit on long horizons)
+    - Lineups are re-derived from the chosen squad, so both methods are
+      scored identically
+    """
+
+    if method not in ("milp", "greedy"):
+        raise ValueError(f"Unknown squad optimizer method: {method}")
+
+    started = time.perf_counter()
+    found = None
+    if method == "milp" and milp is not None:
+        model_pool = pool if per_gw_lineups else _horizon_pool(pool)
+        try:
+            greedy = _greedy_squad(model_pool, budget)
+            incumbent = _lineup_points(model_pool, greedy, bench_weight)[0]
+        except ValueError:
+            incumbent = -np.inf
+        found = _milp_squad(
+            model_pool, budget, bench_weight, time_limit, incumbent
+        )
+
+    if found is not None:
+        squad, optimal = found
+        used = "milp"
+    else:
+        squad, optimal = _greedy_squad(pool, budget), False
+        used = "greedy"
+
+    total, xi, captains = _lineup_points(pool, squad, bench_weight)
+
+    ids = pool.player_ids
+    return SquadSolution(
+        squad=tuple(int(ids[i]) for i in squad),
+        starting_xi={
+            gw: tuple(int(ids[i]) for i in s) for gw, s in xi.items()
+        },
+        captain={gw: int(ids[c]) for gw, c in captains.items()},
+        cost=int(pool.prices[squad].sum()),
+        expected_points=float(total),
+        method=used,
+        optimal=optimal,
+        solve_seconds=time.perf_counter() - started,
+    )
+
+
+if __name__ == "__main__":
+    from src.data.loaders import get_last_completed_gw, load_players
+    from src.inference.predict_ranks import predict_horizon
+
+    parser = argparse.ArgumentParser(description="Optimize a full FPL squad")
+    parser.add_argument("--gws", type=int, default=1, help="horizon length")
+    parser.add_argument("--budget", type=int, default=SQUAD_BUDGET)
+    parser.add_argument("--bench-weight", type=float, default=BENCH_WEIGHT)
+    parser.add_argument("--method", default="milp")
+    parser.add_argument(
+        "--per-gw-lineups",
+        action="store_true",
+        help="solve every GW's XI inside the MILP (slow on long horizons)",
+    )
+    parser.add_argument(
+        "--time-limit", type=float, default=MILP_TIME_LIMIT_S
+    )
+    args = parser.parse_args()
+
+    current_gw = get_last_completed_gw()
+    pool = build_squad_pool(
+        predict_horizon(current_gw=current_gw, n_gws=args.gws),
+        load_players(current_gw),
+    )
+
+    solution = optimize_squad(
+        pool,
+        budget=args.budget,
+        bench_weight=args.bench_weight,
+        method=args.method,
+        time_limit=args.time_limit,
+        per_gw_lineups=args.per_gw_lineups,
+    )
+
+    rows = {pid: i for i, pid in enumerate(pool.player_ids)}
+    first_gw = int(pool.gameweeks[0])
+    xi = set(solution.starting_xi[first_gw])
+
+    print(
+        f"\n=== OPTIMAL SQUAD GW {first_gw}-{int(pool.gameweeks[-1])} "
+        f"({solution.method}, {solution.solve_seconds:.2f}s) ===\n"
+    )
+    for position in SQUAD_QUOTAS:
+        for pid in solution.squad:
+            i = rows[pid]
+            if pool.positions[i] != position:
+                continue
+            tag = "C" if pid == solution.captain[first_gw] else (
+                " " if pid in xi else "b"
+            )
+            print(
+                f"{tag} {pool.web_names[i]:<20} {position:<11} "
+                f"{pool.prices[i] / 10:>5.1f}  {pool.points[i].sum():6.2f}"
+            )
+
+    print(
+        f"\ncost {solution.cost / 10:.1f} | "
+        f"expected points {solution.expected_points:.2f}"
+    )
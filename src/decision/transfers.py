@@ -0,0 +1,380 @@
+"""
+Exact transfer recommender on top of predicted_points.
+
+Given a 15-man squad, the bank and the number of free transfers, finds
+the best 0, 1 and 2 transfer moves by predicted points gained, under the
+FPL rules: budget, like-for-like positions (so squad quotas hold), at most
+MAX_PLAYERS_PER_CLUB per club and a TRANSFER_HIT_POINTS hit per transfer
+beyond the free ones.
+
+IMPORTANT:
+- Prices and bank are in FPL units (tenths of a million, as `now_cost`)
+- Gain is the change in summed squad predicted points over the target
+  GW(s) of the predictions frame; double GWs count both fixtures,
+  players without a fixture count 0
+- The search is exact: candidates are scanned per position in descending
+  predicted points and pruned with score and cheapest-price bounds
+"""
+
+import argparse
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.config.constants import (
+    MAX_PLAYERS_PER_CLUB,
+    SQUAD_QUOTAS,
+    TRANSFER_HIT_POINTS,
+)
+
+MAX_TRANSFERS = 2
+
+
+@dataclass(frozen=True)
+class TransferPlan:
+    transfers_out: tuple[int, ...]
+    transfers_in: tuple[int, ...]
+    points_gain: float
+    hit_cost: int
+    net_gain: float
+    bank_after: int
+
+    @property
+    def n_transfers(self) -> int:
+        return len(self.transfers_out)
+
+
+def build_player_pool(
+    predictions: pd.DataFrame,
+    players: pd.DataFrame,
+) -> pd.DataFrame:
+    """
+    One row per player: position, club, price and predicted points.
+
+    `players` is a normalized players.csv snapshot (prices from now_cost);
+    predicted points are summed per player over the predictions frame.
+    """
+
+    points = predictions.groupby("player_id")["predicted_points"].sum()
+
+    pool = players[
+        ["player_id", "web_name", "position", "team_code", "now_cost"]
+    ].drop_duplicates("player_id")
+
+    pool = pool[pool["position"].isin(list(SQUAD_QUOTAS))].copy()
+    pool["now_cost"] = pool["now_cost"].astype(int)
+    pool["predicted_points"] = (
+        pool["player_id"].map(points).fillna(0.0).astype(float)
+    )
+
+    return pool.reset_index(drop=True)
+
+
+class _SearchIndex:
+    """
+    Per-position candidate lists sorted by predicted points (descending),
+    with the cheapest price over each list suffix for budget pruning.
+    """
+
+    def __init__(self, pool: pd.DataFrame):
+        self.ids = pool["player_id"].tolist()
+        self.position = pool["position"].tolist()
+        self.team = pool["team_code"].tolist()
+        self.price = pool["now_cost"].tolist()
+        self.points = pool["predicted_points"].tolist()
+        self.row_of = {pid: i for i, pid in enumerate(self.ids)}
+
+        points = pool["predicted_points"].to_numpy()
+        prices = pool["now_cost"].to_numpy()
+
+        self.candidates = {}
+        self.suffix_min_price = {}
+
+        for position in SQUAD_QUOTAS:
+            rows = np.flatnonzero(pool["position"].to_numpy() == position)
+            rows = rows[np.argsort(-points[rows], kind="stable")]
+
+            suffix = np.minimum.accumulate(prices[rows][::-1])[::-1]
+
+            self.candidates[position] = rows.tolist()
+            self.suffix_min_price[position] = suffix.tolist()
+
+
+def _validate_squad(index: _SearchIndex, squad: list[int]) -> list[int]:
+    squad_size = sum(SQUAD_QUOTAS.values())
+    if len(squad) != squad_size or len(set(squad)) != len(squad):
+        raise ValueError(f"Squad must hold {squad_size} distinct players")
+
+    missing = [pid for pid in squad if pid not in index.row_of]
+    if missing:
+        raise ValueError(f"Squad players not in the player pool: {missing}")
+
+    rows = [index.row_of[pid] for pid in squad]
+
+    for position, quota in SQUAD_QUOTAS.items():
+        count = sum(index.position[r] == position for r in rows)
+        if count != quota:
+            raise ValueError(
+                f"Squad has {count} {position}s, expected {quota}"
+            )
+
+    clubs = pd.Series([index.team[r] for r in rows]).value_counts()
+    if clubs.max() > MAX_PLAYERS_PER_CLUB:
+        raise ValueError(
+            f"Squad has more than {MAX_PLAYERS_PER_CLUB} players from "
+            f"club {clubs.idxmax()}"
+        )
+
+    return rows
+
+
+def _club_counts(index: _SearchIndex, rows: list[int]) -> dict[int, int]:
+    counts: dict[int, int] = {}
+    for r in rows:
+        counts[index.team[r]] = counts.get(index.team[r], 0) + 1
+    return counts
+
+
+def _best_single(
+    index: _SearchIndex,
+    squad_rows: list[int],
+    sell: dict[int, int],
+    bank: int,
+) -> tuple[float, tuple, tuple] | None:
+    in_squad = set(squad_rows)
+    counts = _club_counts(index, squad_rows)
+
+    best = None
+    best_gain = 0.0
+
+    # most valuable-looking moves first, so the bound prunes early
+    outs = sorted(
+        squad_rows,
+        key=lambda o: index.points[o]
+        - index.points[index.candidates[index.position[o]][0]],
+    )
+
+    for o in outs:
+        position = index.position[o]
+        cands = index.candidates[position]
+        suffix = index.suffix_min_price[position]
+        budget = bank + sell[o]
+        out_points = index.points[o]
+
+        if (
+            best is not None
+            and index.points[cands[0]] - out_points <= best_gain
+        ):
+            continue
+
+        counts[index.team[o]] -= 1
+
+        for k, c in enumerate(cands):
+            gain = index.points[c] - out_points
+            if best is not None and gain <= best_gain:
+                break
+            if suffix[k] > budget:
+                break
+            if (
+                c in in_squad
+                or index.price[c] > budget
+                or counts.get(index.team[c], 0) >= MAX_PLAYERS_PER_CLUB
+            ):
+                continue
+
+            # first feasible candidate is the best one for this player out
+            best_gain = gain
+            best = (gain, (o,), (c,))
+            break
+
+        counts[index.team[o]] += 1
+
+    return best
+
+
+def _best_double(
+    index: _SearchIndex,
+    squad_rows: list[int],
+    sell: dict[int, int],
+    bank: int,
+) -> tuple[float, tuple, tuple] | None:
+    in_squad = set(squad_rows)
+    counts = _club_counts(index, squad_rows)
+
+    top = {p: index.points[c[0]] for p, c in index.candidates.items() if c}
+    cheapest = {
+        p: s[0] for p, s in index.suffix_min_price.items() if s
+    }
+
+    pairs = []
+    for i, o1 in enumerate(squad_rows):
+        for o2 in squad_rows[i + 1:]:
+            p1, p2 = index.position[o1], index.position[o2]
+            bound = (
+                top[p1] + top[p2]
+                - index.points[o1] - index.points[o2]
+            )
+            pairs.append((bound, o1, o2))
+
+    # tightest pruning comes from visiting the highest bounds first
+    pairs.sort(key=lambda t: -t[0])
+
+    best = None
+    best_gain = 0.0
+
+    for bound, o1, o2 in pairs:
+        if best is not None and bound <= best_gain:
+            break
+
+        p1, p2 = index.position[o1], index.position[o2]
+        cands1, suffix1 = index.candidates[p1], index.suffix_min_price[p1]
+        cands2, suffix2 = index.candidates[p2], index.suffix_min_price[p2]
+
+        budget = bank + sell[o1] + sell[o2]
+        out_points = index.points[o1] + index.points[o2]
+
+        counts[index.team[o1]] -= 1
+        counts[index.team[o2]] -= 1
+
+        for k1, a in enumerate(cands1):
+            if best is not None and (
+                index.points[a] + top[p2] - out_points <= best_gain
+            ):
+                break
+            if suffix1[k1] + cheapest[p2] > budget:
+                break
+
+            team_a = index.team[a]
+            if (
+                a in in_squad
+                or index.price[a] + cheapest[p2] > budget
+                or counts.get(team_a, 0) >= MAX_PLAYERS_PER_CLUB
+            ):
+                continue
+
+            remaining = budget - index.price[a]
+            counts[team_a] = counts.get(team_a, 0) + 1
+
+            for k2, b in enumerate(cands2):
+                gain = index.points[a] + index.points[b] - out_points
+                if best is not None and gain <= best_gain:
+                    break
+                if suffix2[k2] > remaining:
+                    break
+                if (
+                    b == a
+                    or b in in_squad
+                    or index.price[b] > remaining
+                    or counts.get(index.team[b], 0) >= MAX_PLAYERS_PER_CLUB
+                ):
+                    continue
+
+                best_gain = gain
+                best = (gain, (o1, o2), (a, b))
+                break
+
+            counts[team_a] -= 1
+
+        counts[index.team[o1]] += 1
+        counts[index.team[o2]] += 1
+
+    return best
+
+
+def recommend_transfers(
+    pool: pd.DataFrame,
+    squad: list[int],
+    bank: int,
+    free_transfers: int = 1,
+    selling_prices: dict[int, int] | None = None,
+    max_transfers: int = MAX_TRANSFERS,
+) -> list[TransferPlan]:
+    """
+    Best plan for every transfer count 0..max_transfers, ordered by net
+    gain (fewer transfers first on ties).
+
+    NOTE:
+    - `pool` comes from build_player_pool
+    - `selling_prices` overrides now_cost for squad players (FPL sells at
+      purchase price plus half the profit); defaults to now_cost
+    - A transfer count with no legal move at all is omitted
+    """
+
+    if not 0 <= max_transfers <= MAX_TRANSFERS:
+        raise ValueError(f"max_transfers must be in [0, {MAX_TRANSFERS}]")
+
+    index = _SearchIndex(pool)
+    squad_rows = _validate_squad(index, list(squad))
+
+    selling_prices = selling_prices or {}
+    sell = {
+        r: int(selling_prices.get(index.ids[r], index.price[r]))
+        for r in squad_rows
+    }
+
+    plans = [TransferPlan((), (), 0.0, 0, 0.0, bank)]
+    searches = [_best_single, _best_double][:max_transfers]
+
+    for search in searches:
+        found = search(index, squad_rows, sell, bank)
+        if found is None:
+            continue
+
+        gain, outs, ins = found
+        hit = TRANSFER_HIT_POINTS * max(0, len(outs) - free_transfers)
+
+        plans.append(
+            TransferPlan(
+                transfers_out=tuple(index.ids[r] for r in outs),
+                transfers_in=tuple(index.ids[r] for r in ins),
+                points_gain=gain,
+                hit_cost=hit,
+                net_gain=gain - hit,
+                bank_after=bank
+                + sum(sell[r] for r in outs)
+                - sum(index.price[r] for r in ins),
+            )
+        )
+
+    return sorted(plans, key=lambda p: -p.net_gain)
+
+
+if __name__ == "__main__":
+    from src.data.loaders import get_last_completed_gw, load_players
+    from src.inference.predict_ranks import predict_ranks
+
+    parser = argparse.ArgumentParser(description="Recommend FPL transfers")
+    parser.add_argument(
+        "--squad", required=True,
+        help="comma separated player ids (15)",
+    )
+    parser.add_argument("--bank", type=int, default=0, help="tenths of £m")
+    parser.add_argument("--free-transfers", type=int, default=1)
+    args = parser.parse_args()
+
+    current_gw = get_last_completed_gw()
+    pool = build_player_pool(
+        predict_ranks(current_gw=current_gw),
+        load_players(current_gw),
+    )
+    names = dict(zip(pool["player_id"], pool["web_name"]))
+
+    plans = recommend_transfers(
+        pool,
+        squad=[int(x) for x in args.squad.split(",")],
+        bank=args.bank,
+        free_transfers=args.free_transfers,
+    )
+
+    print(f"\n=== TRANSFER OPTIONS FOR GW {current_gw + 1} ===\n")
+    for plan in plans:
+        moves = ", ".join(
+            f"{names[o]} -> {names[i]}"
+            for o, i in zip(plan.transfers_out, plan.transfers_in)
+        ) or "roll transfer"
+        print(
+            f"{plan.n_transfers} transfer(s): {moves} | "
+            f"gain {plan.points_gain:.2f}, hit -{plan.hit_cost}, "
+            f"net {plan.net_gain:.2f}, bank {plan.bank_after / 10:.1f}"
+        )
@@ -1,3 +1,5 @@
+from dataclasses import dataclass
+
 import pandas as pd
 import numpy as np
 
@@ -9,6 +11,7 @@ from src.config.constants import (
     CS_BONUS_POSITIVE,
     CS_BONUS_NEGATIVE,
 )
+from src.utils.tracing import traced
 
 def clamp(x, low, high):
     return max(low, min(high, x))
@@ -30,6 +33,45 @@ def elo_to_base_multiplier(effective_elo_diff: float) -> float:
     raw = 1 + (effective_elo_diff / 600)
     return clamp(raw, FIXTURE_MULTIPLIER_MIN, FIXTURE_MULTIPLIER_MAX)
 
+
+# ------------------------------------------------------------------
+# Array versions: identical results to the scalar functions above,
+# including NaN (bucket 5, multiplier clamped to the max).
+# ------------------------------------------------------------------
+def clamp_array(x, low, high) -> np.ndarray:
+    """
+    Elementwise clamp with the exact semantics of `clamp`,
+    including NaN: max(low, min(high, nan)) == high.
+    """
+    capped = np.where(x < high, x, high)
+    return np.where(capped > low, capped, low)
+
+
+def elo_to_difficulty_bucket_array(effective_elo_diff) -> np.ndarray:
+    diff = np.asarray(effective_elo_diff, dtype=np.float64)
+    return np.select(
+        [diff >= 150, diff >= 75, diff >= -75, diff >= -150],
+        [1, 2, 3, 4],
+        default=5,
+    ).astype(np.int64)
+
+
+def elo_to_base_multiplier_array(effective_elo_diff) -> np.ndarray:
+    raw = 1 + (np.asarray(effective_elo_diff, dtype=np.float64) / 600)
+    return clamp_array(raw, FIXTURE_MULTIPLIER_MIN, FIXTURE_MULTIPLIER_MAX)
+
+
+def cs_bonus_array(effective_elo_diff) -> np.ndarray:
+    diff = np.asarray(effective_elo_diff, dtype=np.float64)
+    return np.select(
+        [
+            diff <= -CS_BONUS_ELO_THRESHOLD,
+            diff >= CS_BONUS_ELO_THRESHOLD,
+        ],
+        [CS_BONUS_NEGATIVE, CS_BONUS_POSITIVE],
+        default=0.0,
+    )
+
 def explode_fixtures(fixtures_df: pd.DataFrame) -> pd.DataFrame:
     home = pd.DataFrame({
         "team_id": fixtures_df["home_team"],
@@ -54,6 +96,7 @@ def explode_fixtures(fixtures_df: pd.DataFrame) -> pd.DataFrame:
     return pd.concat([home, away], ignore_index=True)
 
 
+@traced()
 def build_fixture_difficulty(fixtures_df: pd.DataFrame) -> pd.DataFrame:
     df = explode_fixtures(fixtures_df.copy())
 
@@ -63,17 +106,15 @@ def build_fixture_difficulty(fixtures_df: pd.DataFrame) -> pd.DataFrame:
         df["team_elo"] - df["opponent_elo"],
     )
 
-    df["difficulty_bucket"] = df["effective_elo_diff"].apply(
-        elo_to_difficulty_bucket
+    df["difficulty_bucket"] = elo_to_difficulty_bucket_array(
+        df["effective_elo_diff"]
     )
 
-    df["fixture_multiplier"] = df["effective_elo_diff"].apply(
-        elo_to_base_multiplier
+    df["fixture_multiplier"] = elo_to_base_multiplier_array(
+        df["effective_elo_diff"]
     )
 
-    df["cs_bonus"] = 0.0
-    df.loc[df["effective_elo_diff"] >= CS_BONUS_ELO_THRESHOLD, "cs_bonus"] = CS_BONUS_POSITIVE
-    df.loc[df["effective_elo_diff"] <= -CS_BONUS_ELO_THRESHOLD, "cs_bonus"] = CS_BONUS_NEGATIVE
+    df["cs_bonus"] = cs_bonus_array(df["effective_elo_diff"])
 
     return df[
         [
@@ -89,4 +130,166 @@ def build_fixture_difficulty(fixtures_df: pd.DataFrame) -> pd.DataFrame:
             "cs_bonus",
             "match_id",
         ]
-    ]
\ No newline at end of file
+    ]
+
+
+@dataclass(frozen=True)
+class FixtureCalendar:
+    """
+    Dense team x gameweek view of a season's fixtures.
+
+    Cell (team, GW) holds one slot per fixture: a blank GW has
+    fixture_count 0 and padded slots, a double GW fills two slots.
+    Padding is NaN for float arrays and 0 for difficulty_bucket.
+    """
+
+    team_ids: np.ndarray            # (teams,)
+    gameweeks: np.ndarray           # (gws,) ascending
+    fixture_count: np.ndarray       # (teams, gws)
+    effective_elo_diff: np.ndarray  # (teams, gws, slots)
+    fixture_multiplier: np.ndarray  # (teams, gws, slots)
+    difficulty_bucket: np.ndarray   # (teams, gws, slots)
+    cs_bonus: np.ndarray            # (teams, gws, slots)
+    fixtures: pd.DataFrame          # fixture difficulty rows + calendar_gw
+    row_bounds: np.ndarray          # (gws + 1,) row offsets into `fixtures`
+
+    def fixtures_for(self, gw: int) -> pd.DataFrame:
+        """
+        Same frame as build_fixture_difficulty(load_fixtures(gw)).
+        """
+
+        i = self._gw_positions([gw])[0]
+        start, stop = self.row_bounds[i], self.row_bounds[i + 1]
+
+        return (
+            self.fixtures.iloc[start:stop]
+            .drop(columns="calendar_gw")
+            .reset_index(drop=True)
+        )
+
+    def fixtures_for_gws(self, gws) -> pd.DataFrame:
+        """
+        fixtures_for(gw) for every GW in `gws`, stacked in that order,
+        with the GW each row belongs to in a trailing `target_gw` column.
+        """
+
+        positions = self._gw_positions(list(gws))
+        rows = np.concatenate(
+            [
+                np.arange(self.row_bounds[i], self.row_bounds[i + 1])
+                for i in positions
+            ]
+        ) if len(positions) else np.empty(0, dtype=np.int64)
+
+        return (
+            self.fixtures.iloc[rows]
+            .rename(columns={"calendar_gw": "target_gw"})
+            .reset_index(drop=True)
+        )
+
+    def lookup(self, team_ids, start_gw: int, end_gw: int) -> dict:
+        """
+        Arrays for `team_ids` over GWs start_gw..end_gw (inclusive).
+
+        Scalar team -> (gws, slots); array of teams -> (teams, gws, slots).
+        Unknown teams raise KeyError.
+        """
+
+        teams = np.atleast_1d(team_ids)
+        rows = pd.Index(self.team_ids).get_indexer(teams)
+        if (rows < 0).any():
+            raise KeyError(teams[rows < 0][0])
+
+        cols = np.flatnonzero(
+            (self.gameweeks >= start_gw) & (self.gameweeks <= end_gw)
+        )
+
+        out = {
+            "gameweeks": self.gameweeks[cols],
+            "fixture_count": self.fixture_count[np.ix_(rows, cols)],
+        }
+        for name in [
+            "effective_elo_diff",
+            "fixture_multiplier",
+            "difficulty_bucket",
+            "cs_bonus",
+        ]:
+            out[name] = getattr(self, name)[np.ix_(rows, cols)]
+
+        if np.ndim(team_ids) == 0:
+            out = {
+                k: v if k == "gameweeks" else v[0]
+                for k, v in out.items()
+            }
+
+        return out
+
+    def _gw_positions(self, gws) -> np.ndarray:
+        positions = pd.Index(self.gameweeks).get_indexer(gws)
+        if (positions < 0).any():
+            raise KeyError(f"GW not in fixture calendar: {gws}")
+        return positions
+
+
+@traced()
+def build_fixture_calendar(
+    fixtures_by_gw: dict[int, pd.DataFrame],
+) -> FixtureCalendar:
+    """
+    Builds the calendar from normalized fixtures, keyed by the GW folder
+    each fixtures.csv was loaded from.
+    """
+
+    gameweeks = np.array(sorted(fixtures_by_gw), dtype=np.int64)
+    fixtures_df = pd.concat(
+        [fixtures_by_gw[gw] for gw in gameweeks], ignore_index=True
+    )
+    source_gw = np.repeat(
+        gameweeks, [len(fixtures_by_gw[gw]) for gw in gameweeks]
+    )
+
+    # explode_fixtures emits all home rows, then all away rows;
+    # a stable sort restores per-GW order (home then away), so each GW
+    # slice matches build_fixture_difficulty on that GW alone
+    rows = build_fixture_difficulty(fixtures_df)
+    rows_gw = np.tile(source_gw, 2)
+    order = np.argsort(rows_gw, kind="stable")
+
+    rows = rows.iloc[order].reset_index(drop=True)
+    rows["calendar_gw"] = rows_gw[order]
+
+    row_bounds = np.searchsorted(
+        rows["calendar_gw"].to_numpy(),
+        np.append(gameweeks, gameweeks[-1] + 1 if len(gameweeks) else 0),
+    )
+
+    team_ids = np.unique(rows["team_id"].to_numpy())
+    team_pos = np.searchsorted(team_ids, rows["team_id"].to_numpy())
+    gw_pos = np.searchsorted(gameweeks, rows["calendar_gw"].to_numpy())
+    slot = rows.groupby(["team_id", "calendar_gw"]).cumcount().to_numpy()
+
+    n_slots = int(slot.max()) + 1 if len(rows) else 1
+    shape = (len(team_ids), len(gameweeks), n_slots)
+
+    fixture_count = np.zeros(shape[:2], dtype=np.int64)
+    np.add.at(fixture_count, (team_pos, gw_pos), 1)
+
+    arrays = {}
+    for name, fill, dtype in [
+        ("effective_elo_diff", np.nan, np.float64),
+        ("fixture_multiplier", np.nan, np.float64),
+        ("difficulty_bucket", 0, np.int64),
+        ("cs_bonus", np.nan, np.float64),
+    ]:
+        arr = np.full(shape, fill, dtype=dtype)
+        arr[team_pos, gw_pos, slot] = rows[name].to_numpy()
+        arrays[name] = arr
+
+    return FixtureCalendar(
+        team_ids=team_ids,
+        gameweeks=gameweeks,
+        fixture_count=fixture_count,
+        fixtures=rows,
+        row_bounds=row_bounds,
+        **arrays,
+    )
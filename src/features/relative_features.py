@@ -2,8 +2,11 @@
 Relative features: player vs positional peers.
 """
 
+import numpy as np
 import pandas as pd
 
+from src.utils.tracing import traced
+
 
 RELATIVE_COLS = [
     "xg_avg_last_5",
@@ -14,12 +17,111 @@ RELATIVE_COLS = [
     "defcon_avg_last_5",
 ]
 
+GROUP_COLS = ["position", "target_gw"]
 
-def add_relative_features(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+Z_EPSILON = 1e-6
+
+
+def _grouped_mean_std(
+    values: np.ndarray,
+    bounds: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Per-group mean and std (ddof=1) of every column, skipping NaN.
+
+    `values` (rows x cols) holds rows group by group, original order within
+    a group, with group g in rows bounds[g]:bounds[g + 1]. Each group is
+    reduced as one contiguous column-major slice with the same two-pass
+    formula as Series.mean()/Series.std(), so results match them bit for
+    bit (np.add.reduceat would not: it skips pairwise summation).
+
+    NOTE:
+    - The reference is pandas' own nanops; with bottleneck installed
+      pandas sums through it instead, unless compute.use_bottleneck is
+      off (the parity checks turn it off)
+    """
+
+    block = np.asfortranarray(values)
+    missing = np.isnan(block)
+    filled = np.where(missing, 0.0, block)
+    present = (~missing).astype(np.float64)
+
+    n_groups = len(bounds) - 1
+    mean = np.empty((n_groups, block.shape[1]))
+    std = np.empty((n_groups, block.shape[1]))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for g in range(n_groups):
+            rows = slice(bounds[g], bounds[g + 1])
+
+            count = present[rows].sum(axis=0)
+            total = filled[rows].sum(axis=0)
+
+            mean[g] = np.where(count > 0, total / count, np.nan)
+
+            # nanvar: NaN whenever count <= ddof
+            var_count = np.where(count > 1, count, np.nan)
+            sqr = (total / var_count - filled[rows]) ** 2
+            sqr[missing[rows]] = 0.0
+
+            std[g] = np.sqrt(sqr.sum(axis=0) / (var_count - 1.0))
+
+    return mean, std
+
+
+def _add_relative_features_grouped(
+    df: pd.DataFrame,
+    group_cols: list[str],
+) -> pd.DataFrame:
+    cols = [c for c in RELATIVE_COLS if c in df.columns]
+    if not cols:
+        return df
+
+    codes = (
+        df.groupby(group_cols, sort=False)
+        .ngroup()
+        .fillna(-1)
+        .to_numpy(dtype=np.int64)
+    )
 
-    group_cols = ["position", "target_gw"]
+    # rows without a complete group key get NaN, as with transform
+    order = np.argsort(codes, kind="stable")
+    order = order[codes[order] >= 0]
 
+    n_groups = int(codes.max()) + 1 if len(codes) else 0
+    if n_groups == 0:
+        for col in cols:
+            df[f"{col}_rel"] = np.nan
+            df[f"{col}_z"] = np.nan
+        return df
+
+    bounds = np.searchsorted(codes[order], np.arange(n_groups + 1))
+
+    values = df[cols].to_numpy(dtype=np.float64)
+    mean, std = _grouped_mean_std(values[order], bounds)
+
+    has_group = (codes >= 0)[:, None]
+    row_group = np.where(codes >= 0, codes, 0)
+
+    with np.errstate(invalid="ignore"):
+        centred = np.where(has_group, values - mean[row_group], np.nan)
+        z = np.where(
+            has_group,
+            centred / (std[row_group] + Z_EPSILON),
+            np.nan,
+        )
+
+    for j, col in enumerate(cols):
+        df[f"{col}_rel"] = centred[:, j]
+        df[f"{col}_z"] = z[:, j]
+
+    return df
+
+
+def _add_relative_features_transform(
+    df: pd.DataFrame,
+    group_cols: list[str],
+) -> pd.DataFrame:
     for col in RELATIVE_COLS:
         if col not in df.columns:
             continue
@@ -28,7 +130,36 @@ def add_relative_features(df: pd.DataFrame) -> pd.DataFrame:
 
         df[f"{col}_rel"] = grp.transform(lambda x: x - x.mean())
         df[f"{col}_z"] = grp.transform(
-            lambda x: (x - x.mean()) / (x.std() + 1e-6)
+            lambda x: (x - x.mean()) / (x.std() + Z_EPSILON)
         )
 
-    return df
\ No newline at end of file
+    return df
+
+
+@traced()
+def add_relative_features(
+    df: pd.DataFrame,
+    group_cols: list[str] | None = None,
+    engine: str = "grouped",
+) -> pd.DataFrame:
+    """
+    Adds `{col}_rel` (deviation from the peer-group mean) and `{col}_z`
+    (same, scaled by the group std + 1e-6) for every RELATIVE_COLS column.
+
+    NOTE:
+    - Peer group defaults to (position, target_gw)
+    - engine="grouped" computes all group statistics in one pass;
+      engine="transform" is the per-column lambda reference
+    """
+
+    df = df.copy()
+
+    if group_cols is None:
+        group_cols = GROUP_COLS
+
+    if engine == "grouped":
+        return _add_relative_features_grouped(df, group_cols)
+    if engine == "transform":
+        return _add_relative_features_transform(df, group_cols)
+
+    raise ValueError(f"Unknown relative features engine: {engine}")
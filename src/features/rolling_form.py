@@ -1,98 +1,329 @@
+import numpy as np
 import pandas as pd
 from src.config.constants import (
     ROLLING_WINDOWS,
     LOW_CONFIDENCE_GAMES_THRESHOLD,
     LOW_CONFIDENCE_MINUTES_THRESHOLD,
 )
+from src.utils.tracing import traced
 
+# (feature name, source column, aggregation), in output column order.
+# Each window w yields f"{name}_last_{w}".
+WINDOW_AGGREGATIONS = [
+    ("appearances", "gameweek", "count"),
+    ("minutes_sum", "minutes", "sum"),
+    ("minutes_avg", "minutes", "mean"),
 
-def _last_n_appearances(df: pd.DataFrame, n: int) -> pd.DataFrame:
+    ("ppg", "event_points", "mean"),
+
+    ("goals_avg", "goals_scored", "mean"),
+    ("assists_avg", "assists", "mean"),
+    ("xg_avg", "expected_goals", "mean"),
+    ("xa_avg", "expected_assists", "mean"),
+
+    ("defcon_avg", "defensive_contribution", "mean"),
+    ("saves_avg", "saves", "mean"),
+    ("goals_conceded_avg", "goals_conceded", "mean"),
+]
+
+
+# raw player_gameweek_stats columns the window features are built from
+FORM_SOURCE_COLUMNS = list(dict.fromkeys(
+    col for _, col, _ in WINDOW_AGGREGATIONS if col != "gameweek"
+))
+
+# stats whose missing values count as 0 (event_points stays NaN)
+ZERO_FILLED_COLUMNS = [
+    "minutes", "goals_scored", "assists",
+    "expected_goals", "expected_assists",
+    "defensive_contribution", "saves", "goals_conceded",
+]
+
+
+def required_stats_columns(features: list[str]) -> list[str]:
+    """
+    Raw player_gameweek_stats columns that `features` depend on.
+
+    Window features map to their source column; `_rel`/`_z` and `_trend`
+    features to the windows they derive from; low_confidence to minutes.
+    Non-form features (fixtures, relative peers) need none.
+    """
+
+    sources = {name: col for name, col, _ in WINDOW_AGGREGATIONS}
+    needed = {"minutes"}  # appearances are minutes > 0
+
+    for feature in features:
+        base = feature
+        for suffix in ("_rel", "_z"):
+            base = base.removesuffix(suffix)
+        if base.endswith("_trend"):
+            base = base.removesuffix("_trend") + "_avg_last_5"
+
+        name = base.rsplit("_last_", 1)[0]
+        if name in sources and sources[name] != "gameweek":
+            needed.add(sources[name])
+
+    return [col for col in FORM_SOURCE_COLUMNS if col in needed]
+
+
+def _last_n_appearances(
+    df: pd.DataFrame,
+    n: int,
+    group_cols: list[str],
+) -> pd.DataFrame:
     """
     Returns the last n appearances (minutes > 0) for each player.
     """
     return (
         df[df["minutes"] > 0]
-        .sort_values(["player_id", "gameweek"])
-        .groupby("player_id")
+        .sort_values(group_cols + ["gameweek"])
+        .groupby(group_cols)
         .tail(n)
     )
 
 
-def _aggregate_window(df: pd.DataFrame, window: int) -> pd.DataFrame:
+def _aggregate_window(
+    df: pd.DataFrame,
+    window: int,
+    group_cols: list[str],
+) -> pd.DataFrame:
     """
     Aggregates rolling stats for a given appearance window.
     """
 
     agg = (
-        df.groupby("player_id")
+        df.groupby(group_cols)
         .agg(
-            appearances=("gameweek", "count"),
-            minutes_sum=("minutes", "sum"),
-            minutes_avg=("minutes", "mean"),
-
-            ppg=("event_points", "mean"),
-
-            goals_avg=("goals_scored", "mean"),
-            assists_avg=("assists", "mean"),
-            xg_avg=("expected_goals", "mean"),
-            xa_avg=("expected_assists", "mean"),
-
-            defcon_avg=("defensive_contribution", "mean"),
-            saves_avg=("saves", "mean"),
-            goals_conceded_avg=("goals_conceded", "mean"),
+            **{
+                name: (col, how)
+                for name, col, how in WINDOW_AGGREGATIONS
+            }
         )
         .reset_index()
     )
 
     agg = agg.rename(
         columns={
-            "appearances": f"appearances_last_{window}",
-            "minutes_sum": f"minutes_sum_last_{window}",
-            "minutes_avg": f"minutes_avg_last_{window}",
-            "ppg": f"ppg_last_{window}",
-
-            "goals_avg": f"goals_avg_last_{window}",
-            "assists_avg": f"assists_avg_last_{window}",
-            "xg_avg": f"xg_avg_last_{window}",
-            "xa_avg": f"xa_avg_last_{window}",
-
-            "defcon_avg": f"defcon_avg_last_{window}",
-            "saves_avg": f"saves_avg_last_{window}",
-            "goals_conceded_avg": f"goals_conceded_avg_last_{window}",
+            name: f"{name}_last_{window}"
+            for name, _, _ in WINDOW_AGGREGATIONS
         }
     )
 
     return agg
 
 
-def build_rolling_form_features(player_gw_df: pd.DataFrame) -> pd.DataFrame:
+def _pandas_window_features(
+    df: pd.DataFrame,
+    windows: list[int],
+    group_cols: list[str],
+) -> pd.DataFrame:
+    """
+    Reference engine: one filter/sort/tail/agg pass and merge per window.
+
+    NOTE:
+    - Stats are cast to float64 first, as the numpy engine reads them, so
+      compact int16 columns (minutes) give float64 sums there too
+    """
+
+    df = df.astype({col: np.float64 for col in FORM_SOURCE_COLUMNS})
+    features = None
+
+    for w in windows:
+        last_n = _last_n_appearances(df, w, group_cols)
+        agg = _aggregate_window(last_n, w, group_cols)
+
+        features = agg if features is None else features.merge(
+            agg, on=group_cols, how="outer"
+        )
+
+    return features
+
+
+def _kahan_window_sums(
+    values: np.ndarray,
+    window: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sums ranks window-1 .. 0 of `values` (groups x ranks x stats), oldest
+    appearance first, skipping NaN.
+
+    Mirrors pandas' compensated group_sum/group_mean loop step for step,
+    so results are bit-identical to groupby().agg on the same rows.
+    """
+
+    n_groups, _, n_stats = values.shape
+
+    total = np.zeros((n_groups, n_stats))
+    compensation = np.zeros((n_groups, n_stats))
+    nobs = np.zeros((n_groups, n_stats), dtype=np.int64)
+
+    with np.errstate(invalid="ignore"):
+        for rank in range(window - 1, -1, -1):
+            val = values[:, rank, :]
+            present = ~np.isnan(val)
+
+            y = val - compensation
+            t = total + y
+            comp = t - total - y
+            # +/- inf makes the compensation NaN; pandas resets it to 0
+            comp[comp != comp] = 0.0
+
+            compensation = np.where(present, comp, compensation)
+            total = np.where(present, t, total)
+            nobs += present
+
+    return total, nobs
+
+
+def _numpy_window_features(
+    df: pd.DataFrame,
+    windows: list[int],
+    group_cols: list[str],
+) -> pd.DataFrame:
+    """
+    Vectorized engine: sorts appearances once, ranks them from the most
+    recent backwards per group, and derives every window's count/sum/mean
+    from one dense (groups x ranks x stats) array.
+
+    Longer window lists only add cheap per-rank array steps; there is no
+    per-window filter, sort, groupby or merge.
+    """
+
+    apps = df[df["minutes"] > 0]
+
+    keys = [apps[c].to_numpy() for c in group_cols]
+    order = np.lexsort([apps["gameweek"].to_numpy()] + keys[::-1])
+    keys = [k[order] for k in keys]
+
+    n_rows = len(order)
+
+    new_group = np.ones(n_rows, dtype=bool)
+    if n_rows:
+        new_group[1:] = np.any([k[1:] != k[:-1] for k in keys], axis=0)
+
+    starts = np.flatnonzero(new_group)
+    group_sizes = np.diff(np.append(starts, n_rows))
+    n_groups = len(starts)
+
+    group_id = np.cumsum(new_group) - 1
+    ends = starts + group_sizes
+    rank = ends[group_id] - 1 - np.arange(n_rows)  # 0 = latest appearance
+
+    max_window = max(windows)
+
+    stats = np.column_stack([
+        apps[c].to_numpy(dtype=np.float64)[order]
+        for c in FORM_SOURCE_COLUMNS
+    ]) if n_rows else np.empty((0, len(FORM_SOURCE_COLUMNS)))
+
+    values = np.full((n_groups, max_window, len(FORM_SOURCE_COLUMNS)), np.nan)
+    keep = rank < max_window
+    values[group_id[keep], rank[keep]] = stats[keep]
+
+    return window_features_frame(
+        {c: k[starts] for c, k in zip(group_cols, keys)},
+        group_sizes,
+        values,
+        windows,
+    )
+
+
+def window_features_frame(
+    keys: dict[str, np.ndarray],
+    group_sizes: np.ndarray,
+    values: np.ndarray,
+    windows: list[int],
+) -> pd.DataFrame:
+    """
+    Window features from each group's latest appearances.
+
+    `values` is (groups x ranks x FORM_SOURCE_COLUMNS), rank 0 the latest
+    appearance, NaN past a group's `group_sizes` appearances; `keys` are
+    the group columns, one value per group.
+    """
+
+    n_groups = len(group_sizes)
+
+    columns = list(keys)
+    float_slots = {}
+    for w in windows:
+        for name, _, how in WINDOW_AGGREGATIONS:
+            columns.append(f"{name}_last_{w}")
+            if how != "count":
+                float_slots[columns[-1]] = len(float_slots)
+
+    # every float feature lands in one preallocated (groups x features) block
+    out_float = np.empty((n_groups, len(float_slots)))
+    data = dict(keys)
+
+    for w in windows:
+        total, nobs = _kahan_window_sums(values, w)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(nobs > 0, total / nobs, np.nan)
+
+        for name, col, how in WINDOW_AGGREGATIONS:
+            feature = f"{name}_last_{w}"
+
+            if how == "count":
+                data[feature] = np.minimum(group_sizes, w)
+                continue
+
+            j = FORM_SOURCE_COLUMNS.index(col)
+            slot = out_float[:, float_slots[feature]]
+            slot[:] = total[:, j] if how == "sum" else mean[:, j]
+            data[feature] = slot
+
+    return pd.DataFrame(data, columns=columns)
+
+
+@traced()
+def build_rolling_form_features(
+    player_gw_df: pd.DataFrame,
+    group_cols: list[str] | None = None,
+    windows: list[int] | None = None,
+    engine: str = "numpy",
+) -> pd.DataFrame:
     """
     Builds rolling form features using appearance-based windows.
+
+    NOTE:
+    - One output row per player, or per `group_cols` combination when
+      several independent windows are stacked (e.g. target_gw, player_id).
+    - engine="numpy" (default) and engine="pandas" (reference) produce
+      identical frames, dtypes included, whatever the input stat dtypes
+      (compact_tables_check checks this on loader output).
     """
 
+    if group_cols is None:
+        group_cols = ["player_id"]
+
+    if windows is None:
+        windows = ROLLING_WINDOWS
+
     df = player_gw_df.copy()
 
     if df.columns.tolist().count("gameweek") > 1:
         raise ValueError("Duplicate 'gameweek' column detected")
 
-    numeric_cols = [
-        "minutes", "goals_scored", "assists",
-        "expected_goals", "expected_assists",
-        "defensive_contribution", "saves", "goals_conceded",
-    ]
-
-    for col in numeric_cols:
+    for col in ZERO_FILLED_COLUMNS:
         df[col] = df.get(col, 0.0).fillna(0.0)
 
-    features = None
+    if engine == "numpy":
+        features = _numpy_window_features(df, windows, group_cols)
+    elif engine == "pandas":
+        features = _pandas_window_features(df, windows, group_cols)
+    else:
+        raise ValueError(f"Unknown rolling form engine: {engine}")
 
-    for w in ROLLING_WINDOWS:
-        last_n = _last_n_appearances(df, w)
-        agg = _aggregate_window(last_n, w)
+    return finish_form_features(features)
 
-        features = agg if features is None else features.merge(
-            agg, on="player_id", how="outer"
-        )
+
+def finish_form_features(features: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shared tail of every form engine: zero-fill, dampened ppg_last_5 and
+    the low_confidence flag.
+    """
 
     features = features.fillna(0.0)
 
@@ -117,4 +348,4 @@ def build_rolling_form_features(player_gw_df: pd.DataFrame) -> pd.DataFrame:
         | (features["minutes_avg_last_5"] < LOW_CONFIDENCE_MINUTES_THRESHOLD)
     )
 
-    return features
\ No newline at end of file
+    return features
@@ -0,0 +1,535 @@
+"""
+Incremental rolling form: per-player ring buffers of recent appearances.
+
+build_rolling_form_features re-reads and re-ranks the whole form window
+on every call. RollingState instead keeps, per player, the last
+RING_SIZE appearances (one slot per appearance: the GW and every
+FORM_SOURCE_COLUMNS stat), so landing a new gameweek is one O(players)
+write of that GW's rows, and window features are read straight off the
+buffers.
+
+    state.apply_gameweek(21, stats_df)
+    form_df = state.form_features(start_gw=17)
+
+Features match build_rolling_form_features on the raw window exactly:
+the buffers are fed into the same dense (players x ranks x stats)
+layout the numpy engine builds, so sums are the same compensated sums.
+
+Every applied GW is journaled (the slots it overwrote), so the state
+can be rolled back to any earlier GW and re-applied, e.g. when FPL
+corrects a finished GW's stats. rolling_form_at does this on its own:
+it rolls back to just before the first GW whose stats file changed,
+applies what is new and saves the state under the cache root.
+
+Usage:
+    python -m src.features.rolling_state [--rollback GW]
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.config.constants import ROLLING_WINDOWS
+from src.data.cache import CACHE_ROOT, _schema_fingerprint
+from src.data.loaders import (
+    DEFAULT_SEASON,
+    _season_path,
+    get_completed_gws,
+    load_player_gameweeks,
+)
+from src.features.rolling_form import (
+    FORM_SOURCE_COLUMNS,
+    ZERO_FILLED_COLUMNS,
+    finish_form_features,
+    window_features_frame,
+)
+from src.utils.tracing import traced
+
+STATE_DIR = CACHE_ROOT / "rolling_state"
+
+ROLLING_STATE_ENABLED = (
+    os.environ.get("FPL_DISABLE_ROLLING_STATE", "") == ""
+)
+
+# Bump when the saved layout changes.
+STATE_VERSION = 1
+
+# appearances kept per player: no window looks further back
+RING_SIZE = max(ROLLING_WINDOWS)
+
+_lock = threading.Lock()
+
+# state path -> (file signature, state), so warm calls skip the npz read
+_loaded: dict[Path, tuple[list, "RollingState"]] = {}
+
+
+class RollingState:
+    """
+    Ring buffers of each player's latest appearances, as of GW `gw`.
+
+    Player rows are in first-seen order; slot head - 1 (mod RING_SIZE)
+    holds the latest appearance. Empty slots have gameweek -1.
+    """
+
+    player_ids: np.ndarray  # (players,) int64
+    values: np.ndarray      # (players, RING_SIZE, stats) float64
+    gameweeks: np.ndarray   # (players, RING_SIZE) int64
+    head: np.ndarray        # (players,) next slot to write
+    count: np.ndarray       # (players,) filled slots
+
+    def __init__(self):
+        n_stats = len(FORM_SOURCE_COLUMNS)
+
+        self.gw = 0
+        self.player_ids = np.empty(0, dtype=np.int64)
+        self.values = np.empty((0, RING_SIZE, n_stats))
+        self.gameweeks = np.empty((0, RING_SIZE), dtype=np.int64)
+        self.head = np.empty(0, dtype=np.int64)
+        self.count = np.empty(0, dtype=np.int64)
+
+        # applied GW -> (stats file signature, undo record)
+        self.journal: dict[int, dict] = {}
+
+    def copy(self) -> "RollingState":
+        state = RollingState()
+        state.gw = self.gw
+        state.player_ids = self.player_ids.copy()
+        state.values = self.values.copy()
+        state.gameweeks = self.gameweeks.copy()
+        state.head = self.head.copy()
+        state.count = self.count.copy()
+        state.journal = dict(self.journal)  # undo records are never mutated
+        return state
+
+    # --------------------------------------------------------------
+    # updates
+    # --------------------------------------------------------------
+    def _rows_for(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Buffer rows for `ids`, appending empty rows for new players.
+        """
+
+        index = pd.Index(self.player_ids)
+        rows = index.get_indexer(ids)
+
+        new_ids = pd.unique(ids[rows < 0])
+        if len(new_ids):
+            n_new = len(new_ids)
+            self.player_ids = np.concatenate([self.player_ids, new_ids])
+            self.values = np.concatenate([
+                self.values,
+                np.full((n_new,) + self.values.shape[1:], np.nan),
+            ])
+            self.gameweeks = np.concatenate([
+                self.gameweeks, np.full((n_new, RING_SIZE), -1),
+            ])
+            self.head = np.concatenate([self.head, np.zeros(n_new, np.int64)])
+            self.count = np.concatenate(
+                [self.count, np.zeros(n_new, np.int64)]
+            )
+            rows = pd.Index(self.player_ids).get_indexer(ids)
+
+        return rows
+
+    def apply_gameweek(
+        self,
+        gw: int,
+        stats_df: pd.DataFrame,
+        signature: list | None = None,
+    ) -> None:
+        """
+        Pushes GW `gw`'s appearances (minutes > 0) into the buffers.
+
+        `stats_df` is that GW's normalized player_gameweek_stats;
+        `signature` identifies the file it came from, for change checks.
+        """
+
+        if gw <= self.gw:
+            raise ValueError(f"GW {gw} is not after state GW {self.gw}")
+
+        df = stats_df.copy()
+        for col in ZERO_FILLED_COLUMNS:
+            df[col] = df.get(col, 0.0).fillna(0.0)
+        apps = df[df["minutes"] > 0]
+
+        n_players = len(self.player_ids)
+        rows = self._rows_for(apps["player_id"].to_numpy(dtype=np.int64))
+        stats = (
+            np.column_stack([
+                apps[c].to_numpy(dtype=np.float64)
+                for c in FORM_SOURCE_COLUMNS
+            ])
+            if len(apps) else np.empty((0, len(FORM_SOURCE_COLUMNS)))
+        )
+
+        touched = np.unique(rows)
+        self.journal[gw] = {
+            "signature": signature,
+            "n_players": n_players,
+            "rows": touched,
+            "values": self.values[touched].copy(),
+            "gameweeks": self.gameweeks[touched].copy(),
+            "head": self.head[touched].copy(),
+            "count": self.count[touched].copy(),
+        }
+
+        # a player listed twice in one GW gets two appearances, in file order
+        occurrence = pd.Series(rows).groupby(rows).cumcount().to_numpy()
+        for k in range(int(occurrence.max()) + 1 if len(rows) else 0):
+            pick = occurrence == k
+            r = rows[pick]
+            slot = self.head[r]
+
+            self.values[r, slot] = stats[pick]
+            self.gameweeks[r, slot] = gw
+            self.head[r] = (slot + 1) % RING_SIZE
+            self.count[r] = np.minimum(self.count[r] + 1, RING_SIZE)
+
+        self.gw = gw
+
+    def advance_to(self, gw: int) -> None:
+        """
+        Marks the state as of `gw` when no later GW has stats yet.
+        """
+
+        if gw < self.gw:
+            raise ValueError(f"GW {gw} is before state GW {self.gw}")
+        self.gw = gw
+
+    def rollback(self, gw: int) -> None:
+        """
+        Undoes every GW after `gw`, newest first.
+        """
+
+        for applied in sorted(self.journal, reverse=True):
+            if applied <= gw:
+                break
+
+            undo = self.journal.pop(applied)
+            rows = undo["rows"]
+
+            self.values[rows] = undo["values"]
+            self.gameweeks[rows] = undo["gameweeks"]
+            self.head[rows] = undo["head"]
+            self.count[rows] = undo["count"]
+
+            n = undo["n_players"]
+            self.player_ids = self.player_ids[:n]
+            self.values = self.values[:n]
+            self.gameweeks = self.gameweeks[:n]
+            self.head = self.head[:n]
+            self.count = self.count[:n]
+
+        self.gw = min(self.gw, gw)
+
+    # --------------------------------------------------------------
+    # features
+    # --------------------------------------------------------------
+    def form_features(
+        self,
+        start_gw: int,
+        windows: list[int] | None = None,
+    ) -> pd.DataFrame:
+        """
+        Same frame as build_rolling_form_features on the stats of GWs
+        start_gw .. self.gw: one row per player with an appearance in
+        that range, ordered by player_id.
+        """
+
+        if windows is None:
+            windows = ROLLING_WINDOWS
+
+        if max(windows) > RING_SIZE:
+            raise ValueError(f"Windows longer than RING_SIZE={RING_SIZE}")
+
+        # ranks latest-first: rank r lives in slot head - 1 - r
+        ranks = np.arange(RING_SIZE)
+        slots = (self.head[:, None] - 1 - ranks[None, :]) % RING_SIZE
+        players = np.arange(len(self.player_ids))[:, None]
+
+        in_window = (
+            (ranks[None, :] < self.count[:, None])
+            & (self.gameweeks[players, slots] >= start_gw)
+        )
+        group_sizes = in_window.sum(axis=1)
+
+        keep = np.flatnonzero(group_sizes > 0)
+        keep = keep[np.argsort(self.player_ids[keep], kind="stable")]
+
+        values = self.values[keep[:, None], slots[keep]]
+        values[~in_window[keep]] = np.nan
+
+        features = window_features_frame(
+            {"player_id": self.player_ids[keep]},
+            group_sizes[keep],
+            values[:, :max(windows)],
+            windows,
+        )
+
+        return finish_form_features(features)
+
+    # --------------------------------------------------------------
+    # persistence
+    # --------------------------------------------------------------
+    def _meta(self) -> dict:
+        return {
+            "version": STATE_VERSION,
+            "ring_size": RING_SIZE,
+            "columns": FORM_SOURCE_COLUMNS,
+            "schema": _schema_fingerprint(),
+        }
+
+    def save(self, path: Path) -> None:
+        journal_gws = sorted(self.journal)
+        undo = [self.journal[gw] for gw in journal_gws]
+
+        meta = self._meta()
+        meta["gw"] = self.gw
+        meta["journal"] = [
+            {
+                "gw": gw,
+                "signature": u["signature"],
+                "n_players": u["n_players"],
+            }
+            for gw, u in zip(journal_gws, undo)
+        ]
+
+        def stack(field, shape, dtype):
+            if not undo:
+                return np.empty(shape, dtype=dtype)
+            return np.concatenate([u[field] for u in undo])
+
+        n_stats = len(FORM_SOURCE_COLUMNS)
+        arrays = {
+            "player_ids": self.player_ids,
+            "values": self.values,
+            "gameweeks": self.gameweeks,
+            "head": self.head,
+            "count": self.count,
+            "undo_sizes": np.array(
+                [len(u["rows"]) for u in undo], dtype=np.int64
+            ),
+            "undo_rows": stack("rows", (0,), np.int64),
+            "undo_values": stack("values", (0, RING_SIZE, n_stats), float),
+            "undo_gameweeks": stack("gameweeks", (0, RING_SIZE), np.int64),
+            "undo_head": stack("head", (0,), np.int64),
+            "undo_count": stack("count", (0,), np.int64),
+        }
+
+        buffer = io.BytesIO()
+        np.savez(buffer, meta=np.array(json.dumps(meta)), **arrays)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".tmp-{uuid.uuid4().hex}")
+        tmp_path.write_bytes(buffer.getvalue())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "RollingState | None":
+        """
+        The state saved at `path`; None when missing or saved by an
+        incompatible version.
+        """
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+
+        state = cls()
+        meta = json.loads(str(arrays.pop("meta")))
+        if {k: meta.get(k) for k in state._meta()} != state._meta():
+            return None
+
+        state.gw = meta["gw"]
+        state.player_ids = arrays["player_ids"]
+        state.values = arrays["values"]
+        state.gameweeks = arrays["gameweeks"]
+        state.head = arrays["head"]
+        state.count = arrays["count"]
+
+        bounds = np.concatenate([[0], np.cumsum(arrays["undo_sizes"])])
+        for i, entry in enumerate(meta["journal"]):
+            rows = slice(bounds[i], bounds[i + 1])
+            state.journal[entry["gw"]] = {
+                "signature": entry["signature"],
+                "n_players": entry["n_players"],
+                "rows": arrays["undo_rows"][rows],
+                "values": arrays["undo_values"][rows],
+                "gameweeks": arrays["undo_gameweeks"][rows],
+                "head": arrays["undo_head"][rows],
+                "count": arrays["undo_count"][rows],
+            }
+
+        return state
+
+
+def _state_path(season: str) -> Path:
+    dir_hash = hashlib.sha1(
+        os.path.abspath(_season_path(season)).encode()
+    ).hexdigest()[:10]
+    return STATE_DIR / f"{season}_{dir_hash}.npz"
+
+
+def _file_signature(path: Path) -> list | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _load_state(path: Path) -> RollingState:
+    """
+    The saved state (a fresh one if none), reusing the in-memory copy
+    while the file is unchanged.
+    """
+
+    signature = _file_signature(path)
+    cached = _loaded.get(path)
+    if cached is not None and signature is not None and cached[0] == signature:
+        return cached[1]
+
+    state = RollingState.load(path) or RollingState()
+    _loaded[path] = (signature, state)
+    return state
+
+
+def _stats_signature(season: str, gw: int) -> list | None:
+    return _file_signature(
+        _season_path(season) / f"GW{gw}" / "player_gameweek_stats.csv"
+    )
+
+
+def _sync(
+    state: RollingState,
+    gw: int,
+    season: str,
+    completed: list[int] | None = None,
+) -> bool:
+    """
+    Brings `state` to GW `gw`: rolls back past changed or vanished GWs,
+    then applies completed GWs it has not seen. Returns True if changed.
+    """
+
+    if completed is None:
+        completed = get_completed_gws(season=season)
+
+    stale = [
+        g for g in sorted(set(completed) | set(state.journal))
+        if g <= state.gw
+        and (
+            g not in completed
+            or g not in state.journal
+            or state.journal[g]["signature"] != _stats_signature(season, g)
+        )
+    ]
+
+    changed = False
+    target = min(stale + [gw]) - 1 if stale else gw
+    if target < state.gw:
+        state.rollback(target)
+        changed = True
+
+    new_gws = [g for g in completed if state.gw < g <= gw]
+    for g in new_gws:
+        state.apply_gameweek(
+            g,
+            load_player_gameweeks(
+                [g], season=season, columns=FORM_SOURCE_COLUMNS
+            ),
+            signature=_stats_signature(season, g),
+        )
+        changed = True
+
+    if state.gw < gw:
+        state.advance_to(gw)
+        changed = True
+
+    return changed
+
+
+@traced("rolling_state")
+def rolling_form_at(
+    start_gw: int,
+    end_gw: int,
+    season: str = DEFAULT_SEASON,
+) -> pd.DataFrame:
+    """
+    build_rolling_form_features(load_player_gameweeks(start_gw..end_gw))
+    from the saved rolling state, which is brought to `end_gw` first.
+
+    NOTE:
+    - Moving forward applies only the new GWs' stats and saves the state
+    - Asking for an earlier `end_gw` rolls back a copy; the saved state
+      stays at its latest GW
+    - Raises like load_player_gameweeks when no GW in the range has stats
+    """
+
+    completed = get_completed_gws(season=season)
+    if not any(start_gw <= gw <= end_gw for gw in completed):
+        raise RuntimeError("No player_gameweek_stats loaded")
+
+    path = _state_path(season)
+
+    with _lock:
+        state = _load_state(path)
+
+        try:
+            if _sync(state, max(end_gw, state.gw), season, completed):
+                state.save(path)
+                _loaded[path] = (_file_signature(path), state)
+        except Exception:
+            _loaded.pop(path, None)  # may be half-applied; reload next time
+            raise
+
+        if end_gw < state.gw:
+            # historical request: undo on a copy only
+            state = state.copy()
+            state.rollback(end_gw)
+
+        return state.form_features(start_gw)
+
+
+if __name__ == "__main__":
+    from src.data.loaders import get_last_completed_gw
+
+    parser = argparse.ArgumentParser(description="Rolling form state")
+    parser.add_argument("--season", default=DEFAULT_SEASON)
+    parser.add_argument(
+        "--rollback", type=int, default=None,
+        help="undo every GW after this one (e.g. before re-applying "
+             "corrected stats)",
+    )
+    args = parser.parse_args()
+
+    path = _state_path(args.season)
+
+    if args.rollback is not None:
+        state = RollingState.load(path)
+        if state is None:
+            print(f"No rolling state at {path}")
+        else:
+            state.rollback(args.rollback)
+            state.save(path)
+            print(f"Rolled back to GW {state.gw}")
+    else:
+        last_gw = get_last_completed_gw(args.season)
+        with _lock:
+            state = RollingState.load(path) or RollingState()
+            _sync(state, last_gw, args.season)
+            state.save(path)
+
+        print(
+            f"Rolling state at GW {state.gw}: {len(state.player_ids)} "
+            f"players, {len(state.journal)} GWs journaled -> {path}"
+        )
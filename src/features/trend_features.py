@@ -4,7 +4,10 @@ Trend features based on underlying performance, not fantasy points.
 
 import pandas as pd
 
+from src.utils.tracing import traced
 
+
+@traced()
 def add_trend_features(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
 
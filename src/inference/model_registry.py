@@ -0,0 +1,245 @@
+"""
+In-process registry of position models and calibrators.
+
+Loads every `{position}_gbm.pkl` / `{position}_calibrator.pkl` once,
+checks each model's feature list against RANK_FEATURE_MASKS, and reloads
+an artifact only when its file changes on disk. It also keeps a small
+LRU cache of finished ranked-prediction frames.
+
+A position with a `{position}_gbm.compiled` file (see
+src/models/compiled_gbm.py) at least as new as its pickles is served
+from that instead: predict() then never unpickles anything or imports
+sklearn. Older compiled files (pickles retrained since) are ignored.
+
+IMPORTANT:
+- Cached frames are keyed on the artifact version, so retraining or
+  recalibrating a position invalidates them automatically
+- Callers get copies; cached frames are never handed out directly
+- FPL_DISABLE_COMPILED_MODELS=1 always uses the pickles
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.config.feature_masks import RANK_FEATURE_MASKS
+from src.models.compiled_gbm import CompiledGBM, compiled_path
+
+MODELS_DIR = Path("models")
+POSITIONS = ["Goalkeeper", "Defender", "Midfielder", "Forward"]
+RESULT_CACHE_SIZE = 8
+
+USE_COMPILED = os.environ.get("FPL_DISABLE_COMPILED_MODELS", "") == ""
+
+
+def _file_signature(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def validate_model_features(model, position: str) -> None:
+    """
+    Fails loudly if a model was trained on a different feature list
+    than the one RANK_FEATURE_MASKS will feed it.
+    """
+
+    expected = RANK_FEATURE_MASKS[position]
+    trained = getattr(model, "feature_names_in_", None)
+
+    if trained is None:
+        if getattr(model, "n_features_in_", len(expected)) != len(expected):
+            raise RuntimeError(
+                f"[{position}] model expects {model.n_features_in_} "
+                f"features, mask has {len(expected)}"
+            )
+        return
+
+    if list(trained) != list(expected):
+        raise RuntimeError(
+            f"[{position}] model features do not match RANK_FEATURE_MASKS: "
+            f"missing={sorted(set(expected) - set(trained))} "
+            f"extra={sorted(set(trained) - set(expected))}"
+        )
+
+
+class ModelRegistry:
+    def __init__(
+        self,
+        models_dir: Path = MODELS_DIR,
+        positions: list[str] = POSITIONS,
+        cache_size: int = RESULT_CACHE_SIZE,
+        use_compiled: bool = USE_COMPILED,
+    ):
+        self.models_dir = Path(models_dir)
+        self.positions = list(positions)
+        self.cache_size = cache_size
+        self.use_compiled = use_compiled
+
+        self._lock = threading.RLock()
+        self._artifacts: dict[Path, tuple[tuple[int, int], object]] = {}
+        self._results: OrderedDict = OrderedDict()
+
+    def _paths(self, position: str) -> tuple[Path, Path]:
+        name = position.lower()
+        return (
+            self.models_dir / f"{name}_gbm.pkl",
+            self.models_dir / f"{name}_calibrator.pkl",
+        )
+
+    def _compiled_path(self, position: str) -> Path | None:
+        """
+        The position's compiled model, if enabled and not older than any
+        of its pickles.
+        """
+
+        if not self.use_compiled:
+            return None
+
+        path = compiled_path(self.models_dir, position)
+        try:
+            compiled_mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        for pickle_path in self._paths(position):
+            if (
+                pickle_path.exists()
+                and pickle_path.stat().st_mtime_ns > compiled_mtime
+            ):
+                return None
+        return path
+
+    def _load(self, path: Path, position: str, is_model: bool) -> bool:
+        """
+        (Re)loads `path` if its mtime/size changed. Returns True on reload.
+        """
+
+        signature = _file_signature(path)
+        cached = self._artifacts.get(path)
+        if cached is not None and cached[0] == signature:
+            return False
+
+        if path.suffix == ".compiled":
+            artifact = CompiledGBM(path)
+        else:
+            import joblib
+
+            artifact = joblib.load(path)
+        if is_model:
+            validate_model_features(artifact, position)
+
+        self._artifacts[path] = (signature, artifact)
+        return True
+
+    def _load_position(self, position: str) -> bool:
+        compiled = self._compiled_path(position)
+        if compiled is not None:
+            return self._load(compiled, position, is_model=True)
+
+        model_path, calibrator_path = self._paths(position)
+        reloaded = self._load(model_path, position, is_model=True)
+        reloaded |= self._load(calibrator_path, position, is_model=False)
+        return reloaded
+
+    def refresh(self) -> bool:
+        """
+        Hot-reloads every artifact whose file changed since it was loaded.
+        """
+
+        reloaded = False
+        with self._lock:
+            for position in self.positions:
+                reloaded |= self._load_position(position)
+        return reloaded
+
+    def get(self, position: str):
+        """
+        Returns (model, calibrator) for a position, reloading if stale.
+        """
+
+        model_path, calibrator_path = self._paths(position)
+        with self._lock:
+            self._load(model_path, position, is_model=True)
+            self._load(calibrator_path, position, is_model=False)
+            return (
+                self._artifacts[model_path][1],
+                self._artifacts[calibrator_path][1],
+            )
+
+    def predict(
+        self,
+        position: str,
+        X: pd.DataFrame,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        (raw_score, predicted_points) for a position's feature rows, from
+        the compiled model when it is current, else model + calibrator.
+        """
+
+        with self._lock:
+            compiled = self._compiled_path(position)
+            if compiled is not None:
+                self._load(compiled, position, is_model=True)
+                model = self._artifacts[compiled][1]
+            else:
+                model, calibrator = self.get(position)
+
+        if compiled is not None:
+            points = model.predict(X)
+            return model.raw_scores(points), points
+
+        raw_score = model.predict(X)
+        return raw_score, calibrator.predict(raw_score.reshape(-1, 1))
+
+    @property
+    def version(self) -> str:
+        """
+        Fingerprint of all loaded artifact files (path, mtime, size).
+        """
+
+        with self._lock:
+            parts = sorted(
+                (str(path), signature)
+                for path, (signature, _) in self._artifacts.items()
+            )
+        return hashlib.sha1(repr(parts).encode()).hexdigest()[:12]
+
+    def cached_result(self, key) -> pd.DataFrame | None:
+        with self._lock:
+            df = self._results.get(key)
+            if df is None:
+                return None
+            self._results.move_to_end(key)
+            return df.copy()
+
+    def store_result(self, key, df: pd.DataFrame) -> None:
+        with self._lock:
+            self._results[key] = df.copy()
+            self._results.move_to_end(key)
+            while len(self._results) > self.cache_size:
+                self._results.popitem(last=False)
+
+    def clear_results(self) -> None:
+        with self._lock:
+            self._results.clear()
+
+
+_default_registry: ModelRegistry | None = None
+_default_lock = threading.Lock()
+
+
+def get_registry() -> ModelRegistry:
+    """
+    Process-wide registry used by predict_ranks.
+    """
+
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = ModelRegistry()
+        return _default_registry
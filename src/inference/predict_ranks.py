@@ -1,17 +1,75 @@
-import joblib
 import pandas as pd
 
+from src.data.loaders import (
+    DEFAULT_SEASON,
+    get_data_version,
+    get_last_completed_gw,
+)
 from src.pipeline.build_predictions import build_predictions
 from src.config.feature_masks import RANK_FEATURE_MASKS
 from src.models.postprocess_predictions import postprocess_predictions
+from src.inference.model_registry import (
+    POSITIONS,
+    ModelRegistry,
+    get_registry,
+)
+from src.utils.tracing import trace_stage, traced
+
+HORIZON_PLAYER_COLS = ["player_id", "web_name", "position", "team_code"]
+
+
+@traced()
+def predict_ranks(
+    current_gw: int | None = None,
+    season: str = DEFAULT_SEASON,
+    registry: ModelRegistry | None = None,
+    use_cache: bool = True,
+    target_gws: list[int] | None = None,
+):
+    """
+    Ranked predictions per position, one row per (player, fixture).
+
+    Models come from a warm ModelRegistry (compiled GBMs when current);
+    finished frames are cached per (season, current_gw, target GWs, raw
+    data version, artifact version).
+
+    NOTE:
+    - `target_gws` defaults to the next GW; for a multi-GW horizon every
+      position model runs ONE batched predict over all stacked rows
+    - Use predict_horizon for per-GW totals with doubles and blanks handled
+    """
+
+    # 🔑 SAME SOURCE OF TRUTH AS THE PIPELINE FOR CURRENT GW
+    if current_gw is None:
+        current_gw = get_last_completed_gw(season)
+
+    if registry is None:
+        registry = get_registry()
+
+    if target_gws is not None:
+        target_gws = sorted(set(target_gws))
+
+    with trace_stage("registry_refresh"):
+        registry.refresh()
+
+    cache_key = (
+        season,
+        current_gw,
+        tuple(target_gws) if target_gws is not None else None,
+        get_data_version(season),
+        registry.version,
+    )
 
-MODELS_DIR = "models"
-POSITIONS = ["Goalkeeper", "Defender", "Midfielder", "Forward"]
-
+    if use_cache:
+        cached = registry.cached_result(cache_key)
+        if cached is not None:
+            return cached
 
-def predict_ranks():
-    # 🔑 DO NOT pass current_gw — let pipeline decide
-    df = build_predictions()
+    df = build_predictions(
+        current_gw=current_gw,
+        season=season,
+        target_gws=target_gws,
+    )
     outputs = []
 
     for position in POSITIONS:
@@ -21,16 +79,11 @@ def predict_ranks():
 
         features = RANK_FEATURE_MASKS[position]
 
-        model = joblib.load(f"{MODELS_DIR}/{position.lower()}_gbm.pkl")
-        pos_df["raw_score"] = model.predict(pos_df[features])
-
-        calibrator = joblib.load(
-            f"{MODELS_DIR}/{position.lower()}_calibrator.pkl"
-        )
-
-        pos_df["predicted_points"] = calibrator.predict(
-            pos_df["raw_score"].values.reshape(-1, 1)
-        )
+        with trace_stage(f"predict_{position.lower()}") as stage:
+            raw_score, points = registry.predict(position, pos_df[features])
+            pos_df["raw_score"] = raw_score
+            pos_df["predicted_points"] = points
+            stage.rows = len(pos_df)
 
         pos_df = postprocess_predictions(pos_df)
         outputs.append(pos_df)
@@ -43,9 +96,77 @@ def predict_ranks():
         )
     )
 
+    # another thread may reload artifacts while this frame is built;
+    # versions only move forward, so an unchanged version means every
+    # position was predicted with the artifacts the key names
+    if registry.version == cache_key[-1]:
+        registry.store_result(cache_key, final_df)
+
     return final_df
 
 
+def aggregate_target_gws(
+    df: pd.DataFrame,
+    target_gws: list[int],
+) -> pd.DataFrame:
+    """
+    Collapses per-fixture predictions to one row per (player, target GW).
+
+    Double GWs sum their fixtures; a GW where the player's team blanks
+    gets predicted_points 0 and n_fixtures 0.
+    """
+
+    per_gw = (
+        df.groupby(["player_id", "target_gw"], sort=False)["predicted_points"]
+        .agg(predicted_points="sum", n_fixtures="size")
+        .reset_index()
+    )
+
+    players = df[HORIZON_PLAYER_COLS].drop_duplicates("player_id")
+    grid = players.merge(
+        pd.DataFrame({"target_gw": sorted(set(target_gws))}),
+        how="cross",
+    )
+
+    out = grid.merge(per_gw, on=["player_id", "target_gw"], how="left")
+    out["predicted_points"] = out["predicted_points"].fillna(0.0)
+    out["n_fixtures"] = out["n_fixtures"].fillna(0).astype(int)
+
+    return out.sort_values(
+        ["position", "target_gw", "predicted_points"],
+        ascending=[True, True, False],
+    ).reset_index(drop=True)
+
+
+def predict_horizon(
+    current_gw: int | None = None,
+    n_gws: int = 6,
+    season: str = DEFAULT_SEASON,
+    registry: ModelRegistry | None = None,
+) -> pd.DataFrame:
+    """
+    Expected points for each of the next `n_gws` gameweeks, per player.
+
+    NOTE:
+    - One feature build and one batched inference pass for the horizon
+    - Players are those with at least one fixture in the horizon
+    """
+
+    if current_gw is None:
+        current_gw = get_last_completed_gw(season)
+
+    target_gws = list(range(current_gw + 1, current_gw + n_gws + 1))
+
+    df = predict_ranks(
+        current_gw=current_gw,
+        season=season,
+        registry=registry,
+        target_gws=target_gws,
+    )
+
+    return aggregate_target_gws(df, target_gws)
+
+
 if __name__ == "__main__":
     df = predict_ranks()
 
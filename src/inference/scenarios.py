@@ -0,0 +1,458 @@
+"""
+Batched what-if scenarios on top of the prediction features.
+
+A Scenario perturbs the inputs of one prediction run:
+
+- team_elo     Elo change per team_code; every fixture the team plays
+               moves, for both sides
+- swap_venue   team_codes whose fixtures are played at the other ground
+- minutes      minutes per match for a player over the whole form window
+- overrides    feature values per player, e.g. {"xg_avg_last_5": 0.6}
+
+run_scenarios builds the prediction features once, stacks a perturbed
+copy per scenario into one (scenarios x rows x columns) array, re-derives
+whatever depends on the perturbed columns (fixture_difficulty from
+effective_elo_diff, trends, low_confidence, peer-relative features) and
+evaluates every scenario in one batched predict per position.
+
+NOTE:
+- Rows whose model features a scenario leaves untouched reuse the
+  baseline prediction, so a scenario costs only the rows it changes
+  (an Elo change: the team's and its opponents' rows; a minutes change:
+  the player's position group, whose relative features all move)
+- Minutes scenarios assume an appearance in every form-window GW; the
+  per-appearance stats (xG, xA, ...) keep their values
+- Overrides are applied last and win over re-derived values
+- Points go through postprocess_predictions like predict_ranks, so an
+  empty Scenario reproduces predict_ranks exactly
+
+Usage:
+    python -m src.inference.scenarios --elo 14:-50 --minutes 328:90 --swap 3
+"""
+
+import argparse
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from src.config.constants import (
+    HOME_ELO_BONUS,
+    LOW_CONFIDENCE_GAMES_THRESHOLD,
+    LOW_CONFIDENCE_MINUTES_THRESHOLD,
+    ROLLING_WINDOWS,
+)
+from src.config.feature_masks import RANK_FEATURE_MASKS
+from src.data.loaders import DEFAULT_SEASON, get_last_completed_gw
+from src.features.fixture_difficulty import elo_to_base_multiplier_array
+from src.features.relative_features import GROUP_COLS, RELATIVE_COLS, Z_EPSILON
+from src.inference.model_registry import POSITIONS, ModelRegistry, get_registry
+from src.models.postprocess_predictions import postprocess_predictions
+from src.pipeline.build_predictions import build_predictions
+from src.utils.tracing import trace_stage, traced
+
+# (trend, recent window, form window), as in add_trend_features
+TREND_FEATURES = [
+    ("xg_trend", "xg_avg_last_3", "xg_avg_last_5"),
+    ("xa_trend", "xa_avg_last_3", "xa_avg_last_5"),
+    ("minutes_trend", "minutes_avg_last_3", "minutes_avg_last_5"),
+    ("defcon_trend", "defcon_avg_last_3", "defcon_avg_last_5"),
+]
+
+# descriptive columns copied from the prediction rows into the results
+RESULT_INFO_COLUMNS = [
+    "player_id", "web_name", "position", "team_code",
+    "opponent_id", "target_gw",
+]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    team_elo: dict[int, float] = field(default_factory=dict)
+    swap_venue: tuple[int, ...] = ()
+    minutes: dict[int, float] = field(default_factory=dict)
+    overrides: dict[int, dict[str, float]] = field(default_factory=dict)
+
+
+def _stack_columns(base: pd.DataFrame) -> list[str]:
+    """
+    Columns a scenario can change: model features and their sources.
+    """
+
+    columns = ["effective_elo_diff", "fixture_difficulty", "low_confidence"]
+    for w in ROLLING_WINDOWS:
+        columns += [
+            f"appearances_last_{w}",
+            f"minutes_sum_last_{w}",
+            f"minutes_avg_last_{w}",
+        ]
+    for trend, recent, form in TREND_FEATURES:
+        columns += [trend, recent, form]
+    for col in RELATIVE_COLS:
+        columns += [col, f"{col}_rel", f"{col}_z"]
+    for features in RANK_FEATURE_MASKS.values():
+        columns += features
+
+    return [col for col in dict.fromkeys(columns) if col in base.columns]
+
+
+def _perturb_fixtures(
+    values: np.ndarray,
+    col: dict[str, int],
+    base: pd.DataFrame,
+    scenarios: list[Scenario],
+) -> np.ndarray:
+    """
+    Applies Elo shifts and venue swaps to effective_elo_diff and
+    fixture_difficulty. Returns is_home per (scenario, row).
+    """
+
+    teams = pd.Index(pd.unique(np.concatenate([
+        base["team_id"].to_numpy(),
+        base["opponent_id"].to_numpy(),
+        [team for s in scenarios for team in s.team_elo],
+        [team for s in scenarios for team in s.swap_venue],
+    ]).astype(np.int64)))
+    team_idx = teams.get_indexer(base["team_id"])
+    opponent_idx = teams.get_indexer(base["opponent_id"])
+
+    shift = np.zeros((len(scenarios), len(teams)))
+    swap = np.zeros((len(scenarios), len(teams)), dtype=bool)
+    for s, scenario in enumerate(scenarios):
+        for team, delta in scenario.team_elo.items():
+            shift[s, teams.get_loc(team)] += delta
+        for team in scenario.swap_venue:
+            swap[s, teams.get_loc(team)] = True
+
+    is_home = base["is_home"].to_numpy(dtype=bool)
+    new_home = is_home ^ (swap[:, team_idx] | swap[:, opponent_idx])
+
+    base_diff = values[:, :, col["effective_elo_diff"]]
+    diff = (
+        base_diff
+        + shift[:, team_idx]
+        - shift[:, opponent_idx]
+        + HOME_ELO_BONUS * (new_home.astype(np.int64) - is_home)
+    )
+
+    moved = diff != base_diff
+    values[:, :, col["effective_elo_diff"]] = diff
+    if "fixture_difficulty" in col:
+        values[:, :, col["fixture_difficulty"]][moved] = (
+            elo_to_base_multiplier_array(diff[moved])
+        )
+
+    return new_home
+
+
+def _player_rows(base: pd.DataFrame, player_id: int) -> np.ndarray:
+    return np.flatnonzero(base["player_id"].to_numpy() == player_id)
+
+
+def _apply_overrides(
+    values: np.ndarray,
+    col: dict[str, int],
+    base: pd.DataFrame,
+    scenarios: list[Scenario],
+    only: set[str] | None = None,
+) -> None:
+    for s, scenario in enumerate(scenarios):
+        for player_id, features in scenario.overrides.items():
+            rows = _player_rows(base, player_id)
+            for feature, value in features.items():
+                if feature not in col:
+                    raise ValueError(
+                        f"[{scenario.name}] cannot override {feature!r}"
+                    )
+                if only is None or feature in only:
+                    values[s, rows, col[feature]] = value
+
+
+def _apply_minutes(
+    values: np.ndarray,
+    col: dict[str, int],
+    base: pd.DataFrame,
+    scenarios: list[Scenario],
+) -> None:
+    for s, scenario in enumerate(scenarios):
+        for player_id, minutes in scenario.minutes.items():
+            rows = _player_rows(base, player_id)
+            for w in ROLLING_WINDOWS:
+                played = w if minutes > 0 else 0
+                for name, value in [
+                    (f"appearances_last_{w}", played),
+                    (f"minutes_sum_last_{w}", played * minutes),
+                    (f"minutes_avg_last_{w}", minutes if played else 0.0),
+                ]:
+                    if name in col:
+                        values[s, rows, col[name]] = value
+
+
+def _rederive(
+    values: np.ndarray,
+    base_values: np.ndarray,
+    col: dict[str, int],
+    base: pd.DataFrame,
+) -> None:
+    """
+    Recomputes trends, low_confidence and relative features wherever a
+    column they derive from differs from the baseline.
+    """
+
+    touched = values != base_values
+
+    for trend, recent, form in TREND_FEATURES:
+        if not {trend, recent, form} <= col.keys():
+            continue
+        moved = touched[:, :, col[recent]] | touched[:, :, col[form]]
+        values[:, :, col[trend]][moved] = (
+            values[:, :, col[recent]][moved] - values[:, :, col[form]][moved]
+        )
+
+    flag_sources = {"appearances_last_5", "minutes_avg_last_5"}
+    if flag_sources | {"low_confidence"} <= col.keys():
+        moved = (
+            touched[:, :, col["appearances_last_5"]]
+            | touched[:, :, col["minutes_avg_last_5"]]
+        )
+        values[:, :, col["low_confidence"]][moved] = (
+            (values[:, :, col["appearances_last_5"]][moved]
+             < LOW_CONFIDENCE_GAMES_THRESHOLD)
+            | (values[:, :, col["minutes_avg_last_5"]][moved]
+               < LOW_CONFIDENCE_MINUTES_THRESHOLD)
+        )
+
+    sources = [
+        c for c in RELATIVE_COLS if {c, f"{c}_rel", f"{c}_z"} <= col.keys()
+    ]
+    if not sources:
+        return
+
+    source_idx = [col[c] for c in sources]
+    rel_idx = [col[f"{c}_rel"] for c in sources]
+    z_idx = [col[f"{c}_z"] for c in sources]
+
+    groups = base.groupby(GROUP_COLS, sort=False, observed=True).indices
+    for rows in groups.values():
+        # only (scenario, peer group) blocks whose sources moved
+        moved = np.flatnonzero(
+            touched[:, rows][:, :, source_idx].any(axis=(1, 2))
+        )
+        if not len(moved):
+            continue
+
+        block = values[np.ix_(moved, rows, source_idx)]
+        centred = block - block.mean(axis=1, keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std = block.std(axis=1, ddof=1, keepdims=True)
+            values[np.ix_(moved, rows, rel_idx)] = centred
+            values[np.ix_(moved, rows, z_idx)] = centred / (std + Z_EPSILON)
+
+
+def _same(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return (a == b) | (np.isnan(a) & np.isnan(b))
+
+
+@traced()
+def run_scenarios(
+    scenarios: list[Scenario],
+    current_gw: int | None = None,
+    season: str = DEFAULT_SEASON,
+    target_gws: list[int] | None = None,
+    registry: ModelRegistry | None = None,
+) -> pd.DataFrame:
+    """
+    One row per (scenario, player, fixture), in scenario order, with
+    raw_score, predicted_points, the baseline's points (base_points) and
+    points_delta.
+
+    NOTE:
+    - `target_gws` defaults to the next GW, as in predict_ranks
+    - Memory is one float64 (scenarios x rows x ~60 columns) array
+    """
+
+    names = [scenario.name for scenario in scenarios]
+    if len(set(names)) != len(names):
+        raise ValueError("Scenario names must be unique")
+
+    if current_gw is None:
+        current_gw = get_last_completed_gw(season)
+
+    if registry is None:
+        registry = get_registry()
+    registry.refresh()
+
+    base = build_predictions(
+        current_gw=current_gw, season=season, target_gws=target_gws
+    )
+    if base.empty or not scenarios:
+        return pd.DataFrame()
+    base = base.reset_index(drop=True)
+
+    columns = _stack_columns(base)
+    col = {name: j for j, name in enumerate(columns)}
+    n_scenarios, n_rows = len(scenarios), len(base)
+
+    with trace_stage("perturb_features") as stage:
+        base_values = base[columns].to_numpy(dtype=np.float64)
+        values = np.repeat(base_values[None], n_scenarios, axis=0)
+
+        is_home = _perturb_fixtures(values, col, base, scenarios)
+        _apply_minutes(values, col, base, scenarios)
+        _apply_overrides(values, col, base, scenarios)
+        _rederive(values, base_values, col, base)
+        _apply_overrides(
+            values, col, base, scenarios,
+            only={
+                c for c in columns
+                if c.endswith(("_trend", "_rel", "_z"))
+                or c in ("low_confidence", "fixture_difficulty")
+            },
+        )
+
+        # round back to the frame's precision (float32 columns), so
+        # scenarios see the values a rebuilt frame would hold
+        for name, j in col.items():
+            if base[name].dtype == np.float32:
+                values[:, :, j] = values[:, :, j].astype(np.float32)
+        stage.rows = n_scenarios * n_rows
+
+    raw_score = np.full((n_scenarios, n_rows), np.nan)
+    points = np.full((n_scenarios, n_rows), np.nan)
+    base_raw = np.full(n_rows, np.nan)
+    base_points = np.full(n_rows, np.nan)
+
+    positions = base["position"].astype(str).to_numpy()
+    for position in POSITIONS:
+        rows = np.flatnonzero(positions == position)
+        if not len(rows):
+            continue
+
+        features = RANK_FEATURE_MASKS[position]
+        feature_idx = [col[f] for f in features]
+
+        base_X = base_values[np.ix_(rows, feature_idx)]
+        X = values[:, rows][:, :, feature_idx]
+        changed = ~_same(X, base_X[None]).all(axis=2)
+
+        with trace_stage(f"predict_{position.lower()}") as stage:
+            batch = np.concatenate([base_X, X[changed]])
+            raw, pts = registry.predict(
+                position, pd.DataFrame(batch, columns=features)
+            )
+            stage.rows = len(batch)
+
+        base_raw[rows] = raw[:len(rows)]
+        base_points[rows] = pts[:len(rows)]
+
+        block_raw = np.repeat(raw[None, :len(rows)], n_scenarios, axis=0)
+        block_points = np.repeat(pts[None, :len(rows)], n_scenarios, axis=0)
+        block_raw[changed] = raw[len(rows):]
+        block_points[changed] = pts[len(rows):]
+        raw_score[:, rows] = block_raw
+        points[:, rows] = block_points
+
+    info = base[RESULT_INFO_COLUMNS]
+    out = pd.DataFrame({
+        "scenario": np.repeat(names, n_rows),
+        **{c: np.tile(info[c].to_numpy(), n_scenarios) for c in info.columns},
+        "is_home": is_home.ravel(),
+        "effective_elo_diff": values[:, :, col["effective_elo_diff"]].ravel(),
+        "fixture_difficulty": values[:, :, col["fixture_difficulty"]].ravel(),
+        "minutes_avg_last_5": values[:, :, col["minutes_avg_last_5"]].ravel(),
+        "low_confidence": values[:, :, col["low_confidence"]].ravel() > 0,
+        "raw_score": raw_score.ravel(),
+        "predicted_points": points.ravel(),
+    })
+    out = out.astype({
+        c: base[c].dtype
+        for c in ["web_name", "position", "minutes_avg_last_5"]
+    })
+    out = postprocess_predictions(out)
+
+    baseline = base[
+        ["minutes_avg_last_5", "low_confidence"]
+    ].assign(predicted_points=base_points)
+    out["base_points"] = np.tile(
+        postprocess_predictions(baseline)["predicted_points"].to_numpy(),
+        n_scenarios,
+    )
+    out["points_delta"] = out["predicted_points"] - out["base_points"]
+
+    return out
+
+
+def scenario_matrix(
+    results: pd.DataFrame,
+    value: str = "predicted_points",
+) -> pd.DataFrame:
+    """
+    (scenario x player_id) table of `value` summed over each player's
+    fixtures, scenarios in run order.
+    """
+
+    table = results.pivot_table(
+        index="scenario",
+        columns="player_id",
+        values=value,
+        aggfunc="sum",
+        observed=True,
+    )
+    return table.loc[pd.unique(results["scenario"])]
+
+
+def _pairs(items: list[str], cast) -> list[tuple[int, float]]:
+    pairs = []
+    for item in items:
+        key, value = item.split(":")
+        pairs.append((int(key), cast(value)))
+    return pairs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="What-if scenarios")
+    parser.add_argument(
+        "--elo", nargs="*", default=[], metavar="TEAM:DELTA",
+        help="one scenario per team Elo change",
+    )
+    parser.add_argument(
+        "--swap", nargs="*", default=[], type=int, metavar="TEAM",
+        help="one scenario per team playing its fixtures at the other ground",
+    )
+    parser.add_argument(
+        "--minutes", nargs="*", default=[], metavar="PLAYER:MINUTES",
+        help="one scenario per player minutes assumption",
+    )
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    scenarios = [Scenario("baseline")]
+    scenarios += [
+        Scenario(f"team {team} elo {delta:+g}", team_elo={team: delta})
+        for team, delta in _pairs(args.elo, float)
+    ]
+    scenarios += [
+        Scenario(f"team {team} venue swapped", swap_venue=(team,))
+        for team in args.swap
+    ]
+    scenarios += [
+        Scenario(f"player {player} {minutes:g} min", minutes={player: minutes})
+        for player, minutes in _pairs(args.minutes, float)
+    ]
+
+    results = run_scenarios(scenarios)
+
+    for name, df in results.groupby("scenario", sort=False):
+        if name == "baseline":
+            continue
+        movers = df.reindex(
+            df["points_delta"].abs().sort_values(ascending=False).index
+        ).head(args.top)
+        print(f"\n--- {name.upper()} ---")
+        print(
+            movers[["web_name", "position", "target_gw", "base_points",
+                    "predicted_points", "points_delta"]]
+            .round(2)
+            .to_string(index=False)
+        )
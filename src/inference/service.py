@@ -0,0 +1,401 @@
+"""
+Local prediction service.
+
+Long-running HTTP process on top of predict_ranks: models and the current
+ranked frame stay warm in memory, a background thread re-ranks as soon as
+a new gameweek completes (or raw data / artifacts change), and queries are
+answered from a pre-built index. The snapshot covers the next `horizon`
+GWs that have fixtures, so /predictions can filter by target_gw. Runs
+fully offline against the local data tree.
+
+Endpoints (GET, JSON):
+- /predictions?position=&team=&top_k=&target_gw=
+- /health
+- /stats      per-request latency percentiles
+
+Usage:
+    python -m src.inference.service --port 8765 [--horizon 5]
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from src.data.loaders import (
+    DEFAULT_SEASON,
+    _season_path,
+    get_data_version,
+    get_last_completed_gw,
+)
+from src.inference.model_registry import ModelRegistry, get_registry
+from src.inference.predict_ranks import predict_ranks
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+REFRESH_INTERVAL_S = 30.0
+# upcoming GWs held in the snapshot
+DEFAULT_HORIZON = 5
+LATENCY_WINDOW = 10_000
+
+RECORD_COLUMNS = [
+    "player_id",
+    "web_name",
+    "position",
+    "team_code",
+    "opponent_id",
+    "is_home",
+    "target_gw",
+    "fixture_difficulty",
+    "predicted_points",
+]
+
+POSITION_ALIASES = {
+    "gk": "Goalkeeper",
+    "gkp": "Goalkeeper",
+    "goalkeeper": "Goalkeeper",
+    "def": "Defender",
+    "defender": "Defender",
+    "mid": "Midfielder",
+    "midfielder": "Midfielder",
+    "fwd": "Forward",
+    "forward": "Forward",
+}
+
+
+class QueryError(ValueError):
+    """Bad query parameters; reported to the client as HTTP 400."""
+
+
+def _json_value(value):
+    """
+    Plain Python value for json.dumps; NaN / NA become None (null).
+    """
+
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is not None and not isinstance(value, str) and pd.isna(value):
+        return None
+    return value
+
+
+class PredictionService:
+    """
+    Holds the latest ranked predictions as an in-memory index.
+
+    Snapshots are swapped atomically, so queries never block on a refresh.
+    """
+
+    def __init__(
+        self,
+        season: str = DEFAULT_SEASON,
+        registry: ModelRegistry | None = None,
+        horizon: int = DEFAULT_HORIZON,
+    ):
+        if horizon < 1:
+            raise ValueError("horizon must be at least 1")
+
+        self.season = season
+        self.registry = registry or get_registry()
+        self.horizon = horizon
+
+        self._refresh_lock = threading.Lock()
+        self._snapshot: dict | None = None
+
+        self._latency_lock = threading.Lock()
+        self._latencies_ms: deque = deque(maxlen=LATENCY_WINDOW)
+        self._requests = 0
+
+    # --------------------------------------------------------------
+    # Snapshot management
+    # --------------------------------------------------------------
+    def _state_key(self) -> tuple:
+        self.registry.refresh()
+        return (
+            get_last_completed_gw(self.season),
+            get_data_version(self.season),
+            self.registry.version,
+        )
+
+    def _target_gws(self, current_gw: int) -> list[int]:
+        """
+        The next `horizon` GWs, stopping at the last GW with fixtures
+        (the next GW is always kept, so a finished season still fails
+        loudly in predict_ranks).
+        """
+
+        base = _season_path(self.season)
+        upcoming = range(current_gw + 1, current_gw + 1 + self.horizon)
+        return [
+            gw for gw in upcoming
+            if gw == current_gw + 1
+            or (base / f"GW{gw}" / "fixtures.csv").exists()
+        ]
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Re-ranks if the completed GW, raw data or artifacts changed.
+        Returns True when a new snapshot was published.
+        """
+
+        with self._refresh_lock:
+            state = self._state_key()
+            if (
+                not force
+                and self._snapshot is not None
+                and self._snapshot["state"] == state
+            ):
+                return False
+
+            started = time.perf_counter()
+            df = predict_ranks(
+                current_gw=state[0],
+                season=self.season,
+                registry=self.registry,
+                target_gws=self._target_gws(state[0]),
+            )
+
+            ranked = df.sort_values(
+                "predicted_points", ascending=False, kind="stable"
+            )
+            records = [
+                {k: _json_value(v) for k, v in row.items()}
+                for row in ranked[RECORD_COLUMNS].to_dict("records")
+            ]
+
+            by_position: dict[str, list] = {}
+            for record in records:
+                by_position.setdefault(record["position"], []).append(record)
+
+            self._snapshot = {
+                "state": state,
+                "current_gw": state[0],
+                "target_gws": sorted({r["target_gw"] for r in records}),
+                "records": records,
+                "by_position": by_position,
+                "built_at": time.time(),
+                "build_seconds": time.perf_counter() - started,
+            }
+            return True
+
+    def run_refresher(
+        self,
+        interval_s: float = REFRESH_INTERVAL_S,
+        stop: threading.Event | None = None,
+    ) -> threading.Thread:
+        stop = stop or threading.Event()
+
+        def loop():
+            while not stop.wait(interval_s):
+                try:
+                    self.refresh()
+                except Exception as exc:  # keep serving the last snapshot
+                    print(f"[service] refresh failed: {exc!r}")
+
+        thread = threading.Thread(target=loop, daemon=True)
+        thread.start()
+        return thread
+
+    # --------------------------------------------------------------
+    # Queries
+    # --------------------------------------------------------------
+    def query(
+        self,
+        position: str | None = None,
+        team: int | None = None,
+        top_k: int | None = None,
+        target_gw: int | None = None,
+    ) -> dict:
+        if top_k is not None and top_k < 1:
+            raise QueryError("top_k must be at least 1")
+
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise RuntimeError("Service has no predictions loaded")
+
+        if target_gw is not None and target_gw not in snapshot["target_gws"]:
+            raise QueryError(
+                f"target_gw {target_gw} not available; "
+                f"have {snapshot['target_gws']}"
+            )
+
+        if position is None:
+            records = snapshot["records"]
+        else:
+            name = POSITION_ALIASES.get(position.lower())
+            if name is None:
+                raise QueryError(f"Unknown position: {position}")
+            records = snapshot["by_position"].get(name, [])
+
+        if team is not None:
+            records = [r for r in records if r["team_code"] == team]
+
+        if target_gw is not None:
+            records = [r for r in records if r["target_gw"] == target_gw]
+
+        if top_k is not None:
+            records = records[:top_k]
+
+        return {
+            "current_gw": snapshot["current_gw"],
+            "target_gws": snapshot["target_gws"],
+            "count": len(records),
+            "predictions": records,
+        }
+
+    def health(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "status": "ok" if snapshot is not None else "loading",
+            "season": self.season,
+            "current_gw": snapshot and snapshot["current_gw"],
+            "target_gws": snapshot and snapshot["target_gws"],
+            "horizon": self.horizon,
+            "artifact_version": self.registry.version,
+            "snapshot_built_at": snapshot and snapshot["built_at"],
+            "snapshot_build_seconds": snapshot and snapshot["build_seconds"],
+        }
+
+    # --------------------------------------------------------------
+    # Latency accounting
+    # --------------------------------------------------------------
+    def record_latency(self, ms: float) -> None:
+        with self._latency_lock:
+            self._latencies_ms.append(ms)
+            self._requests += 1
+
+    def stats(self) -> dict:
+        with self._latency_lock:
+            latencies = np.array(self._latencies_ms)
+            requests = self._requests
+
+        if latencies.size == 0:
+            return {"requests": requests}
+
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        return {
+            "requests": requests,
+            "window": int(latencies.size),
+            "latency_ms": {
+                "p50": round(float(p50), 3),
+                "p95": round(float(p95), 3),
+                "p99": round(float(p99), 3),
+                "max": round(float(latencies.max()), 3),
+            },
+        }
+
+
+def _int_param(params: dict, name: str) -> int | None:
+    if name not in params:
+        return None
+    try:
+        return int(params[name][0])
+    except ValueError:
+        raise QueryError(f"{name} must be an integer") from None
+
+
+def make_handler(service: PredictionService):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload: dict, started: float) -> None:
+            body = json.dumps(payload).encode()
+            elapsed_ms = (time.perf_counter() - started) * 1e3
+            service.record_latency(elapsed_ms)
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("X-Response-Time-Ms", f"{elapsed_ms:.3f}")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            started = time.perf_counter()
+            url = urlparse(self.path)
+            params = parse_qs(url.query)
+
+            try:
+                if url.path == "/predictions":
+                    payload = service.query(
+                        position=params.get("position", [None])[0],
+                        team=_int_param(params, "team"),
+                        top_k=_int_param(params, "top_k"),
+                        target_gw=_int_param(params, "target_gw"),
+                    )
+                elif url.path == "/health":
+                    payload = service.health()
+                elif url.path == "/stats":
+                    payload = service.stats()
+                else:
+                    self._send(404, {"error": "not found"}, started)
+                    return
+            except QueryError as exc:
+                self._send(400, {"error": str(exc)}, started)
+                return
+            except RuntimeError as exc:
+                self._send(503, {"error": str(exc)}, started)
+                return
+            except Exception as exc:  # answer in JSON, keep serving
+                print(f"[service] {url.path} failed: {exc!r}")
+                self._send(500, {"error": "internal error"}, started)
+                return
+
+            self._send(200, payload, started)
+
+        def log_message(self, format, *args):
+            pass  # latency is tracked in /stats instead
+
+    return Handler
+
+
+def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    season: str = DEFAULT_SEASON,
+    refresh_interval_s: float = REFRESH_INTERVAL_S,
+    horizon: int = DEFAULT_HORIZON,
+) -> None:
+    service = PredictionService(season=season, horizon=horizon)
+    service.refresh(force=True)
+    service.run_refresher(refresh_interval_s)
+
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print(
+        f"Serving GW{service.health()['target_gws']} predictions "
+        f"on http://{host}:{port}"
+    )
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--season", default=DEFAULT_SEASON)
+    parser.add_argument(
+        "--refresh-interval", type=float, default=REFRESH_INTERVAL_S
+    )
+    parser.add_argument(
+        "--horizon", type=int, default=DEFAULT_HORIZON,
+        help="upcoming gameweeks to serve",
+    )
+    args = parser.parse_args()
+
+    serve(
+        host=args.host,
+        port=args.port,
+        season=args.season,
+        refresh_interval_s=args.refresh_interval,
+        horizon=args.horizon,
+    )
@@ -9,6 +9,7 @@ from scipy.stats import spearmanr
 
 from src.pipeline.build_training_dataset import build_training_dataset
 from src.config.feature_masks import RANK_FEATURE_MASKS
+from src.models.compiled_gbm import export_models_dir
 
 MODELS_DIR = Path("models")
 CALIBRATION_GWS = list(range(11, 17))
@@ -23,14 +24,45 @@ def evaluate(y_true, y_pred):
     }
 
 
-def calibrate_position(df: pd.DataFrame, position: str):
-    print(f"\n=== CALIBRATING {position.upper()} ===")
-
-    calib_df = df[
+def calibration_rows(df: pd.DataFrame, position: str) -> pd.DataFrame:
+    return df[
         (df["position"] == position)
         & (df["target_gw"].isin(CALIBRATION_GWS))
     ]
 
+
+def fit_calibrator(raw_pred: np.ndarray, y: pd.Series):
+    """
+    Linear map from raw model scores to points.
+
+    Returns (calibrator, metrics before, metrics after).
+    """
+
+    lr = LinearRegression()
+    lr.fit(raw_pred.reshape(-1, 1), y)
+
+    calibrated = lr.predict(raw_pred.reshape(-1, 1))
+
+    return lr, evaluate(y, raw_pred), evaluate(y, calibrated)
+
+
+def identity_calibrator() -> LinearRegression:
+    """
+    A fitted calibrator that returns raw scores unchanged, for positions
+    without calibration rows.
+    """
+
+    lr = LinearRegression().fit([[0.0], [1.0]], [0.0, 1.0])
+    lr.coef_ = np.array([1.0])
+    lr.intercept_ = 0.0
+    return lr
+
+
+def calibrate_position(df: pd.DataFrame, position: str):
+    print(f"\n=== CALIBRATING {position.upper()} ===")
+
+    calib_df = calibration_rows(df, position)
+
     if calib_df.empty:
         print("No data — skipping")
         return
@@ -41,13 +73,7 @@ def calibrate_position(df: pd.DataFrame, position: str):
     model = joblib.load(MODELS_DIR / f"{position.lower()}_gbm.pkl")
     raw_pred = model.predict(X)
 
-    lr = LinearRegression()
-    lr.fit(raw_pred.reshape(-1, 1), y)
-
-    calibrated = lr.predict(raw_pred.reshape(-1, 1))
-
-    before = evaluate(y, raw_pred)
-    after = evaluate(y, calibrated)
+    lr, before, after = fit_calibrator(raw_pred, y)
 
     print("BEFORE:", before)
     print("AFTER :", after)
@@ -59,4 +85,7 @@ if __name__ == "__main__":
     df = build_training_dataset(6, 16)
 
     for pos in POSITIONS:
-        calibrate_position(df, pos)
\ No newline at end of file
+        calibrate_position(df, pos)
+
+    # new calibrators make the compiled models stale; fold them back in
+    export_models_dir(MODELS_DIR, POSITIONS)
\ No newline at end of file
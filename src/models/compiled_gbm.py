@@ -0,0 +1,332 @@
+"""
+Compiled, pickle-free inference format for the position GBMs.
+
+export_compiled lays every tree of a trained HistGradientBoostingRegressor
+out as a complete binary tree of the model's depth (heap order: node i
+has children 2i+1 and 2i+2, shallower leaves are padded with splits
+whose leaves all carry the leaf's value) and folds the linear calibrator
+into the leaf values:
+
+    points = coef * (baseline + sum(leaf values)) + intercept
+           = (coef * baseline + intercept) + sum(coef * leaf values)
+
+so one tree walk yields calibrated points. Everything goes into one
+`{position}_gbm.compiled` file: a JSON header followed by 64-byte aligned
+raw arrays, which CompiledGBM memory-maps on load.
+
+CompiledGBM.predict is pure NumPy: every row walks every tree at once,
+one vectorized step per tree level. The heap layout makes the next node
+arithmetic, so a level costs two gathers (split feature, threshold) and
+a compare. Results match calibrator.predict(model.predict(X)) to float
+tolerance; only the order of the leaf sums differs.
+
+IMPORTANT:
+- This module must not import sklearn: inference loads compiled models
+  without it
+- Only numeric splits are supported; export refuses categorical ones
+- Padding doubles the nodes per level, so export refuses trees deeper
+  than MAX_DEPTH (hparam_search stays well below it)
+
+Usage:
+    python -m src.models.compiled_gbm [--models-dir models]
+"""
+
+import argparse
+import json
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+from src.config.feature_masks import RANK_FEATURE_MASKS
+
+MAGIC = b"FPLGBM1\n"
+COMPILED_SUFFIX = "_gbm.compiled"
+ALIGN = 64
+
+# rows walked through the trees at once; bounds the (rows x trees) state
+BATCH_ROWS = 4096
+
+# deepest tree export accepts (2**depth leaves per tree)
+MAX_DEPTH = 12
+
+POSITIONS = ["Goalkeeper", "Defender", "Midfielder", "Forward"]
+
+# name -> dtype of every array in the file; all but `value` are
+# (trees, 2**depth - 1) split nodes, `value` is (trees, 2**depth) leaves
+NODE_ARRAYS = {
+    "feature": np.int32,
+    "threshold": np.float64,
+    "missing_left": np.bool_,
+    "value": np.float64,     # calibrated leaf values
+}
+
+
+def compiled_path(models_dir: Path, position: str) -> Path:
+    return Path(models_dir) / f"{position.lower()}{COMPILED_SUFFIX}"
+
+
+def _heap_trees(model) -> tuple[dict[str, np.ndarray], int]:
+    """
+    Heap-ordered split and leaf arrays for every tree of a fitted
+    HistGradientBoostingRegressor, plus their depth.
+    """
+
+    if getattr(model, "loss", "squared_error") != "squared_error":
+        raise ValueError(
+            f"Unsupported loss {model.loss!r} (identity link only)"
+        )
+
+    if getattr(model, "_preprocessor", None) is not None:
+        raise ValueError("Models with categorical features are not supported")
+
+    trees = [predictors[0].nodes for predictors in model._predictors]
+    if any(nodes["is_categorical"].any() for nodes in trees):
+        raise ValueError("Categorical splits are not supported")
+
+    depth = max(int(nodes["depth"].max()) for nodes in trees)
+    if depth > MAX_DEPTH:
+        raise ValueError(f"Trees are {depth} deep (at most {MAX_DEPTH})")
+
+    n_splits = 2 ** depth - 1
+    arrays = {
+        "feature": np.zeros((len(trees), n_splits), dtype=np.int32),
+        "threshold": np.full((len(trees), n_splits), np.inf),
+        "missing_left": np.ones((len(trees), n_splits), dtype=bool),
+        "value": np.zeros((len(trees), n_splits + 1)),
+    }
+
+    for tree, nodes in enumerate(trees):
+        stack = [(0, 0, 0)]    # (node, heap position, node depth)
+        while stack:
+            node, heap, node_depth = stack.pop()
+            record = nodes[node]
+
+            if record["is_leaf"]:
+                # every leaf below a padded position gets the value, so
+                # the padding splits' directions do not matter
+                span = 2 ** (depth - node_depth)
+                first = (heap + 1) * span - 1 - n_splits
+                arrays["value"][tree, first:first + span] = record["value"]
+                continue
+
+            arrays["feature"][tree, heap] = record["feature_idx"]
+            arrays["threshold"][tree, heap] = record["num_threshold"]
+            arrays["missing_left"][tree, heap] = record["missing_go_to_left"]
+            stack.append((record["left"], 2 * heap + 1, node_depth + 1))
+            stack.append((record["right"], 2 * heap + 2, node_depth + 1))
+
+    return arrays, depth
+
+
+def export_compiled(
+    model,
+    calibrator,
+    position: str,
+    path: Path,
+) -> Path:
+    """
+    Writes `model` with `calibrator` (a fitted LinearRegression, or None
+    for identity) folded in. Returns the written path.
+    """
+
+    arrays, depth = _heap_trees(model)
+
+    coef, intercept = 1.0, 0.0
+    if calibrator is not None:
+        coef = float(np.ravel(calibrator.coef_)[0])
+        intercept = float(np.ravel(calibrator.intercept_)[0])
+
+    baseline = float(np.ravel(model._baseline_prediction)[0])
+    arrays["value"] = arrays["value"] * coef
+
+    features = [str(f) for f in getattr(
+        model, "feature_names_in_", RANK_FEATURE_MASKS[position]
+    )]
+
+    header = {
+        "position": position,
+        "features": features,
+        "n_trees": len(arrays["value"]),
+        "depth": depth,
+        "baseline": coef * baseline + intercept,
+        "calibration": {"coef": coef, "intercept": intercept},
+        "arrays": {},
+    }
+
+    blobs = []
+    offset = 0
+    for name, dtype in NODE_ARRAYS.items():
+        values = np.ascontiguousarray(arrays[name], dtype=dtype)
+        offset = -(-offset // ALIGN) * ALIGN
+        header["arrays"][name] = {
+            "dtype": np.dtype(dtype).str,
+            "shape": list(values.shape),
+            "offset": offset,
+        }
+        blobs.append((offset, values))
+        offset += values.nbytes
+
+    header_bytes = json.dumps(header).encode()
+    data_start = -(-(len(MAGIC) + 8 + len(header_bytes)) // ALIGN) * ALIGN
+
+    path = Path(path)
+    # unique per writer: concurrent exports must not share a temp file
+    tmp_path = path.with_suffix(f".tmp-{uuid.uuid4().hex}")
+    with tmp_path.open("wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(header_bytes)).tobytes())
+        f.write(header_bytes)
+        for blob_offset, values in blobs:
+            f.seek(data_start + blob_offset)
+            f.write(values.tobytes())
+    tmp_path.replace(path)
+
+    return path
+
+
+class CompiledGBM:
+    """
+    A memory-mapped compiled model: predict(X) -> calibrated points.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+        raw = np.memmap(self.path, dtype=np.uint8, mode="r")
+        if bytes(raw[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{self.path} is not a compiled GBM")
+
+        header_len = int(raw[len(MAGIC):len(MAGIC) + 8].view(np.uint64)[0])
+        header_end = len(MAGIC) + 8 + header_len
+        header = json.loads(bytes(raw[len(MAGIC) + 8:header_end]))
+        data_start = -(-header_end // ALIGN) * ALIGN
+
+        self.position: str = header["position"]
+        self.features: list[str] = header["features"]
+        self.feature_names_in_ = np.array(self.features, dtype=object)
+        self.n_features_in_ = len(self.features)
+        self.depth: int = header["depth"]
+        self.baseline: float = header["baseline"]
+        self.coef: float = header["calibration"]["coef"]
+        self.intercept: float = header["calibration"]["intercept"]
+
+        arrays = {}
+        for name, spec in header["arrays"].items():
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"]))
+            start = data_start + spec["offset"]
+            arrays[name] = (
+                raw[start:start + count * dtype.itemsize]
+                .view(dtype)
+                .reshape(spec["shape"])
+            )
+
+        self.n_trees: int = header["n_trees"]
+
+        # flat views: tree t's split h is at t * n_splits + h
+        self.feature = arrays["feature"].ravel()
+        self.threshold = arrays["threshold"].ravel()
+        self.missing_left = arrays["missing_left"].ravel()
+        self.value = arrays["value"].ravel()
+
+        n_splits = 2 ** self.depth - 1
+        self._split_base = np.arange(self.n_trees) * n_splits
+        self._leaf_base = np.arange(self.n_trees) * (n_splits + 1) - n_splits
+
+    def _predict_batch(self, X: np.ndarray) -> np.ndarray:
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_offset = (np.arange(n_rows) * n_features)[:, None]
+        any_missing = np.isnan(flat_X).any()
+
+        # heap position of every (row, tree)
+        node = np.zeros((n_rows, self.n_trees), dtype=np.intp)
+
+        for _ in range(self.depth):
+            split = node + self._split_base
+            x = flat_X.take(row_offset + self.feature.take(split))
+            go_right = x > self.threshold.take(split)    # NaN -> False
+            if any_missing:
+                go_right |= np.isnan(x) & ~self.missing_left.take(split)
+            node = 2 * node + 1 + go_right
+
+        leaves = self.value.take(node + self._leaf_base)
+        return self.baseline + leaves.sum(axis=1)
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Calibrated points for `X` (array or DataFrame, columns in
+        `features` order), as float64.
+        """
+
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"[{self.position}] expected {self.n_features_in_} "
+                f"features, got shape {X.shape}"
+            )
+
+        if len(X) <= BATCH_ROWS:
+            return self._predict_batch(X)
+
+        return np.concatenate([
+            self._predict_batch(X[start:start + BATCH_ROWS])
+            for start in range(0, len(X), BATCH_ROWS)
+        ])
+
+    def raw_scores(self, points: np.ndarray) -> np.ndarray:
+        """
+        Uncalibrated model scores behind `points` (NaN when the
+        calibrator is constant).
+        """
+
+        if self.coef == 0.0:
+            return np.full(len(points), np.nan)
+        return (np.asarray(points) - self.intercept) / self.coef
+
+
+def export_models_dir(
+    models_dir: Path,
+    positions: list[str] = POSITIONS,
+) -> list[Path]:
+    """
+    Compiles every position's pickled model + calibrator in `models_dir`.
+    Positions without a model are skipped.
+    """
+
+    import joblib
+
+    written = []
+    for position in positions:
+        name = position.lower()
+        model_path = Path(models_dir) / f"{name}_gbm.pkl"
+        calibrator_path = Path(models_dir) / f"{name}_calibrator.pkl"
+
+        if not model_path.exists():
+            continue
+
+        calibrator = (
+            joblib.load(calibrator_path) if calibrator_path.exists() else None
+        )
+        written.append(export_compiled(
+            joblib.load(model_path),
+            calibrator,
+            position,
+            compiled_path(models_dir, position),
+        ))
+
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile position GBMs")
+    parser.add_argument("--models-dir", default="models")
+    args = parser.parse_args()
+
+    for path in export_models_dir(Path(args.models_dir)):
+        model = CompiledGBM(path)
+        print(
+            f"{model.position:<11} {model.n_trees} trees, "
+            f"depth {model.depth} -> {path}"
+        )
@@ -0,0 +1,53 @@
+"""
+GBM hyperparameters per position.
+
+DEFAULT_GBM_PARAMS are the hand-picked values every position shared so
+far. The hyperparameter search writes per-position winners to
+models/gbm_params.json; training and rolling CV read them through
+gbm_params_for(), falling back to the defaults.
+"""
+
+import json
+import os
+import uuid
+from pathlib import Path
+
+MODELS_DIR = Path("models")
+PARAMS_PATH = MODELS_DIR / "gbm_params.json"
+
+DEFAULT_GBM_PARAMS = dict(
+    max_depth=5,
+    learning_rate=0.05,
+    max_iter=300,
+    random_state=42,
+)
+
+
+def load_tuned_params(path: Path = PARAMS_PATH) -> dict[str, dict]:
+    """
+    position -> tuned params; empty when no search has been run.
+    """
+
+    try:
+        return json.loads(Path(path).read_text())["positions"]
+    except FileNotFoundError:
+        return {}
+
+
+def gbm_params_for(position: str, path: Path = PARAMS_PATH) -> dict:
+    return {**DEFAULT_GBM_PARAMS, **load_tuned_params(path).get(position, {})}
+
+
+def save_tuned_params(
+    params: dict[str, dict],
+    search: dict | None = None,
+    path: Path = PARAMS_PATH,
+) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = path.with_suffix(f".tmp-{uuid.uuid4().hex}")
+    tmp_path.write_text(
+        json.dumps({"positions": params, "search": search or {}}, indent=2)
+    )
+    os.replace(tmp_path, path)
@@ -0,0 +1,324 @@
+"""
+Per-position GBM hyperparameter search (successive halving).
+
+Candidates are scored with the rolling-CV scheme, ranked by mean
+Spearman over the folds seen so far. Every rung evaluates the surviving
+candidates on more folds (earliest validation GWs first) and keeps the
+top 1/ETA, so weak configs are dropped after the first few folds.
+Fold fits for all positions run together on the rolling-CV process pool.
+
+Each finished fold is appended to a local results table (CSV), keyed by
+position, config id, validation GW and the data it was scored on (a
+hash of the position's training matrix, plus the feature code hash); an
+interrupted search picks up where it stopped, and new GWs or feature
+changes are scored afresh. Winners are written per position to
+gbm_params.json, which training and rolling CV read.
+
+Usage:
+    python -m src.models.hparam_search [--candidates 16] [--fresh]
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.data.feature_store import feature_code_hash
+from src.models.gbm_params import (
+    DEFAULT_GBM_PARAMS,
+    MODELS_DIR,
+    save_tuned_params,
+)
+from src.models.rolling_cv import (
+    END_GW,
+    POSITIONS,
+    START_GW,
+    position_matrix,
+    validation_gws,
+    map_folds,
+)
+
+SEARCH_DIR = MODELS_DIR / "hparam_search"
+RESULTS_PATH = SEARCH_DIR / "results.csv"
+
+PARAM_SPACE = {
+    "learning_rate": [0.03, 0.05, 0.1],
+    "max_depth": [3, 4, 5, 6],
+    "max_iter": [150, 300, 500],
+    "min_samples_leaf": [10, 20, 40],
+    "l2_regularization": [0.0, 0.1, 1.0],
+}
+
+N_CANDIDATES = 16
+ETA = 3
+# cumulative number of folds each rung is scored on
+RUNG_FOLDS = [2, 4, 6]
+SEED = 0
+
+RESULT_COLUMNS = [
+    "position", "config_id", "params", "val_gw",
+    "data_version", "feature_hash", "rmse", "mae", "spearman",
+]
+
+
+def config_id(params: dict) -> str:
+    payload = json.dumps(params, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:10]
+
+
+def sample_candidates(
+    n: int = N_CANDIDATES,
+    seed: int = SEED,
+) -> list[dict]:
+    """
+    The current defaults first, then distinct grid points in a fixed
+    random order.
+    """
+
+    grid = [
+        dict(zip(PARAM_SPACE, values))
+        for values in itertools.product(*PARAM_SPACE.values())
+    ]
+    order = np.random.default_rng(seed).permutation(len(grid))
+
+    candidates = [dict(DEFAULT_GBM_PARAMS)]
+    seen = {config_id(candidates[0])}
+
+    for i in order:
+        if len(candidates) == n:
+            break
+        params = {**DEFAULT_GBM_PARAMS, **grid[i]}
+        if config_id(params) not in seen:
+            seen.add(config_id(params))
+            candidates.append(params)
+
+    return candidates
+
+
+def data_version(data: tuple) -> str:
+    """
+    Content hash of one position's (X, y, target_gw) matrices.
+    """
+
+    digest = hashlib.sha1()
+    for values in data:
+        values = np.ascontiguousarray(values)
+        digest.update(str((values.dtype, values.shape)).encode())
+        digest.update(values.tobytes())
+    return digest.hexdigest()[:12]
+
+
+def _load_results(path: Path) -> pd.DataFrame:
+    try:
+        results = pd.read_csv(
+            path, dtype={"data_version": str, "feature_hash": str}
+        )
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+
+    if list(results.columns) != RESULT_COLUMNS:
+        # written before results were keyed by data; never reused
+        stale = path.with_name(f"{path.stem}.stale{path.suffix}")
+        path.replace(stale)
+        print(f"Moved results in an old layout to {stale}")
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+
+    return results
+
+
+def _current_results(
+    path: Path,
+    versions: dict[str, str],
+    feature_hash: str,
+) -> pd.DataFrame:
+    """
+    Results scored on the data being searched: each position's own data
+    version and the current feature code.
+    """
+
+    results = _load_results(path)
+
+    current = (
+        results["position"].map(versions).eq(results["data_version"])
+        & results["feature_hash"].eq(feature_hash)
+    )
+    return results[current]
+
+
+def _append_result(path: Path, row: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_header = not path.exists() or path.stat().st_size == 0
+
+    with path.open("a") as f:
+        pd.DataFrame([row], columns=RESULT_COLUMNS).to_csv(
+            f, header=write_header, index=False
+        )
+        f.flush()
+
+
+def _rank(
+    results: pd.DataFrame,
+    position: str,
+    candidates: list[dict],
+    folds: list[int],
+) -> list[dict]:
+    """
+    Candidates ordered by mean Spearman over `folds` (NaN counts as -1);
+    ties keep candidate order.
+    """
+
+    rows = results[
+        (results["position"] == position) & (results["val_gw"].isin(folds))
+    ]
+    score = (
+        rows.assign(spearman=rows["spearman"].fillna(-1.0))
+        .groupby("config_id")["spearman"]
+        .mean()
+    )
+
+    return sorted(
+        candidates,
+        key=lambda params: -score.get(config_id(params), -np.inf),
+    )
+
+
+def run_search(
+    df: pd.DataFrame,
+    positions: list[str] = POSITIONS,
+    n_candidates: int = N_CANDIDATES,
+    n_jobs: int | None = None,
+    results_path: Path = RESULTS_PATH,
+    seed: int = SEED,
+) -> tuple[dict[str, dict], pd.DataFrame]:
+    """
+    Returns (position -> winning params, leaderboard of final-rung
+    survivors).
+    """
+
+    results_path = Path(results_path)
+    val_gws = list(validation_gws())
+    rung_folds = [min(n, len(val_gws)) for n in RUNG_FOLDS]
+
+    data = {p: position_matrix(df, p) for p in positions}
+    versions = {p: data_version(data[p]) for p in positions}
+    feature_hash = feature_code_hash()
+    candidates = sample_candidates(n_candidates, seed)
+    survivors = {p: list(candidates) for p in positions}
+
+    for rung, n_folds in enumerate(rung_folds):
+        folds = val_gws[:n_folds]
+        results = _current_results(results_path, versions, feature_hash)
+        done = set(
+            zip(results["position"], results["config_id"], results["val_gw"])
+        )
+
+        tasks = [
+            (p, gw, params)
+            for p in positions
+            for params in survivors[p]
+            for gw in folds
+            if (p, config_id(params), gw) not in done
+        ]
+
+        print(
+            f"[rung {rung}] {n_folds} folds, "
+            f"{sum(map(len, survivors.values()))} configs, "
+            f"{len(tasks)} fits to run"
+        )
+
+        for (position, _, params), metrics in zip(
+            tasks, map_folds(data, tasks, n_jobs)
+        ):
+            if metrics is None:
+                continue
+            _append_result(results_path, {
+                "position": position,
+                "config_id": config_id(params),
+                "params": json.dumps(params, sort_keys=True),
+                "val_gw": metrics["val_gw"],
+                "data_version": versions[position],
+                "feature_hash": feature_hash,
+                "rmse": metrics["rmse"],
+                "mae": metrics["mae"],
+                "spearman": metrics["spearman"],
+            })
+
+        results = _current_results(results_path, versions, feature_hash)
+        keep = (
+            math.ceil(len(candidates) / ETA ** (rung + 1))
+            if rung < len(rung_folds) - 1
+            else 1
+        )
+
+        for position in positions:
+            ranked = _rank(results, position, survivors[position], folds)
+            survivors[position] = ranked[:max(keep, 1)]
+
+    final_folds = val_gws[:rung_folds[-1]]
+    results = _current_results(results_path, versions, feature_hash)
+    rows = results[results["val_gw"].isin(final_folds)]
+
+    leaderboard = (
+        rows.groupby(["position", "config_id", "params"])[
+            ["rmse", "mae", "spearman"]
+        ]
+        .mean()
+        .reset_index()
+        .sort_values(["position", "spearman"], ascending=[True, False])
+    )
+    folds_seen = rows.groupby(["position", "config_id"])["val_gw"].nunique()
+    leaderboard = leaderboard[
+        [
+            folds_seen.get((p, c), 0) == len(final_folds)
+            for p, c in zip(leaderboard["position"], leaderboard["config_id"])
+        ]
+    ]
+
+    winners = {p: survivors[p][0] for p in positions}
+
+    return winners, leaderboard.reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    from src.pipeline.build_training_dataset import (
+        build_season_training_dataset,
+    )
+
+    parser = argparse.ArgumentParser(description="GBM hyperparameter search")
+    parser.add_argument("--candidates", type=int, default=N_CANDIDATES)
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument(
+        "--fresh", action="store_true", help="discard earlier results"
+    )
+    args = parser.parse_args()
+
+    if args.fresh:
+        RESULTS_PATH.unlink(missing_ok=True)
+
+    df = build_season_training_dataset(START_GW, END_GW)
+
+    winners, leaderboard = run_search(
+        df, n_candidates=args.candidates, n_jobs=args.jobs
+    )
+
+    save_tuned_params(
+        winners,
+        search={
+            "candidates": args.candidates,
+            "eta": ETA,
+            "rung_folds": RUNG_FOLDS,
+            "results": str(RESULTS_PATH),
+        },
+    )
+
+    print("\n=== FINAL RUNG (mean over folds) ===\n")
+    print(leaderboard.round(3).to_string(index=False))
+
+    print("\n=== WINNERS ===")
+    for position, params in winners.items():
+        print(f"{position:<11} {params}")
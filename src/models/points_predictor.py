@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 from src.config.constants import (
@@ -10,6 +11,7 @@ from src.config.constants import (
     MAX_MINUTES_FACTOR,
     POINT_CAPS,
 )
+from src.features.fixture_difficulty import clamp_array
 
 def clamp(x, low, high):
     return max(low, min(high, x))
@@ -73,7 +75,101 @@ def predict_points(row: pd.Series) -> float:
     return clamp(adjusted, min_cap, max_cap)
 
 
-def run_point_predictions(df: pd.DataFrame) -> pd.DataFrame:
+# ------------------------------------------------------------------
+# Columnar engine: same arithmetic as predict_points, one array op per
+# step instead of one pd.Series per row.
+# ------------------------------------------------------------------
+def _column(df: pd.DataFrame, name: str, default: float) -> np.ndarray:
+    if name not in df.columns:
+        return np.full(len(df), default)
+    return df[name].to_numpy(dtype=np.float64)
+
+
+def predict_points_array(df: pd.DataFrame) -> np.ndarray:
+    position = df["position"].to_numpy()
+
+    position_code = pd.Index(list(POINT_CAPS)).get_indexer(position)
+    if (position_code < 0).any():
+        raise KeyError(position[position_code < 0][0])
+
+    base_points = (
+        PPG_WEIGHTS["last_5"] * _column(df, "ppg_last_5", 0.0)
+        + PPG_WEIGHTS["last_3"] * _column(df, "ppg_last_3", 0.0)
+        + PPG_WEIGHTS["last_1"] * _column(df, "ppg_last_1", 0.0)
+    )
+
+    attack_delta = clamp_array(
+        0.6 * (_column(df, "xg_avg_last_5", 0.0)
+               - _column(df, "goals_avg_last_5", 0.0))
+        + 0.4 * (_column(df, "xa_avg_last_5", 0.0)
+                 - _column(df, "assists_avg_last_5", 0.0)),
+        -ATTACK_DELTA_CAP,
+        ATTACK_DELTA_CAP,
+    )
+
+    def_delta = clamp_array(
+        0.4 * _column(df, "defcon_avg_last_5", 0.0),
+        0.0,
+        DEF_DELTA_CAP,
+    )
+
+    gk_delta = clamp_array(
+        0.5 * _column(df, "saves_avg_last_5", 0.0)
+        - 0.3 * _column(df, "goals_conceded_avg_last_5", 0.0),
+        GK_DELTA_MIN,
+        GK_DELTA_MAX,
+    )
+
+    raw = np.select(
+        [
+            position == "Goalkeeper",
+            position == "Defender",
+            position == "Midfielder",
+        ],
+        [
+            base_points + gk_delta,
+            base_points + def_delta,
+            base_points + attack_delta + def_delta,
+        ],
+        default=base_points + attack_delta,
+    )
+
+    minutes_factor = clamp_array(
+        _column(df, "minutes_avg_last_5", 0.0) / 90.0,
+        MIN_MINUTES_FACTOR,
+        MAX_MINUTES_FACTOR,
+    )
+
+    reliable = raw * minutes_factor
+
+    adjusted = (
+        reliable * _column(df, "fixture_multiplier", 1.0)
+        + _column(df, "cs_bonus", 0.0)
+    )
+
+    caps = np.array(list(POINT_CAPS.values()), dtype=np.float64)[position_code]
+
+    return clamp_array(adjusted, caps[:, 0], caps[:, 1])
+
+
+def run_point_predictions(
+    df: pd.DataFrame,
+    mode: str = "vectorized",
+) -> pd.DataFrame:
+    """
+    Heuristic point predictions for every row.
+
+    mode="vectorized" (default) is exactly equivalent to the
+    mode="rowwise" reference, which applies predict_points per row.
+    """
+
     df = df.copy()
-    df["predicted_points"] = df.apply(predict_points, axis=1)
+
+    if mode == "vectorized":
+        df["predicted_points"] = predict_points_array(df)
+    elif mode == "rowwise":
+        df["predicted_points"] = df.apply(predict_points, axis=1)
+    else:
+        raise ValueError(f"Unknown point prediction mode: {mode}")
+
     return df
\ No newline at end of file
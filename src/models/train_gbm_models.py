@@ -17,6 +17,7 @@ from scipy.stats import spearmanr
 
 from src.pipeline.build_training_dataset import build_training_dataset
 from src.config.feature_masks import RANK_FEATURE_MASKS
+from src.models.gbm_params import gbm_params_for
 
 POSITIONS = ["Goalkeeper", "Defender", "Midfielder", "Forward"]
 TARGET = "target_points"
@@ -24,6 +25,8 @@ TARGET = "target_points"
 MODELS_DIR = Path("models")
 MODELS_DIR.mkdir(exist_ok=True)
 
+TRAIN_END_GW = 14
+
 def evaluate(y_true, y_pred):
     return {
         "rmse": np.sqrt(mean_squared_error(y_true, y_pred)),
@@ -31,30 +34,38 @@ def evaluate(y_true, y_pred):
         "spearman": spearmanr(y_true, y_pred).correlation,
     }
 
-def train_position_model(df: pd.DataFrame, position: str):
-    print(f"\n=== TRAINING {position.upper()} MODEL ===")
+def fit_position_model(df: pd.DataFrame, position: str):
+    """
+    Fits one position's model on target GWs <= TRAIN_END_GW, with the
+    position's tuned params when a search has written them.
+
+    Returns (model, train_metrics, val_metrics); nothing is written.
+    """
 
     pos_df = df[df["position"] == position].copy()
     features = RANK_FEATURE_MASKS[position]
 
-    train_df = pos_df[pos_df["target_gw"] <= 14]
-    val_df = pos_df[pos_df["target_gw"] > 14]
+    train_df = pos_df[pos_df["target_gw"] <= TRAIN_END_GW]
+    val_df = pos_df[pos_df["target_gw"] > TRAIN_END_GW]
 
     X_train, y_train = train_df[features], train_df[TARGET]
     X_val, y_val = val_df[features], val_df[TARGET]
 
-    model = HistGradientBoostingRegressor(
-        max_depth=5,
-        learning_rate=0.05,
-        max_iter=300,
-        random_state=42,
-    )
+    model = HistGradientBoostingRegressor(**gbm_params_for(position))
 
     model.fit(X_train, y_train)
 
     train_metrics = evaluate(y_train, model.predict(X_train))
     val_metrics = evaluate(y_val, model.predict(X_val))
 
+    return model, train_metrics, val_metrics
+
+
+def train_position_model(df: pd.DataFrame, position: str):
+    print(f"\n=== TRAINING {position.upper()} MODEL ===")
+
+    model, train_metrics, val_metrics = fit_position_model(df, position)
+
     print("\nTRAIN METRICS")
     for k, v in train_metrics.items():
         print(f"{k.upper()}: {v:.3f}")
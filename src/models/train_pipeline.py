@@ -0,0 +1,239 @@
+"""
+Unified train -> calibrate -> evaluate pipeline.
+
+Builds the training dataset ONCE and shares it in memory across every
+stage, instead of each script rebuilding it:
+
+1. dataset    build_season_training_dataset(START_GW, END_GW)
+2. train      one GBM per position (same split/params as train_gbm_models)
+3. calibrate  calibrators fit on the in-memory raw predictions
+4. evaluate   rolling CV, all positions and folds on a process pool
+5. write      model/calibrator pickles, compiled models (see compiled_gbm)
+               + manifest.json in models/
+
+The manifest records metrics, feature lists, params and per-stage wall
+time next to the artifacts.
+
+Usage:
+    python -m src.models.train_pipeline [--skip-cv]
+"""
+
+import argparse
+import json
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from src.config.feature_masks import RANK_FEATURE_MASKS
+from src.data.loaders import DEFAULT_SEASON
+from src.models.calibrate_models import (
+    CALIBRATION_GWS,
+    calibration_rows,
+    fit_calibrator,
+    identity_calibrator,
+)
+from src.models.rolling_cv import END_GW, START_GW, run_rolling_cv_parallel
+from src.models.compiled_gbm import compiled_path, export_compiled
+from src.models.gbm_params import gbm_params_for
+from src.models.train_gbm_models import (
+    MODELS_DIR,
+    POSITIONS,
+    TARGET,
+    TRAIN_END_GW,
+    fit_position_model,
+)
+from src.pipeline.build_training_dataset import build_season_training_dataset
+
+MANIFEST_NAME = "manifest.json"
+
+
+@contextmanager
+def _stage(timings: dict, name: str):
+    print(f"\n=== {name.upper()} ===")
+    start = time.perf_counter()
+    yield
+    timings[name] = time.perf_counter() - start
+    print(f"[{name}] {timings[name]:.2f}s")
+
+
+def _to_json(value):
+    if isinstance(value, dict):
+        return {k: _to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    if isinstance(value, (np.floating, np.integer)):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None  # e.g. spearman of a constant prediction
+    return value
+
+
+def run_training_pipeline(
+    start_gw: int = START_GW,
+    end_gw: int = END_GW,
+    season: str = DEFAULT_SEASON,
+    models_dir: Path = MODELS_DIR,
+    run_cv: bool = True,
+) -> dict:
+    """
+    Runs every stage and returns the manifest it wrote.
+    """
+
+    models_dir = Path(models_dir)
+    models_dir.mkdir(parents=True, exist_ok=True)
+
+    timings: dict[str, float] = {}
+    pipeline_start = time.perf_counter()
+
+    with _stage(timings, "dataset"):
+        df = build_season_training_dataset(start_gw, end_gw, season=season)
+        print(f"{len(df)} rows x {df.shape[1]} columns")
+
+    models = {}
+    positions = {}
+
+    with _stage(timings, "train"):
+        for position in POSITIONS:
+            model, train_metrics, val_metrics = fit_position_model(
+                df, position
+            )
+            models[position] = model
+            positions[position] = {
+                "features": list(RANK_FEATURE_MASKS[position]),
+                "gbm_params": gbm_params_for(position),
+                "train_metrics": train_metrics,
+                "val_metrics": val_metrics,
+            }
+            print(
+                f"{position:<11} val rmse {val_metrics['rmse']:.3f} "
+                f"spearman {val_metrics['spearman']:.3f}"
+            )
+
+    calibrators = {}
+
+    with _stage(timings, "calibrate"):
+        for position in POSITIONS:
+            calib_df = calibration_rows(df, position)
+            if calib_df.empty:
+                # written anyway, so a stale calibrator from an earlier
+                # run is never paired with the new model
+                print(f"{position:<11} no calibration rows — identity")
+                calibrators[position] = identity_calibrator()
+                continue
+
+            raw_pred = models[position].predict(
+                calib_df[RANK_FEATURE_MASKS[position]]
+            )
+            lr, before, after = fit_calibrator(raw_pred, calib_df[TARGET])
+
+            calibrators[position] = lr
+            positions[position]["calibration"] = {
+                "before": before,
+                "after": after,
+                "coef": float(lr.coef_[0]),
+                "intercept": float(lr.intercept_),
+            }
+            print(
+                f"{position:<11} rmse {before['rmse']:.3f} -> "
+                f"{after['rmse']:.3f}"
+            )
+
+    if run_cv:
+        with _stage(timings, "evaluate"):
+            cv_results = run_rolling_cv_parallel(df, POSITIONS)
+
+            for position in POSITIONS:
+                cv_df = cv_results[position]
+                if cv_df.empty:
+                    continue
+
+                summary = (
+                    cv_df[["rmse", "mae", "spearman"]].agg(["mean", "std"])
+                )
+                positions[position]["rolling_cv"] = {
+                    "folds": cv_df.to_dict("records"),
+                    "mean": summary.loc["mean"].to_dict(),
+                    "std": summary.loc["std"].to_dict(),
+                }
+                print(
+                    f"{position:<11} cv rmse "
+                    f"{summary.loc['mean', 'rmse']:.3f} "
+                    f"± {summary.loc['std', 'rmse']:.3f}"
+                )
+
+    with _stage(timings, "write"):
+        for position in POSITIONS:
+            name = position.lower()
+            artifacts = {
+                "model": f"{name}_gbm.pkl",
+                "calibrator": f"{name}_calibrator.pkl",
+            }
+            joblib.dump(models[position], models_dir / artifacts["model"])
+            joblib.dump(
+                calibrators[position], models_dir / artifacts["calibrator"]
+            )
+
+            # written last: the registry only trusts a compiled model at
+            # least as new as the pickles
+            try:
+                path = export_compiled(
+                    models[position],
+                    calibrators[position],
+                    position,
+                    compiled_path(models_dir, position),
+                )
+                artifacts["compiled"] = path.name
+            except ValueError as e:
+                print(f"{position:<11} not compiled — {e}")
+
+            positions[position]["artifacts"] = artifacts
+
+    timings["total"] = time.perf_counter() - pipeline_start
+
+    manifest = _to_json({
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "season": season,
+        "dataset": {
+            "start_gw": start_gw,
+            "end_gw": end_gw,
+            "rows": len(df),
+            "columns": df.shape[1],
+        },
+        "split": {
+            "train_end_gw": TRAIN_END_GW,
+            "calibration_gws": CALIBRATION_GWS,
+        },
+        "positions": positions,
+        "timings_s": timings,
+    })
+
+    tmp_path = models_dir / f"{MANIFEST_NAME}.tmp-{uuid.uuid4().hex}"
+    tmp_path.write_text(json.dumps(manifest, indent=2))
+    tmp_path.replace(models_dir / MANIFEST_NAME)
+
+    print("\n=== STAGE TIMINGS ===")
+    for name, seconds in timings.items():
+        print(f"{name:<10} {seconds:7.2f}s")
+
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train, calibrate, evaluate")
+    parser.add_argument("--start-gw", type=int, default=START_GW)
+    parser.add_argument("--end-gw", type=int, default=END_GW)
+    parser.add_argument("--season", default=DEFAULT_SEASON)
+    parser.add_argument("--skip-cv", action="store_true")
+    args = parser.parse_args()
+
+    run_training_pipeline(
+        start_gw=args.start_gw,
+        end_gw=args.end_gw,
+        season=args.season,
+        run_cv=not args.skip_cv,
+    )
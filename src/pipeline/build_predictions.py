@@ -9,66 +9,167 @@ This is the ONLY place where:
 are orchestrated together.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 
 from src.data.loaders import (
     load_player_gameweeks,
     load_players,
-    load_fixtures,
     get_last_completed_gw,
 )
 
+from src.data.feature_store import (
+    FEATURE_STORE_ENABLED,
+    fetch_features,
+    gameweek_files,
+)
 from src.features.rolling_form import build_rolling_form_features
-from src.features.fixture_difficulty import build_fixture_difficulty
+from src.features.rolling_state import ROLLING_STATE_ENABLED, rolling_form_at
+from src.features.fixture_difficulty import FixtureCalendar
 from src.features.relative_features import add_relative_features
 from src.features.trend_features import add_trend_features
+from src.pipeline.build_training_dataset import STATS_COLUMNS
+from src.pipeline.fixture_calendar import load_fixture_calendar
+from src.utils.tracing import trace_stage, traced
 
+PREDICTION_PLAYER_COLUMNS = ["player_id", "web_name", "position", "team_code"]
 
+
+@traced()
 def build_predictions(
     current_gw: int | None = None,
     horizon: int = 5,
     season: str = "2025-2026",
+    calendar: FixtureCalendar | None = None,
+    target_gws: list[int] | None = None,
+    use_store: bool = FEATURE_STORE_ENABLED,
+    use_rolling_state: bool = ROLLING_STATE_ENABLED,
 ) -> pd.DataFrame:
     """
-    Build ML-ready feature table for predicting NEXT gameweek points.
+    Build ML-ready feature table for predicting upcoming gameweek points.
+
+    NOTE:
+    - `horizon` is the form window; `target_gws` are the GWs to predict
+      (default: NEXT gameweek only)
+    - Form features are built once and joined against every target GW's
+      fixtures: one row per (player, fixture), so a double GW yields two
+      rows and a blank GW none
+    - Pass a season FixtureCalendar to reuse already-loaded fixtures
+    - The players snapshot and target-GW fixtures are prefetched on
+      background threads while the form window loads
+    - With the feature store (and no caller-supplied calendar, which it
+      cannot fingerprint), rows per (current GW, horizon, target GW) are
+      built once and read back afterwards
+    - With the rolling state, form comes from per-player ring buffers
+      that only apply GWs they have not seen (see rolling_state)
     """
 
     # 🔑 SINGLE SOURCE OF TRUTH FOR CURRENT GW
     if current_gw is None:
         current_gw = get_last_completed_gw(season)
 
-    next_gw = current_gw + 1
+    if target_gws is None:
+        target_gws = [current_gw + 1]
 
-    # rolling form (strictly causal)
-    form_gws = list(range(current_gw - horizon, current_gw))
-    player_gw_df = load_player_gameweeks(form_gws, season=season)
+    target_gws = sorted(set(target_gws))
+    if not target_gws or target_gws[0] <= current_gw:
+        raise ValueError(
+            f"target_gws must all be after current GW {current_gw}"
+        )
 
-    if player_gw_df.empty:
-        return pd.DataFrame()
+    if use_store and calendar is None:
+        prediction_df = fetch_features(
+            f"predict_GW{current_gw}_h{horizon}",
+            season,
+            target_gws,
+            inputs=lambda gw: gameweek_files(
+                season,
+                stats_gws=list(range(current_gw - horizon, current_gw)),
+                players_gw=current_gw - 1,
+                fixtures_gw=gw,
+            ),
+            build=lambda gws: _build_prediction_rows(
+                current_gw, horizon, season, None, gws, use_rolling_state
+            ),
+        )
+        if prediction_df.empty:
+            return prediction_df
 
-    # IMPORTANT:
-    # players.csv snapshot lags by 1 GW in FPL-Core-Insights
-    players_df = load_players(current_gw - 1, season=season)
-    fixtures_df = load_fixtures(next_gw, season=season)
+        return (
+            prediction_df.sort_values(["position", "player_id", "target_gw"])
+            .reset_index(drop=True)
+        )
 
-    if players_df.empty or fixtures_df.empty:
-        return pd.DataFrame()
+    return _build_prediction_rows(
+        current_gw, horizon, season, calendar, target_gws, use_rolling_state
+    )
 
-    form_df = build_rolling_form_features(player_gw_df)
-    fixture_df = build_fixture_difficulty(fixtures_df)
 
-    player_base = form_df.merge(
-        players_df[["player_id", "web_name", "position", "team_code"]],
-        on="player_id",
-        how="left",
-    )
+def _build_prediction_rows(
+    current_gw: int,
+    horizon: int,
+    season: str,
+    calendar: FixtureCalendar | None,
+    target_gws: list[int],
+    use_rolling_state: bool,
+) -> pd.DataFrame:
 
-    prediction_df = player_base.merge(
-        fixture_df,
-        left_on="team_code",
-        right_on="team_id",
-        how="inner",
-    )
+    with ThreadPoolExecutor(max_workers=2) as prefetch:
+        # IMPORTANT:
+        # players.csv snapshot lags by 1 GW in FPL-Core-Insights
+        players_future = prefetch.submit(
+            load_players,
+            current_gw - 1,
+            season=season,
+            columns=PREDICTION_PLAYER_COLUMNS,
+        )
+        calendar_future = (
+            prefetch.submit(load_fixture_calendar, target_gws, season=season)
+            if calendar is None
+            else None
+        )
+
+        # rolling form (strictly causal)
+        if use_rolling_state:
+            form_df = rolling_form_at(
+                current_gw - horizon, current_gw - 1, season=season
+            )
+        else:
+            player_gw_df = load_player_gameweeks(
+                list(range(current_gw - horizon, current_gw)),
+                season=season,
+                columns=STATS_COLUMNS,
+            )
+
+            if player_gw_df.empty:
+                return pd.DataFrame()
+
+            form_df = build_rolling_form_features(player_gw_df)
+
+        players_df = players_future.result()
+        if calendar_future is not None:
+            calendar = calendar_future.result()
+
+    fixture_df = calendar.fixtures_for_gws(target_gws)
+
+    if players_df.empty or fixture_df.empty:
+        return pd.DataFrame()
+
+    with trace_stage("merge_fixtures") as stage:
+        player_base = form_df.merge(
+            players_df[["player_id", "web_name", "position", "team_code"]],
+            on="player_id",
+            how="left",
+        )
+
+        prediction_df = player_base.merge(
+            fixture_df,
+            left_on="team_code",
+            right_on="team_id",
+            how="inner",
+        )
+        stage.rows = len(prediction_df)
 
     if prediction_df.empty:
         return prediction_df
@@ -78,12 +179,10 @@ def build_predictions(
             columns={"fixture_multiplier": "fixture_difficulty"}
         )
 
-    prediction_df["target_gw"] = next_gw
-
     prediction_df = add_relative_features(prediction_df)
     prediction_df = add_trend_features(prediction_df)
 
     return (
-        prediction_df.sort_values(["position", "player_id"])
+        prediction_df.sort_values(["position", "player_id", "target_gw"])
         .reset_index(drop=True)
     )
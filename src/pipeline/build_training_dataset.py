@@ -5,22 +5,54 @@ Each row represents:
 - player state BEFORE GW t
 - fixture difficulty FOR GW t
 - label = actual event_points IN GW t
+
+build_multi_season_training_dataset lays several seasons end to end, so
+early-season targets get form from the previous season's last GWs.
 """
 
-from typing import List
+from typing import Callable, List
+import numpy as np
 import pandas as pd
 
 from src.data.loaders import (
+    SEASON_PREFETCH,
+    iter_season_gameweeks,
     load_player_gameweeks,
+    load_player_id_map,
     load_players,
-    load_fixtures,
+    get_completed_gws,
+    get_last_completed_gw,
+)
+from src.data.feature_store import (
+    FEATURE_STORE_ENABLED,
+    fetch_features,
+    gameweek_files,
+)
+from src.config.feature_masks import RANK_FEATURE_MASKS
+from src.features.rolling_form import (
+    WINDOW_AGGREGATIONS,
+    build_rolling_form_features,
+    required_stats_columns,
 )
-from src.features.rolling_form import build_rolling_form_features
-from src.features.fixture_difficulty import build_fixture_difficulty
 from src.features.relative_features import add_relative_features
 from src.features.trend_features import add_trend_features
+from src.pipeline.fixture_calendar import load_fixture_calendar
+from src.utils.tracing import trace_stage, traced
+
+# form for target t is built from GWs t-5 .. t-1
+FORM_WINDOW_GWS = 5
+
+# raw stats columns the loaders project to: what the rank models read,
+# plus every window source since all form features are emitted
+# (ppg_last_* also brings in the event_points label)
+STATS_COLUMNS = required_stats_columns(
+    [feature for mask in RANK_FEATURE_MASKS.values() for feature in mask]
+    + [f"{name}_last_1" for name, _, _ in WINDOW_AGGREGATIONS]
+)
+PLAYER_COLUMNS = ["player_id", "position", "team_code"]
 
 
+@traced()
 def build_training_dataset(
     start_gw: int,
     end_gw: int,
@@ -29,20 +61,30 @@ def build_training_dataset(
 
     rows: List[pd.DataFrame] = []
 
+    if start_gw > end_gw:
+        raise RuntimeError("Training dataset is empty")
+
+    calendar = load_fixture_calendar(
+        list(range(start_gw, end_gw + 1)), season=season
+    )
+
     for target_gw in range(start_gw, end_gw + 1):
 
-        form_gws = list(range(target_gw - 5, target_gw))
-        player_gw_df = load_player_gameweeks(form_gws, season=season)
+        form_gws = list(range(target_gw - FORM_WINDOW_GWS, target_gw))
+        player_gw_df = load_player_gameweeks(
+            form_gws, season=season, columns=STATS_COLUMNS
+        )
 
         if player_gw_df.empty:
             continue
 
         form_df = build_rolling_form_features(player_gw_df)
 
-        fixtures_df = load_fixtures(target_gw, season=season)
-        fixture_df = build_fixture_difficulty(fixtures_df)
+        fixture_df = calendar.fixtures_for(target_gw)
 
-        players_df = load_players(target_gw - 1, season=season)
+        players_df = load_players(
+            target_gw - 1, season=season, columns=PLAYER_COLUMNS
+        )
 
         feature_df = (
             form_df
@@ -68,7 +110,9 @@ def build_training_dataset(
             continue
 
         label_df = (
-            load_player_gameweeks([target_gw], season=season)
+            load_player_gameweeks(
+                [target_gw], season=season, columns=STATS_COLUMNS
+            )
             [["player_id", "event_points"]]
             .rename(columns={"event_points": "target_points"})
         )
@@ -88,4 +132,415 @@ def build_training_dataset(
 
     return dataset.sort_values(
         ["target_gw", "player_id"]
-    ).reset_index(drop=True)
\ No newline at end of file
+    ).reset_index(drop=True)
+
+
+@traced("stack_form_windows")
+def _stack_form_windows(
+    season_df: pd.DataFrame,
+    targets: list[int],
+) -> pd.DataFrame:
+    """
+    Copies every appearance into each target window it belongs to.
+
+    A row from GW g feeds targets g+1 .. g+FORM_WINDOW_GWS, so the stacked
+    frame is at most FORM_WINDOW_GWS times the season, never quadratic.
+    """
+
+    gws = season_df["gameweek"].to_numpy()
+    offsets = np.arange(1, FORM_WINDOW_GWS + 1)
+
+    target_gws = gws[:, None] + offsets[None, :]
+    in_range = np.isin(target_gws, targets)
+
+    rows, slots = np.nonzero(in_range)
+
+    stacked = season_df.iloc[rows].reset_index(drop=True)
+    stacked["target_gw"] = target_gws[rows, slots]
+
+    return stacked
+
+
+@traced()
+def build_season_training_dataset(
+    start_gw: int,
+    end_gw: int,
+    season: str = "2025-2026",
+    use_store: bool = FEATURE_STORE_ENABLED,
+) -> pd.DataFrame:
+    """
+    Single-pass equivalent of build_training_dataset.
+
+    Every raw GW file is loaded once and rolling form is computed for all
+    (target_gw, player_id) windows in one grouped pass, instead of reloading
+    and recomputing a 5-GW window per target.
+
+    IMPORTANT:
+    - With use_store=False, output is identical to build_training_dataset
+      (values, dtypes, order); keep the two in sync when changing either
+    - With the feature store, rows of already built target GWs are read
+      back and only new GWs are built; output is the same either way
+    """
+
+    targets = list(range(start_gw, end_gw + 1))
+    if not targets:
+        raise RuntimeError("Training dataset is empty")
+
+    if not use_store:
+        return _build_season_rows(targets, season)
+
+    return fetch_features(
+        "train",
+        season,
+        targets,
+        inputs=lambda gw: gameweek_files(
+            season,
+            stats_gws=list(range(gw - FORM_WINDOW_GWS, gw + 1)),
+            players_gw=max(gw - 1, 1),
+            fixtures_gw=gw,
+        ),
+        build=lambda gws: _build_season_rows(gws, season),
+    )
+
+
+def _build_season_rows(targets: list[int], season: str) -> pd.DataFrame:
+    season_df = load_player_gameweeks(
+        get_completed_gws(
+            min(targets) - FORM_WINDOW_GWS, max(targets), season=season
+        ),
+        season=season,
+        columns=STATS_COLUMNS,
+    )
+
+    loaded_gws = set(season_df["gameweek"].unique())
+    for target_gw in targets:
+        window = range(target_gw - FORM_WINDOW_GWS, target_gw)
+        if not loaded_gws.intersection(window):
+            raise RuntimeError("No player_gameweek_stats loaded")
+
+    form_df = build_rolling_form_features(
+        _stack_form_windows(season_df, targets),
+        group_cols=["target_gw", "player_id"],
+    )
+
+    def load_labels(label_gws: list[int]) -> pd.DataFrame:
+        return pd.concat(
+            [
+                load_player_gameweeks(
+                    [target_gw], season=season, columns=STATS_COLUMNS
+                )
+                [["player_id", "event_points"]]
+                .assign(target_gw=target_gw)
+                for target_gw in label_gws
+            ],
+            ignore_index=True,
+        )
+
+    return _assemble_dataset(form_df, targets, season, load_labels)
+
+
+@traced("assemble_dataset")
+def _assemble_dataset(
+    form_df: pd.DataFrame,
+    targets: list[int],
+    season: str,
+    load_labels: Callable[[list[int]], pd.DataFrame],
+) -> pd.DataFrame:
+    """
+    Joins (target_gw, player_id) form rows with positions, fixtures and
+    labels, then adds relative and trend features.
+
+    `load_labels(gws)` returns player_id, event_points, target_gw rows.
+    """
+
+    # GW1 has no earlier snapshot; position and club are pre-season facts
+    players_df = pd.concat(
+        [
+            load_players(
+                max(target_gw - 1, 1), season=season, columns=PLAYER_COLUMNS
+            )
+            [["player_id", "position", "team_code"]]
+            .assign(target_gw=target_gw)
+            for target_gw in targets
+        ],
+        ignore_index=True,
+    )
+
+    # calendar rows are already grouped per GW in per-GW order
+    fixture_df = (
+        load_fixture_calendar(targets, season=season)
+        .fixtures
+        .rename(columns={"calendar_gw": "_target_gw"})
+    )
+
+    with trace_stage("merge_fixtures") as stage:
+        feature_df = (
+            form_df
+            .merge(players_df, on=["target_gw", "player_id"], how="left")
+            .merge(
+                fixture_df,
+                left_on=["target_gw", "team_code"],
+                right_on=["_target_gw", "team_id"],
+                how="inner",
+            )
+            .drop(columns="_target_gw")
+        )
+        stage.rows = len(feature_df)
+
+    if "fixture_multiplier" in feature_df.columns:
+        feature_df = feature_df.rename(
+            columns={"fixture_multiplier": "fixture_difficulty"}
+        )
+
+    label_gws = sorted(feature_df["target_gw"].unique())
+    if not label_gws:
+        raise RuntimeError("Training dataset is empty")
+
+    label_df = load_labels(label_gws).rename(
+        columns={"event_points": "target_points"}
+    )
+
+    dataset = feature_df.merge(
+        label_df, on=["target_gw", "player_id"], how="inner"
+    )
+
+    # per-target builder appends target_gw last
+    dataset = dataset[
+        [c for c in dataset.columns if c != "target_gw"] + ["target_gw"]
+    ]
+
+    dataset = add_relative_features(dataset)
+    dataset = add_trend_features(dataset)
+
+    return dataset.sort_values(
+        ["target_gw", "player_id"]
+    ).reset_index(drop=True)
+
+
+class _ColumnBuffer:
+    """
+    Preallocated column arrays that season frames are copied into, so a
+    multi-season dataset never holds every season's frame plus their
+    concatenation at once.
+
+    Numeric and bool columns live in arrays grown geometrically when an
+    estimate falls short; other columns (e.g. position strings) are few
+    and kept as per-season chunks.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(int(capacity), 1)
+        self.size = 0
+        self.columns: list[str] = []
+        self.dtypes: dict = {}
+        self.arrays: dict[str, np.ndarray] = {}
+        self.chunks: dict[str, list] = {}
+
+    def append(self, df: pd.DataFrame) -> None:
+        if not self.columns:
+            self.columns = df.columns.tolist()
+            self.dtypes = df.dtypes.to_dict()
+            for col in self.columns:
+                if _is_array_dtype(self.dtypes[col]):
+                    self.arrays[col] = np.empty(
+                        self.capacity, dtype=self.dtypes[col]
+                    )
+                else:
+                    self.chunks[col] = []
+
+        if df.columns.tolist() != self.columns:
+            raise ValueError("Season datasets have different columns")
+
+        end = self.size + len(df)
+        if end > self.capacity:
+            self._grow(max(end, int(self.capacity * 1.5)))
+
+        for col, values in self.arrays.items():
+            dtype = np.result_type(values.dtype, df[col].dtype)
+            if dtype != values.dtype:
+                self.arrays[col] = values = values.astype(dtype)
+            values[self.size:end] = df[col].to_numpy()
+
+        for col, chunks in self.chunks.items():
+            chunks.append(df[col].array)
+
+        self.size = end
+
+    def _grow(self, capacity: int) -> None:
+        for col, values in self.arrays.items():
+            grown = np.empty(capacity, dtype=values.dtype)
+            grown[:self.size] = values[:self.size]
+            self.arrays[col] = grown
+        self.capacity = capacity
+
+    def to_frame(self) -> pd.DataFrame:
+        data = {}
+        for col in self.columns:
+            if col in self.arrays:
+                data[col] = self.arrays[col][:self.size]
+            else:
+                data[col] = pd.concat(
+                    [pd.Series(chunk) for chunk in self.chunks[col]],
+                    ignore_index=True,
+                ).astype(self.dtypes[col])
+        return pd.DataFrame(data, columns=self.columns, copy=False)
+
+
+def _is_array_dtype(dtype) -> bool:
+    return isinstance(dtype, np.dtype) and dtype.kind in "biuf"
+
+
+@traced()
+def build_multi_season_training_dataset(
+    seasons: list[str],
+    start_gw: int = 1,
+    end_gw: int | None = None,
+    prefetch: int = SEASON_PREFETCH,
+) -> pd.DataFrame:
+    """
+    Training rows for every (season, target_gw) from (seasons[0],
+    start_gw) through (seasons[-1], end_gw), oldest season first.
+
+    Seasons are laid end to end on one GW timeline and players linked
+    across seasons by load_player_id_map, so the form window for GW 1-5
+    reaches back into the previous season's last GWs.
+
+    NOTE:
+    - Same columns as build_season_training_dataset plus `season`;
+      (season, target_gw) is the target key and player_id is the id of
+      the target's season
+    - `end_gw` defaults to the last completed GW of the last season
+    - First-season targets with no earlier GW loaded (GW1 with the
+      default `start_gw`) are skipped rather than built from empty form
+    - Seasons stream through iter_season_gameweeks (loaded ahead on
+      background threads) into a preallocated output; only one season's
+      raw frames and form windows are in memory at a time
+    """
+
+    seasons = list(seasons)
+    if not seasons:
+        raise ValueError("No seasons given")
+
+    season_targets = {}
+    for i, season in enumerate(seasons):
+        first = start_gw if i == 0 else 1
+        last = get_last_completed_gw(season)
+        if i == len(seasons) - 1 and end_gw is not None:
+            last = end_gw
+        season_targets[season] = list(range(first, last + 1))
+
+    id_map = load_player_id_map(seasons)
+
+    output = None
+    offset = 0
+    previous_tail = None
+
+    for season, season_df in iter_season_gameweeks(
+        seasons, prefetch, columns=STATS_COLUMNS
+    ):
+        targets = season_targets[season]
+        season_last = int(season_df["gameweek"].max())
+
+        keys = id_map[id_map["season"] == season]
+        key_of = pd.Series(
+            keys["player_key"].to_numpy(), index=keys["player_id"].to_numpy()
+        )
+        id_of = pd.Series(
+            keys["player_id"].to_numpy(), index=keys["player_key"].to_numpy()
+        )
+
+        # player_id -> player_key and gameweek -> timeline position
+        timeline_df = season_df.assign(
+            player_id=season_df["player_id"].map(key_of),
+            gameweek=season_df["gameweek"] + offset,
+        ).dropna(subset=["player_id"])
+        timeline_df["player_id"] = timeline_df["player_id"].astype("int64")
+
+        history = (
+            pd.concat([previous_tail, timeline_df], ignore_index=True)
+            if previous_tail is not None
+            else timeline_df
+        )
+
+        # targets at or before the first loaded GW have no form window
+        # (e.g. the first season's GW1); any later gap is an error
+        timeline_start = int(history["gameweek"].min())
+        targets = [t for t in targets if offset + t > timeline_start]
+        season_targets[season] = targets
+
+        loaded_gws = set(history["gameweek"].unique())
+        for target_gw in targets:
+            window = range(
+                offset + target_gw - FORM_WINDOW_GWS, offset + target_gw
+            )
+            if not loaded_gws.intersection(window):
+                raise RuntimeError(
+                    f"No player_gameweek_stats loaded for {season} "
+                    f"GW{target_gw}"
+                )
+
+        if targets:
+            dataset = _build_timeline_rows(
+                season, season_df, history, targets, offset, id_of
+            )
+
+            if output is None:
+                # estimate: the first season's rows per target for all
+                # targets
+                per_target = len(dataset) / len(targets)
+                total = sum(map(len, season_targets.values()))
+                output = _ColumnBuffer(per_target * total * 1.1)
+            output.append(dataset)
+            del dataset
+
+        previous_tail = timeline_df[
+            timeline_df["gameweek"] > offset + season_last - FORM_WINDOW_GWS
+        ]
+        offset += season_last
+        del history, timeline_df, season_df
+
+    if output is None:
+        raise RuntimeError("Training dataset is empty")
+
+    return output.to_frame()
+
+
+def _build_timeline_rows(
+    season: str,
+    season_df: pd.DataFrame,
+    history: pd.DataFrame,
+    targets: list[int],
+    offset: int,
+    id_of: pd.Series,
+) -> pd.DataFrame:
+    """
+    One season's training rows from its timeline `history` (player_key
+    ids, GWs shifted by `offset`), back in the season's own GWs and ids.
+    """
+
+    form_df = build_rolling_form_features(
+        _stack_form_windows(history, [offset + t for t in targets]),
+        group_cols=["target_gw", "player_id"],
+    )
+
+    # back to this season's GWs and ids; players who left are dropped
+    form_df["target_gw"] -= offset
+    form_df["player_id"] = form_df["player_id"].map(id_of)
+    form_df = form_df.dropna(subset=["player_id"])
+    form_df["player_id"] = form_df["player_id"].astype(
+        season_df["player_id"].dtype
+    )
+
+    def load_labels(label_gws: list[int]) -> pd.DataFrame:
+        return (
+            season_df[season_df["gameweek"].isin(label_gws)]
+            [["player_id", "event_points", "gameweek"]]
+            .rename(columns={"gameweek": "target_gw"})
+        )
+
+    dataset = _assemble_dataset(form_df, targets, season, load_labels)
+    dataset.insert(
+        dataset.columns.get_loc("target_gw"), "season", season
+    )
+
+    return dataset
@@ -0,0 +1,42 @@
+"""
+Season fixture calendar loading.
+
+Builders look fixtures up in one FixtureCalendar instead of reloading
+and re-exploding fixtures.csv for every target gameweek.
+"""
+
+import pandas as pd
+
+from src.data.loaders import (
+    LOAD_WORKERS,
+    load_concurrently,
+    load_fixtures,
+    DEFAULT_SEASON,
+)
+from src.features.fixture_difficulty import (
+    FixtureCalendar,
+    build_fixture_calendar,
+)
+
+
+def load_fixture_calendar(
+    gws: list[int],
+    season: str = DEFAULT_SEASON,
+    max_workers: int = LOAD_WORKERS,
+) -> FixtureCalendar:
+    """
+    Loads fixtures.csv from each GW folder in `gws` into one calendar,
+    on up to `max_workers` threads.
+
+    Raises FileNotFoundError for a missing GW, like load_fixtures.
+    """
+
+    gws = sorted(set(gws))
+    fixtures_by_gw: dict[int, pd.DataFrame] = dict(zip(
+        gws,
+        load_concurrently(
+            lambda gw: load_fixtures(gw, season=season), gws, max_workers
+        ),
+    ))
+
+    return build_fixture_calendar(fixtures_by_gw)
@@ -0,0 +1,354 @@
+"""
+Stage-level tracing: wall time, CPU time, peak memory and row counts.
+
+Enabled by the FPL_TRACE environment variable:
+
+    FPL_TRACE=1              trace to traces/trace-{pid}.jsonl
+    FPL_TRACE=run.jsonl      trace to that file
+    FPL_TRACE_MEMORY=0       skip tracemalloc (it slows Python code ~2x)
+
+Every finished stage appends one JSON line; a summary table is printed
+to stderr when the process exits. Stages nest per thread: each line
+carries its thread, parent and full path, the summary is one stage tree
+per (process, thread), and a parent's peak memory includes its
+children's.
+
+IMPORTANT:
+- cpu_s (time.process_time) and peak MB (tracemalloc) are process-wide:
+  while other threads run (e.g. the prediction prefetch), a stage's
+  figures include their work and allocations too. Only wall_s is truly
+  per-stage; read cpu_s/peak MB per stage on single-threaded runs
+
+    @traced("rolling_form")
+    def build_rolling_form_features(...): ...
+
+    with trace_stage("merge") as stage:
+        df = a.merge(b)
+        stage.rows = len(df)
+
+When tracing is off, @traced calls the function straight through and
+trace_stage yields a shared no-op stage, so the hooks can stay on hot
+paths.
+
+Usage:
+    FPL_TRACE=run.jsonl python -m src.inference.predict_ranks
+    python -m src.utils.tracing run.jsonl
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+TRACE_DIR = Path("traces")
+
+ENABLED = os.environ.get("FPL_TRACE", "") not in ("", "0")
+TRACE_MEMORY = os.environ.get("FPL_TRACE_MEMORY", "1") != "0"
+
+_lock = threading.Lock()
+_local = threading.local()
+_trace_path: Path | None = None
+_records: list[dict] = []
+_summary_registered = False
+
+
+class _Stage:
+    __slots__ = (
+        "name", "parent", "path", "depth", "rows",
+        "start_mem", "max_mem", "wall_start", "cpu_start", "ts",
+    )
+
+    def __init__(self, name: str, parent, depth: int):
+        self.name = name
+        self.parent = parent
+        self.path = (parent.path if parent is not None else ()) + (name,)
+        self.depth = depth
+        self.rows = None
+        self.start_mem = 0
+        self.max_mem = 0
+
+
+class _NullStage:
+    """
+    Stand-in yielded while tracing is off; attribute writes are ignored.
+    """
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def _stack() -> list:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def enable_tracing(
+    path: Path | str | None = None,
+    memory: bool = TRACE_MEMORY,
+) -> Path:
+    """
+    Turns tracing on for this process (same as setting FPL_TRACE).
+    """
+
+    global ENABLED, TRACE_MEMORY, _trace_path, _summary_registered
+
+    if path is None:
+        path = TRACE_DIR / f"trace-{os.getpid()}.jsonl"
+
+    _trace_path = Path(path)
+    _trace_path.parent.mkdir(parents=True, exist_ok=True)
+
+    TRACE_MEMORY = memory
+    if TRACE_MEMORY and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    if not _summary_registered:
+        atexit.register(_print_summary)
+        _summary_registered = True
+
+    ENABLED = True
+    return _trace_path
+
+
+def _write(record: dict) -> None:
+    with _lock:
+        _records.append(record)
+        if _trace_path is not None:
+            with _trace_path.open("a") as f:
+                f.write(json.dumps(record) + "\n")
+
+
+@contextmanager
+def trace_stage(name: str):
+    """
+    Times the enclosed block as stage `name`. Set `.rows` on the yielded
+    stage to record how many rows it produced.
+    """
+
+    if not ENABLED:
+        yield _NULL_STAGE
+        return
+
+    stack = _stack()
+    parent = stack[-1] if stack else None
+    stage = _Stage(name, parent, len(stack))
+
+    if TRACE_MEMORY and tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        if parent is not None:
+            parent.max_mem = max(parent.max_mem, peak)
+        tracemalloc.reset_peak()
+        stage.start_mem = stage.max_mem = current
+
+    stack.append(stage)
+    stage.ts = time.time()
+    stage.cpu_start = time.process_time()
+    stage.wall_start = time.perf_counter()
+
+    try:
+        yield stage
+    finally:
+        wall = time.perf_counter() - stage.wall_start
+        cpu = time.process_time() - stage.cpu_start
+        stack.pop()
+
+        peak_mb = None
+        if TRACE_MEMORY and tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            stage.max_mem = max(stage.max_mem, peak)
+            peak_mb = (stage.max_mem - stage.start_mem) / 2**20
+            if parent is not None:
+                parent.max_mem = max(parent.max_mem, stage.max_mem)
+
+        _write({
+            "stage": name,
+            "parent": parent.name if parent is not None else None,
+            "path": list(stage.path),
+            "depth": stage.depth,
+            "wall_s": wall,
+            "cpu_s": cpu,
+            "peak_mb": peak_mb,
+            "rows": stage.rows,
+            "thread": threading.current_thread().name,
+            "pid": os.getpid(),
+            "ts": stage.ts,
+        })
+
+
+def traced(name: str | None = None):
+    """
+    Decorator form of trace_stage; `rows` is taken from the result when
+    it has a length (e.g. a DataFrame).
+    """
+
+    def decorate(fn):
+        stage_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+
+            with trace_stage(stage_name) as stage:
+                result = fn(*args, **kwargs)
+                try:
+                    stage.rows = len(result)
+                except TypeError:
+                    pass
+                return result
+
+        return wrapper
+
+    return decorate
+
+
+def _record_path(record: dict) -> tuple:
+    # traces written before "path" existed only know the parent's name
+    if "path" in record:
+        return tuple(record["path"])
+    if record["parent"] is None:
+        return (record["stage"],)
+    return (record["parent"], record["stage"])
+
+
+def summarize(records: list[dict]) -> list[dict]:
+    """
+    Per-stage totals as a tree per (pid, thread): calls, wall/CPU seconds
+    (total and mean), max peak MB and total rows.
+
+    NOTE:
+    - Rows are keyed by their full stage path, so a stage called from two
+      parents appears under each; children follow their parent, siblings
+      and threads in order of first start
+    - `depth` is the row's depth within its thread's tree
+    - cpu_s and peak_mb are process-wide (see the module docstring)
+    """
+
+    stats: dict[tuple, dict] = {}
+    peaks = defaultdict(list)
+
+    for record in sorted(records, key=lambda r: r["ts"]):
+        path = _record_path(record)
+        key = (record.get("pid"), record.get("thread"), path)
+        row = stats.setdefault(key, {
+            "stage": record["stage"],
+            "pid": record.get("pid"),
+            "thread": record.get("thread"),
+            "path": path,
+            "depth": len(path) - 1 if "path" in record else record["depth"],
+            "first_ts": record["ts"],
+            "calls": 0,
+            "wall_s": 0.0,
+            "cpu_s": 0.0,
+            "rows": 0,
+        })
+        row["calls"] += 1
+        row["wall_s"] += record["wall_s"]
+        row["cpu_s"] += record["cpu_s"]
+        row["rows"] += record["rows"] or 0
+        if record.get("peak_mb") is not None:
+            peaks[key].append(record["peak_mb"])
+
+    children = defaultdict(list)
+    roots = []
+    for key, row in stats.items():
+        row["mean_ms"] = 1000 * row["wall_s"] / row["calls"]
+        row["peak_mb"] = max(peaks[key]) if peaks[key] else None
+
+        pid, thread, path = key
+        parent = (pid, thread, path[:-1])
+        (children[parent] if parent in stats else roots).append(key)
+
+    def by_start(keys: list[tuple]) -> list[tuple]:
+        return sorted(keys, key=lambda k: stats[k]["first_ts"])
+
+    ordered = []
+
+    def visit(key: tuple) -> None:
+        ordered.append(stats[key])
+        for child in by_start(children[key]):
+            visit(child)
+
+    # group roots by thread, threads in order of their first root
+    threads: dict[tuple, list] = {}
+    for key in by_start(roots):
+        threads.setdefault(key[:2], []).append(key)
+
+    for thread_roots in threads.values():
+        for key in thread_roots:
+            visit(key)
+
+    return ordered
+
+
+def format_summary(records: list[dict]) -> str:
+    lines = [
+        f"{'stage':<40} {'calls':>6} {'wall s':>9} {'cpu s':>9} "
+        f"{'mean ms':>9} {'peak MB':>8} {'rows':>10}"
+    ]
+
+    rows = summarize(records)
+    multi_thread = len({(r["pid"], r["thread"]) for r in rows}) > 1
+    current = None
+
+    for row in rows:
+        thread = (row["pid"], row["thread"])
+        if multi_thread and thread != current:
+            lines.append(f"[pid {row['pid']} {row['thread']}]")
+            current = thread
+
+        label = "  " * row["depth"] + row["stage"]
+        peak = (
+            f"{row['peak_mb']:8.1f}" if row["peak_mb"] is not None
+            else f"{'-':>8}"
+        )
+        lines.append(
+            f"{label:<40} {row['calls']:>6} {row['wall_s']:>9.3f} "
+            f"{row['cpu_s']:>9.3f} {row['mean_ms']:>9.1f} {peak} "
+            f"{row['rows']:>10}"
+        )
+
+    return "\n".join(lines)
+
+
+def _print_summary() -> None:
+    if not _records:
+        return
+
+    print("\n=== TRACE SUMMARY ===", file=sys.stderr)
+    print(format_summary(_records), file=sys.stderr)
+    if _trace_path is not None:
+        print(f"trace: {_trace_path}", file=sys.stderr)
+
+
+def read_trace(path: Path | str) -> list[dict]:
+    with Path(path).open() as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+if ENABLED:
+    enable_tracing(
+        None if os.environ["FPL_TRACE"] == "1" else os.environ["FPL_TRACE"]
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("usage: python -m src.utils.tracing TRACE.jsonl")
+        sys.exit(2)
+
+    print(format_summary(read_trace(sys.argv[1])))
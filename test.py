@@ -1,27 +1,11 @@
-from pathlib import Path
-import pandas as pd
+from src.data.loaders import _season_path, get_completed_gws
 
-# Correct root after re-clone
-base = Path(
-    "data/raw/fpl-elo-insights/data/2025-2026/By Tournament/Premier League"
-)
+base = _season_path("2025-2026")
 
 if not base.exists():
     raise RuntimeError(f"Premier League path not found: {base}")
 
-completed = []
-
-for p in sorted(base.iterdir()):
-    if not p.name.startswith("GW"):
-        continue
-
-    stats = p / "player_gameweek_stats.csv"
-    if not stats.exists():
-        continue
-
-    df = pd.read_csv(stats)
-    if not df.empty:
-        completed.append(p.name)
+completed = get_completed_gws(season="2025-2026")
 
 print("Completed GWs with real data:")
-print(sorted(completed, key=lambda x: int(x.replace("GW", ""))))
+print([f"GW{gw}" for gw in completed])